@@ -538,6 +538,7 @@ impl S3 for SkyProxy {
                 bucket: req.input.bucket.clone(),
                 prefix: req.input.prefix.clone(),
                 start_after: req.input.start_after.clone(),
+                start_after_version_id: None,
                 max_keys: req.input.max_keys,
             },
         )
@@ -1838,6 +1839,7 @@ impl S3 for SkyProxy {
                 bucket: req.input.bucket.clone(),
                 prefix: req.input.prefix.clone(),
                 start_after: None,
+                start_after_version_id: None,
                 max_keys: None,
             },
         )
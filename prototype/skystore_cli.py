@@ -130,11 +130,23 @@ def init(
             UltraDict.unlink_by_name("policy_ultra_dict")
         except Exception as _:
             print("policy_ultra_dict has been deleted.")
+        try:
+            UltraDict.unlink_by_name("trace_idx_ultra_dict")
+        except Exception as _:
+            print("trace_idx_ultra_dict has been deleted.")
+        try:
+            UltraDict.unlink_by_name("skystore_policy_state")
+        except Exception as _:
+            print("skystore_policy_state has been deleted.")
+        try:
+            UltraDict.unlink_by_name("locator_cache_generations")
+        except Exception as _:
+            print("locator_cache_generations has been deleted.")
     
         with open("store_server_output.log", "w") as log_file:
             subprocess.Popen(
                 f"cd {DEFAULT_STORE_SERVER_PATH}; "
-                "rm skystore.db; python3 -m uvicorn app:app --port 3000 --workers 4",
+                "rm skystore.db; WEB_CONCURRENCY=4 python3 -m uvicorn app:app --port 3000",
                 shell=True,
                 env=env,
                 stdout=log_file,  
@@ -1,7 +1,7 @@
 import asyncio
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
-from sqlalchemy import select, update
+from sqlalchemy import select, text, update
 
 from fastapi import FastAPI
 from fastapi.routing import APIRoute
@@ -11,6 +11,9 @@ from sqlalchemy import delete
 from operations.schemas.object_schemas import (
     DBLogicalObject,
     DBPhysicalObjectLocator,
+    EXPIRE_TIME_EXPRESSION,
+    LISTING_INDEX_INCLUDE,
+    LISTING_INDEX_WHERE,
     Status,
     HealthcheckResponse,
 )
@@ -31,6 +34,8 @@ from operations.object_operations.multipart import router as object_multipart_ro
 from operations.object_operations.put import router as object_put_router
 from operations.object_operations.get import router as object_get_router
 from operations.object_operations.clean import router as object_clean_router
+from operations.object_operations.clean import expiry_sweeper
+from operations.utils.metrics_buffer import metrics_buffer
 
 app = FastAPI()
 
@@ -137,6 +142,8 @@ async def rm_lock_on_timeout(minutes: int = 100, test: bool = False):
 async def shutdown_event():
     stop_task_flag.set()
     background_tasks.discard
+    await metrics_buffer.flush()
+    await engine.dispose()
 
 
 @app.on_event("startup")
@@ -146,6 +153,28 @@ async def startup():
         try:
             async with engine.begin() as conn:
                 await conn.run_sync(Base.metadata.create_all)
+                # Tables created before the expire_time column existed
+                await conn.execute(
+                    text(
+                        "ALTER TABLE physical_object_locators ADD COLUMN IF NOT EXISTS "
+                        "expire_time TIMESTAMP WITHOUT TIME ZONE GENERATED ALWAYS AS "
+                        f"({EXPIRE_TIME_EXPRESSION}) STORED"
+                    )
+                )
+                await conn.execute(
+                    text(
+                        "CREATE INDEX IF NOT EXISTS ix_physical_object_locators_expire_time "
+                        "ON physical_object_locators (expire_time, id)"
+                    )
+                )
+                await conn.execute(
+                    text(
+                        "CREATE INDEX IF NOT EXISTS ix_logical_objects_listing "
+                        "ON logical_objects (bucket, key, id DESC) "
+                        f"INCLUDE ({', '.join(LISTING_INDEX_INCLUDE)}) "
+                        f"WHERE {LISTING_INDEX_WHERE}"
+                    )
+                )
                 break
         except Exception:
             print("Database still creating, waiting for 5 seconds...")
@@ -159,6 +188,14 @@ async def startup():
     task = asyncio.create_task(rm_lock_on_timeout())
     background_tasks.add(task)
 
+    # NOTE: background TTL sweeper (see ExpirySweeper)
+    task = asyncio.create_task(expiry_sweeper.run(stop_task_flag))
+    background_tasks.add(task)
+
+    # NOTE: background flush of buffered /update_metrics calls
+    task = asyncio.create_task(metrics_buffer.run(stop_task_flag))
+    background_tasks.add(task)
+
 
 @app.get("/healthz")
 async def healthz() -> HealthcheckResponse:
@@ -0,0 +1,144 @@
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+import numpy as np
+
+"""
+    Concurrent-writer benchmark for a running store server.
+
+    Registers a fresh non-versioned bucket and has `--writers` concurrent
+    clients run start_upload + complete_upload on `--ops` objects, either all
+    on distinct keys or all on one hot key, and reports throughput and
+    start_upload latency percentiles.
+
+    Non-versioned writes used to take `LOCK TABLE logical_objects IN EXCLUSIVE
+    MODE`, which serialized writers across all keys and buckets; they now only
+    serialize writers of the same key. Compare `--keys distinct` with
+    `--keys same` (or with the previous server revision) to see the difference.
+
+    The benchmark runs under the server's current policies and leaves them
+    unchanged: set them beforehand (e.g. POST /update_policy with put_policy
+    "single_region", get_policy "closest") so that every write goes to one
+    region.
+
+    Usage: python benchmark/concurrent_writers.py [--server URL] [--writers N]
+               [--ops N] [--keys distinct|same]
+"""
+
+
+async def register_bucket(client: httpx.AsyncClient, bucket: str, region: str):
+    cloud, region_name = region.split(":")
+    resp = await client.post(
+        "/register_buckets",
+        json={
+            "bucket": bucket,
+            "config": {
+                "physical_locations": [
+                    {
+                        "name": region,
+                        "cloud": cloud,
+                        "region": region_name,
+                        "bucket": bucket,
+                        "is_primary": True,
+                    }
+                ]
+            },
+            "versioning": False,
+        },
+    )
+    resp.raise_for_status()
+
+
+async def write_object(
+    client: httpx.AsyncClient, bucket: str, key: str, region: str
+) -> float:
+    start = time.perf_counter()
+    resp = await client.post(
+        "/start_upload",
+        json={
+            "bucket": bucket,
+            "key": key,
+            "client_from_region": region,
+            "is_multipart": False,
+        },
+    )
+    latency = time.perf_counter() - start
+    if resp.status_code == 409:
+        # Another writer's upload of the same key is still pending
+        return latency
+    resp.raise_for_status()
+
+    for locator in resp.json()["locators"]:
+        resp = await client.patch(
+            "/complete_upload",
+            json={
+                "id": locator["id"],
+                "size": 1024,
+                "etag": uuid.uuid4().hex,
+                "last_modified": datetime.now(timezone.utc).isoformat(),
+            },
+        )
+        resp.raise_for_status()
+    return latency
+
+
+async def writer(
+    client: httpx.AsyncClient,
+    bucket: str,
+    keys: asyncio.Queue,
+    region: str,
+    latencies: list,
+):
+    while True:
+        try:
+            key = keys.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        latencies.append(await write_object(client, bucket, key, region))
+
+
+async def run(server: str, writers: int, ops: int, same_key: bool, region: str):
+    bucket = f"bench-{uuid.uuid4().hex[:12]}"
+    limits = httpx.Limits(max_connections=writers)
+    async with httpx.AsyncClient(
+        base_url=server, limits=limits, timeout=None
+    ) as client:
+        await register_bucket(client, bucket, region)
+
+        keys = asyncio.Queue()
+        for i in range(ops):
+            keys.put_nowait("hot-key" if same_key else f"key-{i}")
+
+        latencies = []
+        start = time.perf_counter()
+        await asyncio.gather(
+            *[writer(client, bucket, keys, region, latencies) for _ in range(writers)]
+        )
+        elapsed = time.perf_counter() - start
+
+    latencies = np.array(latencies) * 1000
+    print(
+        f"{writers} writers, {ops} writes to "
+        f"{'one key' if same_key else 'distinct keys'}: "
+        f"{ops / elapsed:.1f} writes/s, start_upload latency "
+        f"p50 {np.percentile(latencies, 50):.1f} ms, "
+        f"p99 {np.percentile(latencies, 99):.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Store server write concurrency")
+    parser.add_argument("--server", default="http://localhost:3000")
+    parser.add_argument("--writers", type=int, default=32)
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--keys", choices=["distinct", "same"], default="distinct")
+    parser.add_argument("--region", default="aws:us-east-1")
+    args = parser.parse_args()
+
+    asyncio.run(
+        run(args.server, args.writers, args.ops, args.keys == "same", args.region)
+    )
@@ -0,0 +1,59 @@
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from operations.policy.placement_policy.get_placement import (  # noqa: E402
+    create_placement_policy,
+    get_placement_policy,
+)
+from operations.policy.transfer_policy.get_transfer import (  # noqa: E402
+    create_transfer_policy,
+    get_transfer_policy,
+)
+from operations.utils.helper import init_region_tags, policy_ultra_dict  # noqa: E402
+
+"""
+    Per-request overhead of looking up the placement and transfer policies.
+
+    Compares building the policies on every request (what locate_object,
+    start_upload and clean_object used to do) with the cached instances, both
+    including the read of the policy names from shared memory.
+
+    Usage: python benchmark/policy_overhead.py [--n N]
+"""
+
+PLACEMENT_POLICIES = [
+    "single_region",
+    "replicate_all",
+    "push",
+    "always_evict",
+    "t_even",
+    "fixed_ttl",
+]
+
+
+def rebuilt():
+    create_placement_policy(policy_ultra_dict["put_policy"], init_region_tags)
+    create_transfer_policy(policy_ultra_dict["get_policy"])
+
+
+def cached():
+    get_placement_policy(policy_ultra_dict["put_policy"], init_region_tags)
+    get_transfer_policy(policy_ultra_dict["get_policy"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Policy lookup overhead")
+    parser.add_argument("--n", type=int, default=10000)
+    args = parser.parse_args()
+
+    policy_ultra_dict["get_policy"] = "closest"
+    print(f"{'put policy':<16}{'rebuilt (us)':>14}{'cached (us)':>14}")
+    for name in PLACEMENT_POLICIES:
+        policy_ultra_dict["put_policy"] = name
+        rebuilt_time = timeit.timeit(rebuilt, number=args.n) / args.n * 1e6
+        cached_time = timeit.timeit(cached, number=args.n) / args.n * 1e6
+        print(f"{name:<16}{rebuilt_time:>14.2f}{cached_time:>14.2f}")
@@ -14,6 +14,7 @@ from operations.utils.conf import Status
 from sqlalchemy.orm import Session
 from fastapi import APIRouter, Depends
 from operations.utils.db import get_session, logger
+from operations.utils.locator_cache import locator_cache
 
 router = APIRouter()
 
@@ -117,3 +118,5 @@ async def complete_delete_bucket(
     except Exception as e:
         logger.error(f"Error occurred while committing changes: {e}")
         return Response(status_code=500, content="Error committing changes")
+
+    locator_cache.invalidate_bucket(physical_locator.logical_bucket.bucket)
@@ -14,6 +14,7 @@ from operations.utils.conf import Status
 from sqlalchemy.orm import Session
 from fastapi import APIRouter, Depends, status
 from operations.utils.db import get_session, logger
+from operations.utils.locator_cache import locator_cache
 from typing import List
 
 router = APIRouter()
@@ -82,6 +83,7 @@ async def put_bucket_versioning(
         )
 
     await db.commit()
+    locator_cache.invalidate_bucket(request.bucket)
 
     return locators_lst
 
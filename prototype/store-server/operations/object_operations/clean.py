@@ -6,21 +6,27 @@ from operations.schemas.object_schemas import (
     LocateObjectResponse,
 )
 from fastapi import APIRouter, Depends
-from sqlalchemy import delete, select
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import delete, exists, select
+from sqlalchemy.orm import Session, aliased, selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
-from operations.utils.db import get_session
+from operations.utils.db import async_session, get_session, logger
 from operations.schemas.bucket_schemas import Status
 from sqlalchemy import text
-from operations.utils.helper import create_object_store_interface
+from operations.utils.object_store import delete_objects_in_regions
 from operations.policy.placement_policy.get_placement import get_placement_policy
 from operations.utils.helper import policy_ultra_dict, init_region_tags
-from sqlalchemy import func
+from operations.utils.locator_cache import locator_cache
 from sqlalchemy import tuple_, update
+from typing import Optional, Tuple
+import asyncio
+import os
 
 router = APIRouter()
 c = 0
 
+CLEAN_PAGE_SIZE = int(os.getenv("CLEAN_PAGE_SIZE", "1000"))
+CLEAN_INTERVAL = float(os.getenv("CLEAN_INTERVAL", "0"))
+
 
 def round_to_next_30_min(dt: datetime) -> datetime:
     minutes = dt.minute
@@ -36,6 +42,114 @@ def round_to_next_30_min(dt: datetime) -> datetime:
     return rounded_dt
 
 
+def expired_locators_query(
+    timestamp: datetime, after: Optional[Tuple[datetime, int]], page_size: int
+):
+    """
+    One page of ready locators that expired before `timestamp`, in
+    (expire_time, id) order after `after`. As before, a locator only counts if
+    it is the newest one of its (bucket, key, location_tag).
+
+    The rows are locked until the page is committed as pending, skipping rows
+    locked by the sweep of another worker, so that every expired locator is
+    charged and deleted by a single sweep.
+    """
+    newer = aliased(DBPhysicalObjectLocator)
+    stmt = (
+        select(DBPhysicalObjectLocator)
+        .where(
+            DBPhysicalObjectLocator.expire_time < timestamp,
+            DBPhysicalObjectLocator.status == Status.ready,
+            ~exists().where(
+                newer.bucket == DBPhysicalObjectLocator.bucket,
+                newer.key == DBPhysicalObjectLocator.key,
+                newer.location_tag == DBPhysicalObjectLocator.location_tag,
+                newer.id > DBPhysicalObjectLocator.id,
+            ),
+        )
+        .order_by(DBPhysicalObjectLocator.expire_time, DBPhysicalObjectLocator.id)
+        .limit(page_size)
+        .options(selectinload(DBPhysicalObjectLocator.logical_object))
+        .with_for_update(skip_locked=True, of=DBPhysicalObjectLocator)
+    )
+    if after is not None:
+        stmt = stmt.where(
+            tuple_(DBPhysicalObjectLocator.expire_time, DBPhysicalObjectLocator.id)
+            > tuple_(*after)
+        )
+    return stmt
+
+
+async def delete_expired(objects_to_delete, put_policy, db: AsyncSession) -> bool:
+    """Charge, then delete one page of expired locators from storage and the database"""
+    global c
+    if put_policy.name() == "skystore":
+        for object in objects_to_delete:
+            c += 1
+            put_policy.add_to_cost(
+                (
+                    round_to_next_30_min(
+                        object.storage_start_time + timedelta(seconds=object.ttl)
+                    )
+                    - object.storage_start_time
+                ).total_seconds(),
+                object.location_tag,
+                object.logical_object.size,
+            )
+
+    delete_conditions = [
+        (obj.bucket, obj.key, obj.location_tag) for obj in objects_to_delete
+    ]
+
+    try:
+        await db.execute(
+            update(DBPhysicalObjectLocator)
+            .where(
+                tuple_(
+                    DBPhysicalObjectLocator.bucket,
+                    DBPhysicalObjectLocator.key,
+                    DBPhysicalObjectLocator.location_tag,
+                ).in_(delete_conditions)
+            )
+            .values(status=Status.pending)  # Update status to PENDING
+        )
+        await db.commit()
+        for obj in objects_to_delete:
+            locator_cache.invalidate(obj.logical_object.bucket, obj.logical_object.key)
+    except Exception as e:
+        print(
+            f"Failed to update objects to status PENDING in database: {e}, rolling back"
+        )
+        await db.rollback()
+        return False
+
+    keys_by_tag = {}
+    for obj in objects_to_delete:
+        keys_by_tag.setdefault(obj.location_tag, []).append(obj.key)
+
+    # Batch delete in actual storage, all regions concurrently
+    for tag, keys in (await delete_objects_in_regions(keys_by_tag)).items():
+        print(f"Failed to delete {len(keys)} objects in ACTUAL storage for tag {tag}")
+
+    try:
+        await db.execute(
+            delete(DBPhysicalObjectLocator).where(
+                tuple_(
+                    DBPhysicalObjectLocator.bucket,
+                    DBPhysicalObjectLocator.key,
+                    DBPhysicalObjectLocator.location_tag,
+                ).in_(delete_conditions)
+            )
+        )
+        await db.commit()
+        print(f"Deleted objects in database", flush=True)
+    except Exception as e:
+        print(f"Failed to delete objects in database: {e}, rolling back")
+        await db.rollback()
+        return False
+    return True
+
+
 @router.post("/clean_object")
 async def clean_object(
     request: CleanObjectRequest, db: AsyncSession = Depends(get_session)
@@ -45,135 +159,91 @@ async def clean_object(
         put_policy = get_placement_policy(
             policy_ultra_dict["put_policy"], init_region_tags
         )
-        is_skystore = put_policy.name() == "skystore"
-
-        subquery = (
-            select(
-                DBPhysicalObjectLocator.bucket,
-                DBPhysicalObjectLocator.key,
-                DBPhysicalObjectLocator.location_tag,
-                func.max(DBPhysicalObjectLocator.id).label("max_id"),
-            )
-            .group_by(
-                DBPhysicalObjectLocator.bucket,
-                DBPhysicalObjectLocator.key,
-                DBPhysicalObjectLocator.location_tag,
-            )
-            .subquery()
-        )
-
-        # Select the objects with the highest ID for each bucket, key, and location_tag
-        highest_id_objects_query = (
-            select(DBPhysicalObjectLocator)
-            .join(subquery, DBPhysicalObjectLocator.id == subquery.c.max_id)
-            .options(selectinload(DBPhysicalObjectLocator.logical_object))
-        )
+        timestamp = request.timestamp.replace(tzinfo=None)
 
-        highest_id_objects = await db.execute(highest_id_objects_query)
-        highest_id_objects = highest_id_objects.scalars().all()
-        objects_to_delete = [
-            o
-            for o in highest_id_objects
-            if o.status == Status.ready
-            and o.ttl != -1
-            and o.storage_start_time + timedelta(seconds=o.ttl) < request.timestamp
-        ]
-
-        if not objects_to_delete:
-            return CleanObjectResponse(locators=[])
-
-        global c
-        if is_skystore:
-            for object in objects_to_delete:
-                c += 1
-                put_policy.add_to_cost(
-                    (
-                        round_to_next_30_min(
-                            object.storage_start_time + timedelta(seconds=object.ttl)
-                        )
-                        - object.storage_start_time
-                    ).total_seconds(),
-                    object.location_tag,
-                    object.logical_object.size,
+        # Only expired locators are read, through the expire_time index, in
+        # pages of CLEAN_PAGE_SIZE; the cost follows expirations, not objects
+        locators_response = []
+        after = None
+        while True:
+            page = (
+                await db.scalars(
+                    expired_locators_query(timestamp, after, CLEAN_PAGE_SIZE)
                 )
+            ).all()
+            if not page:
+                break
+            after = (page[-1].expire_time, page[-1].id)
 
-        delete_conditions = [
-            (obj.bucket, obj.key, obj.location_tag) for obj in objects_to_delete
-        ]
-
-        try:
-            await db.execute(
-                update(DBPhysicalObjectLocator)
-                .where(
-                    tuple_(
-                        DBPhysicalObjectLocator.bucket,
-                        DBPhysicalObjectLocator.key,
-                        DBPhysicalObjectLocator.location_tag,
-                    ).in_(delete_conditions)
+            if await delete_expired(page, put_policy, db):
+                # NOTE: return locator response
+                locators_response.extend(
+                    LocateObjectResponse(
+                        id=obj.id,
+                        tag=obj.location_tag,
+                        cloud=obj.cloud,
+                        bucket=obj.bucket,
+                        region=obj.region,
+                        key=obj.key,
+                        version_id=obj.version_id,
+                        version=obj.logical_object_id,
+                    )
+                    for obj in page
                 )
-                .values(status=Status.pending)  # Update status to PENDING
-            )
-            await db.commit()
-        except Exception as e:
-            print(
-                f"Failed to update objects to status PENDING in database: {e}, rolling back"
+            if len(page) < CLEAN_PAGE_SIZE:
+                break
+
+        if put_policy.name() == "skystore" and locators_response:
+            return CleanObjectResponse(
+                locators=locators_response, cost=sum(put_policy.storage_cost.values())
             )
-            await db.rollback()
-            return CleanObjectResponse(locators=[])
+        return CleanObjectResponse(locators=locators_response)
 
-        locators_by_tag = {}
-        for obj in objects_to_delete:
-            locators_by_tag.setdefault(obj.location_tag, []).append(obj)
 
-        locators_to_interface = {
-            tag: create_object_store_interface(tag) for tag in locators_by_tag
-        }
+class ExpirySweeper:
+    """
+    Runs clean_object in the background, with its own session, instead of
+    inside the request that triggers it: when locate_object reaches a new
+    (trace) hour under the skystore policy, and every CLEAN_INTERVAL seconds
+    of wall-clock time if that is set (0, the default, disables it).
+
+    Every uvicorn worker runs its own sweeper; sweeps that overlap split the
+    expired locators between them (see expired_locators_query).
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.pending: Optional[datetime] = None
+        self._wakeup = asyncio.Event()
+
+    def request_sweep(self, timestamp: datetime):
+        if self.pending is None or timestamp > self.pending:
+            self.pending = timestamp
+        self._wakeup.set()
+
+    async def run(self, stop: asyncio.Event):
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=self.interval or None
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
 
-        for tag, locators in locators_by_tag.items():
+            timestamp, self.pending = self.pending, None
+            if timestamp is None:
+                if not self.interval:
+                    continue
+                timestamp = datetime.now()
             try:
-                keys_to_delete = [locator.key for locator in locators]
-                # Batch delete in actual storage
-                locators_to_interface[tag].delete_objects(keys_to_delete)
+                async with async_session() as db:
+                    await clean_object(CleanObjectRequest(timestamp=timestamp), db)
             except Exception as e:
-                print(f"Failed to delete objects in ACTUAL storage for tag {tag}: {e}")
+                logger.error(f"Expiry sweep at {timestamp} failed: {e}")
 
-        try:
-            await db.execute(
-                delete(DBPhysicalObjectLocator).where(
-                    tuple_(
-                        DBPhysicalObjectLocator.bucket,
-                        DBPhysicalObjectLocator.key,
-                        DBPhysicalObjectLocator.location_tag,
-                    ).in_(delete_conditions)
-                )
-            )
-            await db.commit()
-            print(f"Deleted objects in database", flush=True)
-        except Exception as e:
-            print(f"Failed to delete objects in database: {e}, rolling back")
-            await db.rollback()
-            return CleanObjectResponse(locators=[])
-
-        # NOTE: return locator response
-        locators_response = [
-            LocateObjectResponse(
-                id=obj.id,
-                tag=obj.location_tag,
-                cloud=obj.cloud,
-                bucket=obj.bucket,
-                region=obj.region,
-                key=obj.key,
-                version_id=obj.version_id,
-                version=obj.logical_object_id,
-            )
-            for obj in objects_to_delete
-        ]
 
-        if is_skystore:
-            return CleanObjectResponse(
-                locators=locators_response, cost=sum(put_policy.storage_cost.values())
-            )
-        return CleanObjectResponse(locators=locators_response)
+expiry_sweeper = ExpirySweeper(CLEAN_INTERVAL)
 
 
 @router.post("/clean_out_remaining")
@@ -243,22 +313,13 @@ async def clean_out_remaining(
 
     # Delete the objects if any are found
     if objects_to_delete:
-        locators_by_tag = {}
+        keys_by_tag = {}
         for obj in objects_to_delete:
-            locators_by_tag.setdefault(obj.location_tag, []).append(obj)
-
-        # Initialize storage interfaces
-        locators_to_interface = {
-            tag: create_object_store_interface(tag) for tag in locators_by_tag
-        }
+            keys_by_tag.setdefault(obj.location_tag, []).append(obj.key)
 
-        for tag, locators in locators_by_tag.items():
-            try:
-                keys_to_delete = [locator.key for locator in locators]
-                # Batch delete in actual storage
-                locators_to_interface[tag].delete_objects(keys_to_delete)
-            except Exception as e:
-                print(f"Failed to delete objects in storage for tag {tag}: {e}")
+        # Batch delete in storage, all regions concurrently
+        for tag, keys in (await delete_objects_in_regions(keys_by_tag)).items():
+            print(f"Failed to delete {len(keys)} objects in storage for tag {tag}")
 
         # Delete in database
         _ = await db.execute(
@@ -268,6 +329,7 @@ async def clean_out_remaining(
         )
         try:
             await db.commit()
+            locator_cache.clear()
         except Exception as e:
             print(e)
             await db.rollback()
@@ -11,11 +11,12 @@ from operations.schemas.bucket_schemas import DBLogicalBucket
 from sqlalchemy.orm import Session, joinedload
 from itertools import zip_longest
 from sqlalchemy.sql import select
-from sqlalchemy import or_, text
+from sqlalchemy import or_
 from operations.utils.conf import Status
 from fastapi import APIRouter, Response, Depends
-from operations.utils.db import get_session, logger
+from operations.utils.db import get_session, lock_object_key, logger
 from operations.utils.helper import create_logical_object
+from operations.utils.locator_cache import locator_cache
 from datetime import datetime
 
 
@@ -34,9 +35,6 @@ async def start_delete_objects(
         )
     ).all()[0][0]
 
-    if version_enabled is not True:
-        await db.execute(text("LOCK TABLE logical_objects IN EXCLUSIVE MODE;"))
-
     specific_version = any(
         len(request.object_identifiers[key]) > 0 for key in request.object_identifiers
     )
@@ -58,6 +56,10 @@ async def start_delete_objects(
     for key, multipart_upload_id in zip_longest(
         request.object_identifiers, request.multipart_upload_ids or []
     ):
+        if version_enabled is not True:
+            # Held until this key's changes are committed
+            await lock_object_key(db, request.bucket, key)
+
         if multipart_upload_id:
             stmt = (
                 select(DBLogicalObject)
@@ -203,6 +205,7 @@ async def start_delete_objects(
 
             logger.debug(f"start_delete_object: {request} -> {logical_obj}")
 
+        locator_cache.invalidate(request.bucket, key)
         locator_dict[key] = locators
         delete_marker_dict[key] = DeleteMarker(
             delete_marker=logical_obj.delete_marker,
@@ -238,6 +241,7 @@ async def complete_delete_objects(
             content="Mismatched lengths for ids and multipart_upload_ids",
         )
 
+    invalidated_keys = set()
     for idx, (id, multipart_upload_id, op_type) in enumerate(
         zip_longest(
             request.ids,
@@ -284,6 +288,12 @@ async def complete_delete_objects(
             )
             if not remaining_physical_locators.all():
                 await db.delete(physical_locator.logical_object)
+            invalidated_keys.add(
+                (
+                    physical_locator.logical_object.bucket,
+                    physical_locator.logical_object.key,
+                )
+            )
 
         elif op_type == "replace":
             continue
@@ -325,6 +335,7 @@ async def complete_delete_objects(
                     return Response(status_code=404, content="Logical Object Not Found")
 
                 logical_obj.status = Status.ready
+                invalidated_keys.add((logical_obj.bucket, logical_obj.key))
 
         else:
             logger.error(f"Invalid op_type: {op_type}")
@@ -335,3 +346,6 @@ async def complete_delete_objects(
     except Exception as e:
         logger.error(f"Error occurred while committing changes: {e}")
         return Response(status_code=500, content="Error committing changes")
+
+    for bucket, key in invalidated_keys:
+        locator_cache.invalidate(bucket, key)
@@ -1,21 +1,27 @@
 from operations.schemas.object_schemas import (
-    CleanObjectRequest,
     DBLogicalObject,
     DBPhysicalObjectLocator,
     LocateObjectRequest,
     LocateObjectResponse,
+    LocateObjectsRequest,
+    LocateObjectsResponse,
+    LocateObjectsResult,
+    LocatorCacheStats,
 )
 from operations.schemas.bucket_schemas import DBLogicalBucket
-from sqlalchemy.sql import select
-from sqlalchemy import and_, or_, text
+from sqlalchemy.sql import select, update
+from sqlalchemy import and_, or_, text, tuple_
+from sqlalchemy.orm import selectinload
 from operations.utils.conf import Status
 from fastapi import APIRouter, Response, Depends, status
 from operations.utils.db import get_session
 from operations.policy.transfer_policy.get_transfer import get_transfer_policy
 from operations.policy.placement_policy.get_placement import get_placement_policy
 from operations.utils.helper import policy_ultra_dict, init_region_tags, TraceIdx
+from operations.utils.locator_cache import CachedLogicalObject, locator_cache
 from datetime import datetime, timedelta, timezone
-from .clean import clean_object
+from typing import Dict, Iterable, List, Optional, Union
+from .clean import expiry_sweeper
 from sqlalchemy.ext.asyncio import AsyncSession
 import asyncio
 from fastapi import BackgroundTasks
@@ -29,72 +35,86 @@ def round_to_next_hour(timestamp: datetime) -> datetime:
     return (timestamp + timedelta(hours=1)).replace(minute=0, second=0, microsecond=0)
 
 
-@router.post(
-    "/locate_object",
-    responses={
-        status.HTTP_200_OK: {"model": LocateObjectResponse},
-        status.HTTP_404_NOT_FOUND: {"description": "Object not found"},
-    },
-)
-async def locate_object(
-    request: LocateObjectRequest,
-    background_tasks: BackgroundTasks,
-    db: AsyncSession = Depends(get_session),
-) -> LocateObjectResponse:
-    """Given the logical object information, return one or zero physical object locators."""
+def replay_timestamp(put_policy, idx: int) -> datetime:
+    """Timestamp of the idx-th trace request replayed by the skystore policy"""
+    if idx >= len(put_policy.timestamps):
+        return datetime.fromtimestamp(
+            put_policy.timestamps[-1] / 1000 + idx - len(put_policy.timestamps),
+            tz=timezone.utc,
+        ).replace(tzinfo=None)
+    return datetime.fromtimestamp(
+        put_policy.timestamps[idx] / 1000, tz=timezone.utc
+    ).replace(tzinfo=None)
 
-    put_policy = get_placement_policy(policy_ultra_dict["put_policy"], init_region_tags)
-    get_policy = get_transfer_policy(policy_ultra_dict["get_policy"])
-    is_skystore_policy = put_policy.name() == "skystore"
-    is_always_store_policy = put_policy.name() == "always_store"
-    is_always_evict_policy = put_policy.name() == "always_evict"
 
-    version_enabled = (
-        await db.execute(
-            select(DBLogicalBucket.version_enabled).where(
-                DBLogicalBucket.bucket == request.bucket
-            )
-        )
-    ).all()
+def read_timestamp(put_policy, idx: int) -> datetime:
+    """Current time of a read; with skystore, also triggers the hourly TTL sweep"""
+    if put_policy.name() != "skystore":
+        return datetime.now()
 
-    version_enabled = version_enabled[0][0]
+    timestamp = replay_timestamp(put_policy, idx)
+    current_hour = timestamp.replace(minute=0, second=0, microsecond=0)
+    if put_policy.previous_hour is None or current_hour > put_policy.previous_hour:
+        put_policy.previous_hour = current_hour
+        expiry_sweeper.request_sweep(current_hour)
+    return timestamp
 
-    if version_enabled is None and request.version_id:
-        return Response(status_code=400, content="Versioning is not enabled")
-
-    version_id = request.version_id
-    idx = TraceIdx.get_instance().get()
-    timestamp = datetime.now()
 
-    if is_skystore_policy:
-        if idx >= len(put_policy.timestamps):
-            timestamp = datetime.fromtimestamp(
-                put_policy.timestamps[-1] / 1000 + idx - len(put_policy.timestamps),
-                tz=timezone.utc,
-            ).replace(tzinfo=None)
+async def fetch_version_enabled(
+    buckets: Iterable[str], db: AsyncSession
+) -> Dict[str, Optional[bool]]:
+    """Versioning flag of each existing bucket, from the locator cache or one query"""
+    version_enabled = {}
+    missing = set()
+    for bucket in buckets:
+        found, enabled = locator_cache.get_version_enabled(bucket)
+        if found:
+            version_enabled[bucket] = enabled
         else:
-            timestamp = datetime.fromtimestamp(
-                put_policy.timestamps[idx] / 1000, tz=timezone.utc
-            ).replace(tzinfo=None)
-
-        current_hour = timestamp.replace(minute=0, second=0, microsecond=0)
-        if put_policy.previous_hour is None or current_hour > put_policy.previous_hour:
-            put_policy.previous_hour = current_hour
-            background_tasks.add_task(
-                clean_object,
-                CleanObjectRequest(
-                    timestamp=current_hour.strftime("%Y-%m-%d %H:%M:%S")
-                ),
-                db,
+            missing.add(bucket)
+
+    if missing:
+        generations = {bucket: locator_cache.generation(bucket) for bucket in missing}
+        rows = await db.execute(
+            select(DBLogicalBucket.bucket, DBLogicalBucket.version_enabled).where(
+                DBLogicalBucket.bucket.in_(missing)
             )
+        )
+        for bucket, enabled in rows.all():
+            version_enabled[bucket] = enabled
+            locator_cache.put_version_enabled(bucket, enabled, generations[bucket])
+    return version_enabled
+
+
+async def fetch_locators(
+    requests: List[LocateObjectRequest], timestamp: datetime, db: AsyncSession
+) -> List[Optional[CachedLogicalObject]]:
+    """
+    For each request, the newest logical object (or the requested version) that
+    has a ready, unexpired locator at `timestamp`, together with all its
+    locators, cached as a snapshot.
+
+    All requests are resolved with one set-based query (plus one to load the
+    locators), however many keys there are. The cache generations are read
+    before the query, so that a result invalidated meanwhile is not cached.
+    """
+    generations = [locator_cache.generation(r.bucket, r.key) for r in requests]
+    latest_keys = {(r.bucket, r.key) for r in requests if r.version_id is None}
+    version_ids = {r.version_id for r in requests if r.version_id is not None}
+    matches = []
+    if latest_keys:
+        matches.append(
+            tuple_(DBLogicalObject.bucket, DBLogicalObject.key).in_(latest_keys)
+        )
+    if version_ids:
+        matches.append(DBLogicalObject.id.in_(version_ids))
 
     stmt = (
         select(DBLogicalObject)
         .join(DBPhysicalObjectLocator)
         .where(
             and_(
-                DBLogicalObject.bucket == request.bucket,
-                DBLogicalObject.key == request.key,
+                or_(*matches),
                 DBLogicalObject.status == Status.ready,
                 DBPhysicalObjectLocator.status == Status.ready,
                 or_(
@@ -105,10 +125,56 @@ async def locate_object(
                 ),
             )
         )
-        .order_by(None if request.version_id is not None else DBLogicalObject.id.desc())
+        .order_by(DBLogicalObject.id.desc())
+        .options(selectinload(DBLogicalObject.physical_object_locators))
     )
+    logical_objects = (await db.scalars(stmt)).unique().all()
+
+    # Newest first, so the first object seen for a key is its latest version
+    latest = {}
+    by_id = {}
+    for logical_object in logical_objects:
+        latest.setdefault((logical_object.bucket, logical_object.key), logical_object)
+        by_id[logical_object.id] = logical_object
 
-    locators = (await db.scalars(stmt)).first()
+    results = []
+    for r, generation in zip(requests, generations):
+        if r.version_id is None:
+            logical_object = latest.get((r.bucket, r.key))
+        else:
+            logical_object = by_id.get(r.version_id)
+            if logical_object is not None and (
+                logical_object.bucket != r.bucket or logical_object.key != r.key
+            ):
+                logical_object = None
+        results.append(
+            locator_cache.put(r.bucket, r.key, r.version_id, logical_object, generation)
+            if logical_object is not None
+            else None
+        )
+    return results
+
+
+def resolve_locator(
+    request: LocateObjectRequest,
+    locators: Optional[CachedLogicalObject],
+    version_enabled: Optional[bool],
+    idx: int,
+    timestamp: datetime,
+    put_policy,
+    get_policy,
+    background_tasks: BackgroundTasks,
+    ttl_refreshes: Dict[int, float],
+) -> Union[Response, LocateObjectResponse]:
+    """
+    Apply the transfer policy to the locators of one object and build the
+    response. TTLs refreshed by the skystore policy are recorded in
+    `ttl_refreshes` (locator id -> ttl), to be persisted by the caller.
+    """
+    is_skystore_policy = put_policy.name() == "skystore"
+    is_always_store_policy = put_policy.name() == "always_store"
+    is_always_evict_policy = put_policy.name() == "always_evict"
+    version_id = request.version_id
 
     # https://docs.aws.amazon.com/AmazonS3/latest/userguide/DeletingObjectV ersions.html
     if locators is None or (locators.delete_marker and not version_id):
@@ -122,7 +188,6 @@ async def locate_object(
             TraceIdx.get_instance().increment()
         return Response(status_code=405, content="Not allowed to get a delete marker")
 
-    await db.refresh(locators, ["physical_object_locators"])
     ready_locators = locators.physical_object_locators
     chosen_locator = get_policy.get(request, ready_locators, timestamp)
 
@@ -140,17 +205,7 @@ async def locate_object(
             if request.client_from_region == base_region:
                 set_ttl = -1
             else:
-                if idx >= len(put_policy.timestamps):
-                    now_timestamp = datetime.fromtimestamp(
-                        put_policy.timestamps[-1] / 1000
-                        + idx
-                        - len(put_policy.timestamps),
-                        tz=timezone.utc,
-                    ).replace(tzinfo=None)
-                else:
-                    now_timestamp = datetime.fromtimestamp(
-                        put_policy.timestamps[idx] / 1000, tz=timezone.utc
-                    ).replace(tzinfo=None)
+                now_timestamp = replay_timestamp(put_policy, idx)
                 for physical_object_locator in ready_locators:
                     if (
                         physical_object_locator.location_tag
@@ -194,15 +249,11 @@ async def locate_object(
         size=locators.size,
         last_modified=locators.last_modified,
         etag=locators.etag,
-        version_id=chosen_locator.version_id
-        if version_enabled is not None
-        else None, 
-        version=locators.id if version_enabled is not None else None,
-        ttl=dst_object_ttl,  
         version_id=(
             chosen_locator.version_id if version_enabled is not None else None
-        ),  
+        ),
         version=locators.id if version_enabled is not None else None,
+        ttl=dst_object_ttl,
     )
 
     if is_skystore_policy:
@@ -213,11 +264,11 @@ async def locate_object(
     if chosen_locator.location_tag == request.client_from_region:
         if request.client_from_region != base_region:
             if is_skystore_policy:
+                # Refresh the cached snapshot, the caller persists it
                 chosen_locator.ttl = (
                     timestamp - chosen_locator.storage_start_time
                 ).total_seconds() + dst_object_ttl
-            # Persist refreshed ttl data
-            await db.commit()
+                ttl_refreshes[chosen_locator.id] = chosen_locator.ttl
 
         put_policy.hits += 1
     else:
@@ -227,3 +278,167 @@ async def locate_object(
         TraceIdx.get_instance().increment()
 
     return response
+
+
+async def persist_ttl_refreshes(ttl_refreshes: Dict[int, float], db: AsyncSession):
+    """Persist refreshed ttl data in one bulk UPDATE by locator id"""
+    if not ttl_refreshes:
+        return
+    await db.execute(
+        update(DBPhysicalObjectLocator),
+        [{"id": id, "ttl": ttl} for id, ttl in ttl_refreshes.items()],
+    )
+    await db.commit()
+
+
+@router.post(
+    "/locate_object",
+    responses={
+        status.HTTP_200_OK: {"model": LocateObjectResponse},
+        status.HTTP_404_NOT_FOUND: {"description": "Object not found"},
+    },
+)
+async def locate_object(
+    request: LocateObjectRequest,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_session),
+) -> LocateObjectResponse:
+    """Given the logical object information, return one or zero physical object locators."""
+
+    put_policy = get_placement_policy(policy_ultra_dict["put_policy"], init_region_tags)
+    get_policy = get_transfer_policy(policy_ultra_dict["get_policy"])
+
+    version_enabled = await fetch_version_enabled([request.bucket], db)
+    if request.bucket not in version_enabled:
+        return Response(status_code=404, content="Bucket Not Found")
+    version_enabled = version_enabled[request.bucket]
+
+    if version_enabled is None and request.version_id:
+        return Response(status_code=400, content="Versioning is not enabled")
+
+    idx = TraceIdx.get_instance().get()
+    timestamp = read_timestamp(put_policy, idx)
+
+    locators = locator_cache.get(
+        request.bucket, request.key, request.version_id, timestamp
+    )
+    if locators is None:
+        locators = (await fetch_locators([request], timestamp, db))[0]
+
+    ttl_refreshes = {}
+    response = resolve_locator(
+        request,
+        locators,
+        version_enabled,
+        idx,
+        timestamp,
+        put_policy,
+        get_policy,
+        background_tasks,
+        ttl_refreshes,
+    )
+    await persist_ttl_refreshes(ttl_refreshes, db)
+    return response
+
+
+@router.post(
+    "/locate_objects",
+    responses={
+        status.HTTP_200_OK: {"model": LocateObjectsResponse},
+    },
+)
+async def locate_objects(
+    request: LocateObjectsRequest,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_session),
+) -> LocateObjectsResponse:
+    """
+    Batched locate_object: one result per requested object, in request order.
+
+    Bucket flags and locators of all keys missing from the locator cache are
+    looked up with one set-based query each; the transfer policy and the TTL
+    refresh are then applied per key exactly as in locate_object, and refreshed
+    TTLs are written back in a single UPDATE.
+    """
+    put_policy = get_placement_policy(policy_ultra_dict["put_policy"], init_region_tags)
+    get_policy = get_transfer_policy(policy_ultra_dict["get_policy"])
+
+    version_enabled = await fetch_version_enabled(
+        {r.bucket for r in request.objects}, db
+    )
+
+    idx = TraceIdx.get_instance().get()
+    timestamp = read_timestamp(put_policy, idx)
+    cached = [
+        (
+            locator_cache.get(r.bucket, r.key, r.version_id, timestamp)
+            if r.bucket in version_enabled
+            else None
+        )
+        for r in request.objects
+    ]
+    misses = [
+        r
+        for r, locators in zip(request.objects, cached)
+        if locators is None and r.bucket in version_enabled
+    ]
+    fetched = iter(await fetch_locators(misses, timestamp, db) if misses else [])
+
+    results = []
+    ttl_refreshes = {}
+    for r, locators in zip(request.objects, cached):
+        if r.bucket not in version_enabled:
+            results.append(
+                LocateObjectsResult(status_code=404, content="Bucket Not Found")
+            )
+            continue
+        if locators is None:
+            locators = next(fetched)
+
+        if version_enabled[r.bucket] is None and r.version_id:
+            results.append(
+                LocateObjectsResult(
+                    status_code=400, content="Versioning is not enabled"
+                )
+            )
+            continue
+
+        # Every key is one read: with skystore the trace index (and so the
+        # timestamp) advances between keys, re-check the batch lookup against it
+        idx = TraceIdx.get_instance().get()
+        key_timestamp = read_timestamp(put_policy, idx)
+        if (
+            locators is not None
+            and key_timestamp > timestamp
+            and not locators.is_alive(key_timestamp)
+        ):
+            locators = (await fetch_locators([r], key_timestamp, db))[0]
+
+        result = resolve_locator(
+            r,
+            locators,
+            version_enabled[r.bucket],
+            idx,
+            key_timestamp,
+            put_policy,
+            get_policy,
+            background_tasks,
+            ttl_refreshes,
+        )
+        if isinstance(result, Response):
+            results.append(
+                LocateObjectsResult(
+                    status_code=result.status_code, content=result.body.decode()
+                )
+            )
+        else:
+            results.append(LocateObjectsResult(status_code=200, locator=result))
+
+    await persist_ttl_refreshes(ttl_refreshes, db)
+    return LocateObjectsResponse(results=results)
+
+
+@router.get("/locator_cache_stats")
+async def locator_cache_stats() -> LocatorCacheStats:
+    """Hit/miss/invalidation counters of this worker's locate_object cache."""
+    return LocatorCacheStats(**locator_cache.stats())
@@ -10,21 +10,62 @@ from operations.schemas.object_schemas import (
     LogicalPartResponse,
     MultipartResponse,
     Metrics,
-    DBMetrics,
+    MetricsBatch,
+    DBMetricsHistogram,
+    LATENCY_BUCKETS,
+    LISTING_INDEX_WHERE,
+    LatencyBucket,
+    LatencyHistogram,
 )
 from operations.schemas.bucket_schemas import DBLogicalBucket
-from sqlalchemy.orm import selectinload, Session
+from sqlalchemy.orm import aliased, selectinload, Session
 from sqlalchemy.sql import select
-from sqlalchemy import and_
-from sqlalchemy import func
+from sqlalchemy import and_, or_, text
 from operations.utils.conf import Status
 from fastapi import APIRouter, Response, Depends, status
 from operations.utils.db import get_session, logger
+from operations.utils.metrics_buffer import metrics_buffer
 from typing import List
 
 router = APIRouter()
 
 
+def listing_conditions(
+    bucket: str, request: ListObjectRequest, versions: bool = False
+) -> list:
+    """
+    Filters of list_objects and list_objects_versioning. The status filter is
+    the literal predicate of the partial ix_logical_objects_listing index, so
+    the planner can use the index also for generic prepared statement plans.
+    """
+    conditions = [
+        DBLogicalObject.bucket == bucket,
+        text(LISTING_INDEX_WHERE),
+    ]
+    if request.prefix is not None:
+        # The lower bound lets the index scan start at the prefix
+        conditions.append(DBLogicalObject.key >= request.prefix)
+        conditions.append(DBLogicalObject.key.startswith(request.prefix))
+    if request.start_after is None:
+        return conditions
+
+    if versions and request.start_after_version_id is not None:
+        # Continue with the older versions of start_after
+        conditions.append(DBLogicalObject.key >= request.start_after)
+        conditions.append(
+            or_(
+                DBLogicalObject.key > request.start_after,
+                and_(
+                    DBLogicalObject.key == request.start_after,
+                    DBLogicalObject.id < request.start_after_version_id,
+                ),
+            )
+        )
+    else:
+        conditions.append(DBLogicalObject.key > request.start_after)
+    return conditions
+
+
 @router.post("/list_objects")
 async def list_objects(
     request: ListObjectRequest, db: Session = Depends(get_session)
@@ -36,35 +77,22 @@ async def list_objects(
     if logical_bucket is None:
         return Response(status_code=404, content="Bucket Not Found")
 
-    conditions = [
-        DBLogicalObject.bucket == logical_bucket.bucket,
-        DBLogicalObject.status == Status.ready,
-        DBLogicalObject.delete_marker is not True,  # Exclude delete markers
-    ]
-
-    if request.prefix is not None:
-        conditions.append(DBLogicalObject.key.startswith(request.prefix))
-    if request.start_after is not None:
-        conditions.append(DBLogicalObject.key > request.start_after)
-
-    subquery = (
-        select(DBLogicalObject.key, func.max(DBLogicalObject.id).label("max_id"))
-        .where(*conditions)
-        .group_by(DBLogicalObject.key)
+    # Newest ready version of every key from the start of the page, read in
+    # order from ix_logical_objects_listing, so a page costs O(max_keys)
+    # regardless of the bucket size. Keys whose newest version is a delete
+    # marker are skipped.
+    latest = (
+        select(DBLogicalObject)
+        .where(*listing_conditions(logical_bucket.bucket, request))
+        .order_by(DBLogicalObject.key, DBLogicalObject.id.desc())
+        .distinct(DBLogicalObject.key)
         .subquery()
     )
-
-    # Create the main query that joins the subquery
+    latest_object = aliased(DBLogicalObject, latest)
     stmt = (
-        select(DBLogicalObject)
-        .join(
-            subquery,
-            and_(
-                DBLogicalObject.key == subquery.c.key,
-                DBLogicalObject.id == subquery.c.max_id,
-            ),
-        )
-        .order_by(DBLogicalObject.key)
+        select(latest_object)
+        .where(latest_object.delete_marker.is_(False))
+        .order_by(latest_object.key)
     )
 
     if request.max_keys is not None:
@@ -97,18 +125,14 @@ async def list_objects_versioning(
     if logical_bucket is None:
         return Response(status_code=404, content="Bucket Not Found")
 
-    stmt = select(DBLogicalObject).where(
-        DBLogicalObject.bucket == logical_bucket.bucket,
-        DBLogicalObject.status == Status.ready,
-    )
-
-    if request.prefix is not None:
-        stmt = stmt.where(DBLogicalObject.key.startswith(request.prefix))
-    if request.start_after is not None:
-        stmt = stmt.where(DBLogicalObject.key > request.start_after)
+    conditions = listing_conditions(logical_bucket.bucket, request, versions=True)
 
-    # Sort keys before return
-    stmt = stmt.order_by(DBLogicalObject.key)
+    # Sort keys before return, newest version first
+    stmt = (
+        select(DBLogicalObject)
+        .where(*conditions)
+        .order_by(DBLogicalObject.key, DBLogicalObject.id.desc())
+    )
 
     # Limit the number of returned objects if specified
     if request.max_keys is not None:
@@ -324,17 +348,57 @@ async def locate_object_status(
 
 
 @router.post("/update_metrics")
-async def update_metrics(metric: Metrics, db: Session = Depends(get_session)):
-    # build the metrics
-    mtr = DBMetrics(
-        timestamp=metric.timestamp,
-        request_region=metric.request_region,
-        destination_region=metric.destination_region,
-        latency=metric.latency,
-        key=metric.key,
-        size=metric.size,
-        op=metric.op,
+async def update_metrics(metric: Metrics):
+    # buffered, written in bulk by the metrics buffer flush
+    metrics_buffer.add([metric])
+
+
+@router.post("/update_metrics_batch")
+async def update_metrics_batch(request: MetricsBatch):
+    metrics_buffer.add(request.metrics)
+
+
+@router.get("/metrics_histogram")
+async def metrics_histogram(
+    db: Session = Depends(get_session),
+) -> List[LatencyHistogram]:
+    """Latency histograms per (request region, destination region, op)"""
+    stmt = select(DBMetricsHistogram).order_by(
+        DBMetricsHistogram.request_region,
+        DBMetricsHistogram.destination_region,
+        DBMetricsHistogram.op,
+        DBMetricsHistogram.bucket,
     )
+    histograms = {}
+    latency_sums = {}
+    for row in (await db.scalars(stmt)).all():
+        group = (row.request_region, row.destination_region, row.op)
+        if group not in histograms:
+            histograms[group] = LatencyHistogram(
+                request_region=row.request_region,
+                destination_region=row.destination_region,
+                op=row.op,
+                count=0,
+                mean_latency=0.0,
+                total_size=0,
+                buckets=[],
+            )
+            latency_sums[group] = 0.0
+        histogram = histograms[group]
+        histogram.count += row.count
+        latency_sums[group] += row.latency_sum
+        histogram.total_size += row.size_sum
+        histogram.buckets.append(
+            LatencyBucket(
+                le=(
+                    LATENCY_BUCKETS[row.bucket]
+                    if row.bucket < len(LATENCY_BUCKETS)
+                    else None
+                ),
+                count=row.count,
+            )
+        )
 
-    db.add(mtr)
-    await db.commit()
+    for group, histogram in histograms.items():
+        histogram.mean_latency = latency_sums[group] / max(histogram.count, 1)
+    return list(histograms.values())
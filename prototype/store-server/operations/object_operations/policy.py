@@ -24,8 +24,15 @@ async def update_policy(
     if put_policy_type is None and get_policy_type is None:
         raise ValueError("Invalid policy type")
 
+    changed = False
     if put_policy_type is not None and put_policy_type != old_put_policy_type:
         policy_ultra_dict["put_policy"] = put_policy_type
+        changed = True
 
     if get_policy_type is not None and get_policy_type != old_get_policy_type:
         policy_ultra_dict["get_policy"] = get_policy_type
+        changed = True
+
+    if changed:
+        # Every worker, not just this one, rebuilds its policies on next use
+        policy_ultra_dict["generation"] += 1
@@ -10,16 +10,17 @@ from operations.schemas.object_schemas import (
 from operations.schemas.bucket_schemas import DBLogicalBucket
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy.sql import select
-from sqlalchemy import or_, text, and_
+from sqlalchemy import or_, and_
 from operations.utils.conf import Status
 from fastapi import APIRouter, Response, Depends
-from operations.utils.db import get_session, logger
+from operations.utils.db import get_session, lock_object_key, logger
 from operations.utils.helper import create_logical_object
 from datetime import datetime, timedelta, timezone
 from itertools import chain
 from operations.policy.placement_policy.get_placement import get_placement_policy
 from fastapi import BackgroundTasks
 from operations.utils.helper import init_region_tags, policy_ultra_dict, TraceIdx
+from operations.utils.locator_cache import locator_cache
 
 router = APIRouter()
 
@@ -69,7 +70,7 @@ async def start_upload(
     version_enabled, logical_bucket = res
 
     if not version_enabled:
-        await db.execute(text("LOCK TABLE logical_objects IN EXCLUSIVE MODE;"))
+        await lock_object_key(db, request.bucket, request.key)
         if req_version_id:
             return Response(
                 status_code=400,
@@ -342,6 +343,7 @@ async def start_upload(
 
     db.add_all(locators)
     await db.commit()
+    locator_cache.invalidate(request.bucket, request.key)
 
     return StartUploadResponse(
         multipart_upload_id=logical_object.multipart_upload_id,
@@ -424,3 +426,6 @@ async def complete_upload(
         logical_object.etag = request.etag
         logical_object.last_modified = request.last_modified.replace(tzinfo=None)
     await db.commit()
+    locator_cache.invalidate(
+        physical_locator.logical_object.bucket, physical_locator.logical_object.key
+    )
@@ -1,5 +1,5 @@
 from operations.policy.placement_policy.base import PlacementPolicy
-from typing import List
+from typing import Dict, List, Tuple
 from operations.policy.placement_policy.policy_replicate_all import ReplicateAll
 from operations.policy.placement_policy.policy_single_region import SingleRegionWrite
 from operations.policy.placement_policy.policy_push_on_write import PushonWrite
@@ -8,13 +8,40 @@ from operations.policy.placement_policy.policy_always_evict import AlwaysEvict
 from operations.policy.placement_policy.policy_teven import Teven
 from operations.policy.placement_policy.policy_fixed_ttl import FixedTTL
 from operations.policy.placement_policy.policy_skystore import SkyStore
+from operations.utils.helper import policy_ultra_dict
 
 
 def eviction_policies() -> List[str]:
     return ["always_evict", "always_store", "fixed_ttl", "t_even", "skystore"]
 
 
+# Policy instances by (name, regions), so requests don't rebuild them each time.
+# They are dropped when /update_policy bumps the shared policy generation.
+_placement_policies: Dict[Tuple[str, Tuple[str, ...]], PlacementPolicy] = {}
+_placement_generation = None
+
+
 def get_placement_policy(name: str, init_regions: List[str]) -> PlacementPolicy:
+    global _placement_generation
+    generation = policy_ultra_dict["generation"]
+    if generation != _placement_generation:
+        clear_placement_policies()
+        _placement_generation = generation
+
+    key = (name, tuple(init_regions))
+    policy = _placement_policies.get(key)
+    if policy is None:
+        policy = create_placement_policy(name, init_regions)
+        _placement_policies[key] = policy
+    return policy
+
+
+def clear_placement_policies() -> None:
+    """Drop the cached instances, so the next request builds the policy anew"""
+    _placement_policies.clear()
+
+
+def create_placement_policy(name: str, init_regions: List[str]) -> PlacementPolicy:
     if name == "single_region":
         return SingleRegionWrite(init_regions)
     elif name == "replicate_all":
@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, List
 from operations.schemas.object_schemas import StartUploadRequest
 from operations.policy.placement_policy.base import (
     PlacementPolicy,
@@ -15,9 +15,12 @@ from operations.policy.utils.helpers import (
 )
 from operations.schemas.object_schemas import LocateObjectResponse
 from operations.utils.helper import TraceIdx
+from operations.utils.shared_state import SharedCounters
 import threading
 import csv
 
+EPOCH = datetime.fromtimestamp(0, tz=timezone.utc).replace(tzinfo=None)
+
 
 class SkyStore(PlacementPolicy):
     _instance = None
@@ -41,10 +44,6 @@ class SkyStore(PlacementPolicy):
     def __init__(self, init_regions: List[str] = []) -> None:
         super().__init__(init_regions)
 
-        self.region_pairs_ttl = defaultdict(list)
-        for region in self.init_regions:
-            for region2 in self.init_regions:
-                self.region_pairs_ttl[(region, region2)] = 0
         self.window_size = -1
 
         self.avgNetworkCost = get_avg_network_cost(self.stat_graph)
@@ -52,38 +51,59 @@ class SkyStore(PlacementPolicy):
         self.minNetworkCost = get_min_network_cost(self.stat_graph)
         self.medNetworkCost = get_median_network_cost(self.stat_graph)
 
-        self.past_requests = {}  
-        self.hist = {}  
-        self.last_hist = {} 
-        self.num_requests = {}  
-
-        self.next_past_requests = {}  
-        self.next_hist = {}  
-        self.next_last_hist = {}
-        self.next_num_requests = {} 
-        if self.window_size != -1:
-            self.last_updated = None
-        else:
-            self.last_updated = datetime.fromtimestamp(0, tz=timezone.utc).replace(
-                tzinfo=None
-            )
+        # Access statistics are shared by all server workers (see SharedCounters),
+        # keyed by window so that rolling to the next window needs no reset:
+        #   ("num_requests", window, region)
+        #   ("hist", window, region, hours to next access) -> GB
+        #   ("last_hist", window, region, hours to end of the hour) -> GB
+        #   ("ttl", src, dst), ("seen_days",), ("hits",), ("miss",),
+        #   ("storage_cost", region), ("network_cost",)
+        # Windows older than the one the TTLs are computed from are discarded.
+        self.counters = SharedCounters("skystore_policy_state")
+        # (region, key) -> seconds since epoch of the last access in
+        # `last_access_window`, seen by this worker. Kept per worker, as a
+        # shared dict gets slower with every distinct key; only the histogram
+        # deltas are shared.
+        self.last_access: Dict[tuple, float] = {}
+        self.last_access_window = None
 
         self.regions = self.init_regions
-        self.region_pairs_ttl = defaultdict(list)
-        for region in self.regions:
-            for region2 in self.regions:
-                self.region_pairs_ttl[(region, region2)] = []
         self.timestamps = self.read_timestamps_from_csv(
             "../experiment/trace/Tr065.typeE.3reg.tevict.prototype", "timestamp"
         )
 
         self.k = 12
-        self.seen_days = None
-        self.storage_cost = defaultdict(int)
-        self.network_cost = []
         self.previous_hour = None
-        self.hits = 0
-        self.miss = 0
+
+    @property
+    def hits(self) -> int:
+        return int(self.counters.get(("hits",)))
+
+    @hits.setter
+    def hits(self, value: int):
+        self.counters.add(("hits",), value - self.hits)
+
+    @property
+    def miss(self) -> int:
+        return int(self.counters.get(("miss",)))
+
+    @miss.setter
+    def miss(self, value: int):
+        self.counters.add(("miss",), value - self.miss)
+
+    @property
+    def storage_cost(self) -> Dict[str, float]:
+        self.counters.merge()
+        storage_cost = defaultdict(int)
+        for key, value in self.counters.items():
+            if key[0] == "storage_cost":
+                storage_cost[key[1]] = value
+        return storage_cost
+
+    @property
+    def network_cost(self) -> List[float]:
+        self.counters.merge()
+        return [self.counters.get(("network_cost",))]
 
     @classmethod
     def get_instance(cls, init_regions: List[str]):
@@ -94,13 +114,13 @@ class SkyStore(PlacementPolicy):
 
     def add_to_network_cost(self, src, dst, size):
         if src == dst:
-            n_cost = 0
-        else:
-            if self.stat_graph.has_edge(src, dst):
-                n_cost = self.stat_graph[src][dst]["cost"] * (size / GB)
-            else:
-                n_cost = "-1"
-        self.network_cost.append(n_cost)
+            return
+        if not self.stat_graph.has_edge(src, dst):
+            print(f"No network cost from {src} to {dst}")
+            return
+        self.counters.add(
+            ("network_cost",), self.stat_graph[src][dst]["cost"] * (size / GB)
+        )
 
     def add_to_cost(self, timedelta: int, region: str, size):
         added_cost = (
@@ -112,18 +132,15 @@ class SkyStore(PlacementPolicy):
             * size
             / (1024 * 1024 * 1024)
         )
-        self.storage_cost[region] += added_cost
+        self.counters.add(("storage_cost", region), added_cost)
 
     def place(self, req: StartUploadRequest) -> List[str]:
         return [req.client_from_region]
 
-    def is_next_window(self, old_datetime: datetime, new_datetime: datetime):
-        time_difference = new_datetime - old_datetime
-        return time_difference > timedelta(hours=self.window_size)
-
-    def is_large_time_gap(self, old_datetime: datetime, new_datetime: datetime):
-        time_difference = abs(new_datetime - old_datetime)
-        return time_difference > timedelta(hours=self.window_size * 2)
+    def window_of(self, timestamp: datetime) -> int:
+        if self.window_size == -1:
+            return 0
+        return int((timestamp - EPOCH).total_seconds() // (self.window_size * 60 * 60))
 
     def round_to_next_hour(self, dt: datetime):
         if dt.minute != 0 or dt.second != 0 or dt.microsecond != 0:
@@ -143,144 +160,79 @@ class SkyStore(PlacementPolicy):
             cur_timestamp = datetime.fromtimestamp(
                 self.timestamps[cur_timestamp_idx] / 1000, tz=timezone.utc
             ).replace(tzinfo=None)
-
-            if self.window_size != -1:
-                if self.last_updated is None or self.is_large_time_gap(
-                    self.last_updated, cur_timestamp
-                ):
-                    self.last_updated = cur_timestamp.replace(
-                        minute=0, second=0, microsecond=0
-                    )
-                    self.past_requests = {}
-                    self.hist = {}
-                    self.num_requests = {}
-                    self.last_hist = {}
-                    self.next_last_hist = {}
-                    self.next_past_requests = {}
-                    self.next_hist = {}
-                    self.next_num_requests = {}
-                elif self.is_next_window(self.last_updated, cur_timestamp):
-                    self.last_updated = self.last_updated + timedelta(
-                        hours=self.window_size
-                    )
-                    self.past_requests = self.next_past_requests
-                    self.hist = self.next_hist
-                    self.last_hist = self.next_last_hist
-                    self.num_requests = self.next_num_requests
-                    self.next_past_requests = {}
-                    self.next_hist = {}
-                    self.next_num_requests = {}
-                    self.next_last_hist = {}
-
-            tnext = 0
-            self.next_num_requests[place_region] = (
-                self.next_num_requests.get(place_region, 0) + 1
-            )
-            if place_region not in self.next_past_requests:
-                self.next_past_requests[place_region] = {}
-            if response.key in self.next_past_requests[place_region]:
-                req_to_sec = (
-                    cur_timestamp
-                    - datetime.fromtimestamp(0, tz=timezone.utc).replace(tzinfo=None)
-                ).total_seconds()
-                tnext = (
-                    req_to_sec - self.next_past_requests[place_region][response.key][-1]
-                )
+            window = self.window_of(cur_timestamp)
+            size = response.size / GB
+            req_to_sec = (cur_timestamp - EPOCH).total_seconds()
+
+            self.counters.add(("num_requests", window, place_region), 1)
+
+            if window != self.last_access_window:
+                self.last_access = {}
+                self.last_access_window = window
+            last_access_sec = self.last_access.get((place_region, response.key))
+            if last_access_sec is not None:
+                tnext = req_to_sec - last_access_sec
                 if tnext == 0:
                     tnext = 1
 
+                # The previous access no longer ends its hour without a next one
                 curentWindow = int(
                     math.ceil(
                         (
-                            self.round_to_next_hour_seconds(
-                                self.next_past_requests[place_region][response.key][-1]
-                            )
-                            - self.next_past_requests[place_region][response.key][-1]
+                            self.round_to_next_hour_seconds(last_access_sec)
+                            - last_access_sec
                         )
                         / 3600
                     )
                 )
-
-                if (
-                    place_region in self.next_last_hist
-                    and curentWindow in self.next_last_hist[place_region]
-                ):
-                    self.next_last_hist[place_region][curentWindow] -= (
-                        response.size / GB
-                    )
-
-                if int(math.ceil(tnext / 3600)) not in self.next_hist[place_region]:
-                    self.next_hist[place_region][int(math.ceil(tnext / 3600))] = 0
-
-                self.next_hist[place_region][int(math.ceil(tnext / 3600))] += (
-                    response.size / GB
+                self.counters.add(
+                    ("last_hist", window, place_region, curentWindow), -size
                 )
-                self.next_past_requests[place_region][response.key].append(
-                    (
-                        cur_timestamp
-                        - datetime.fromtimestamp(0, tz=timezone.utc).replace(
-                            tzinfo=None
-                        )
-                    ).total_seconds()
+                self.counters.add(
+                    ("hist", window, place_region, int(math.ceil(tnext / 3600))), size
                 )
 
-                if place_region not in self.next_last_hist:
-                    self.next_last_hist[place_region] = {}
-                tendWindow = int(
-                    math.ceil(
-                        (
-                            self.round_to_next_hour(cur_timestamp) - cur_timestamp
-                        ).total_seconds()
-                        / 3600
-                    )
-                )
-
-                self.next_last_hist[place_region][tendWindow] = (
-                    self.next_last_hist[place_region].get(tendWindow, 0)
-                    + response.size / GB
-                )
-            else:
-                tnext = (
-                    cur_timestamp
-                    - datetime.fromtimestamp(0, tz=timezone.utc).replace(tzinfo=None)
-                ).total_seconds()
-                if place_region not in self.next_hist:
-                    self.next_hist[place_region] = {}
-                self.next_past_requests[place_region][response.key] = []
-                self.next_past_requests[place_region][response.key].append(
+            self.last_access[(place_region, response.key)] = req_to_sec
+            tendWindow = int(
+                math.ceil(
                     (
-                        cur_timestamp
-                        - datetime.fromtimestamp(0, tz=timezone.utc).replace(
-                            tzinfo=None
-                        )
+                        self.round_to_next_hour(cur_timestamp) - cur_timestamp
                     ).total_seconds()
+                    / 3600
                 )
-                if place_region not in self.next_last_hist:
-                    self.next_last_hist[place_region] = {}
-                tendWindow = int(
-                    math.ceil(
-                        (
-                            self.round_to_next_hour(cur_timestamp) - cur_timestamp
-                        ).total_seconds()
-                        / 3600
-                    )
-                )
-                self.next_last_hist[place_region][tendWindow] = (
-                    self.next_last_hist[place_region].get(tendWindow, 0)
-                    + response.size / GB
-                )
-
-    def calc_evict_cost(self, region, teven_hours, net_cost, storage_cost_hour):
-        if self.window_size == -1:
-            if region not in self.next_hist or region not in self.next_last_hist:
-                return -1, -1
-            X = self.next_hist[region]
-            last_X = self.next_last_hist[region]
-        else:
-            if region not in self.hist or region not in self.last_hist:
-                return -1, -1
-            X = self.hist[region]
-            last_X = self.last_hist[region]
+            )
+            self.counters.add(("last_hist", window, place_region, tendWindow), size)
+
+    def window_stats(self, now_timestamp: datetime):
+        """
+        Merged access statistics of all workers for the window the TTLs are
+        computed from: all requests, or the last complete window when using
+        windows.
+
+        Returns:
+            (hist, last_hist, num_requests): per region
+        """
+        self.counters.merge()
+        window = self.window_of(now_timestamp) - (0 if self.window_size == -1 else 1)
+
+        hist, last_hist, num_requests = {}, {}, {}
+        for key, value in self.counters.items():
+            if len(key) < 3 or key[1] != window:
+                continue
+            if key[0] == "num_requests":
+                num_requests[key[2]] = value
+            elif key[0] == "hist":
+                hist.setdefault(key[2], {})[key[3]] = value
+            elif key[0] == "last_hist":
+                last_hist.setdefault(key[2], {})[key[3]] = value
+        return hist, last_hist, num_requests
+
+    def calc_evict_cost(self, region, teven_hours, net_cost, storage_cost_hour, stats):
+        hist, last_hist, num_requests = stats
+        if region not in num_requests:
+            return -1, -1
+        X = hist.get(region, {})
+        last_X = last_hist.get(region, {})
 
         cost_hist = {}
         if len(X.keys()) > 0:
@@ -313,31 +265,50 @@ class SkyStore(PlacementPolicy):
         return (ret, cost_hist[ret])
 
     def get_tevict(self, src, dst):
-        return self.region_pairs_ttl[(src, dst)][-1]
+        return self.counters.get(("ttl", src, dst))
 
-    def find_min(self, y, teven, region):
-        noPastData = False
-        if self.window_size == -1:
-            if region not in self.next_num_requests:
-                noPastData = True
-                ttl = teven / 3600 / 2
-            else:
-                numRequests = self.next_num_requests[region]
+    def find_min(self, y, teven, region, num_requests):
+        if region not in num_requests or y == -1 or num_requests[region] < 1000:
+            ttl = teven / 3600 / 2
         else:
-            if region not in self.num_requests:
-                noPastData = True
-                ttl = teven / 3600 / 2
-            else:
-                numRequests = self.num_requests[region]
-
-        if not noPastData:
-            if y == -1 or self.last_updated is None or numRequests < 1000:
-                ttl = teven / 3600 / 2
-            else:
-                ttl = y
+            ttl = y
 
         return ttl * 3600
 
+    def ttl_expired(self, now_sec: float) -> bool:
+        seen_days = self.counters.get(("seen_days",), None)
+        return seen_days is None or now_sec >= seen_days + self.k * 60 * 60
+
+    def discard_old_windows(self, now_timestamp: datetime):
+        if self.window_size == -1:
+            return
+        oldest = self.window_of(now_timestamp) - 1
+        self.counters.discard(
+            lambda key: key[0] in ("num_requests", "hist", "last_hist")
+            and key[1] < oldest
+        )
+
+    def update_ttls(self, stats):
+        for region in self.regions:
+            for region2 in self.regions:
+                if region != region2:
+                    net_cost = self.stat_graph[region][region2]["cost"]
+                    storage = self.stat_graph.nodes[region2]["priceStorage"] * 3
+                    storage_cost_per_hour = storage / 24
+                    teven = net_cost / storage * 60 * 60 * 24
+
+                    best_ttl, calculated_cost = self.calc_evict_cost(
+                        region2,
+                        teven / 3600,
+                        net_cost,
+                        storage_cost_per_hour,
+                        stats,
+                    )
+                    self.counters.set(
+                        ("ttl", region, region2),
+                        self.find_min(best_ttl, teven, region2, stats[2]),
+                    )
+
     def name(self) -> str:
         return "skystore"
 
@@ -352,24 +323,17 @@ class SkyStore(PlacementPolicy):
             now_timestamp = datetime.fromtimestamp(
                 self.timestamps[idx] / 1000, tz=timezone.utc
             ).replace(tzinfo=None)
-            if self.seen_days is None or now_timestamp >= self.seen_days + timedelta(
-                hours=self.k
-            ):
-                for region in self.regions:
-                    for region2 in self.regions:
-                        if region != region2:
-                            net_cost = self.stat_graph[region][region2]["cost"]
-                            storage = self.stat_graph.nodes[region2]["priceStorage"] * 3
-                            storage_cost_per_hour = storage / 24
-                            teven = net_cost / storage * 60 * 60 * 24
-
-                            best_ttl, calculated_cost = self.calc_evict_cost(
-                                region2, teven / 3600, net_cost, storage_cost_per_hour
-                            )
-                            self.region_pairs_ttl[(region, region2)].append(
-                                self.find_min(best_ttl, teven, region2)
-                            )
-                self.seen_days = now_timestamp
+            now_sec = (now_timestamp - EPOCH).total_seconds()
+            if self.ttl_expired(now_sec):
+                # The shared lock (reentrant within a worker) keeps the other
+                # workers from recomputing and overwriting the TTLs meanwhile
+                with self.counters.shared.lock:
+                    # Merges, so the re-check sees another worker's seen_days
+                    stats = self.window_stats(now_timestamp)
+                    if self.ttl_expired(now_sec):
+                        self.update_ttls(stats)
+                        self.counters.set(("seen_days",), now_sec)
+                        self.discard_old_windows(now_timestamp)
 
             if fixed_base_region is True:
                 return -1
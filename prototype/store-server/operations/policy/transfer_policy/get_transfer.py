@@ -3,9 +3,35 @@ from operations.policy.transfer_policy.policy_closest import ClosestTransfer
 from operations.policy.transfer_policy.policy_direct import DirectTransfer
 from operations.policy.transfer_policy.base import TransferPolicy
 from operations.policy.transfer_policy.policy_manual import Manual
+from operations.utils.helper import policy_ultra_dict
+from typing import Dict
+
+# Policy instances by name, so requests don't rebuild them each time.
+# They are dropped when /update_policy bumps the shared policy generation.
+_transfer_policies: Dict[str, TransferPolicy] = {}
+_transfer_generation = None
 
 
 def get_transfer_policy(name: str) -> TransferPolicy:
+    global _transfer_generation
+    generation = policy_ultra_dict["generation"]
+    if generation != _transfer_generation:
+        clear_transfer_policies()
+        _transfer_generation = generation
+
+    policy = _transfer_policies.get(name)
+    if policy is None:
+        policy = create_transfer_policy(name)
+        _transfer_policies[name] = policy
+    return policy
+
+
+def clear_transfer_policies() -> None:
+    """Drop the cached instances, so the next request builds the policy anew"""
+    _transfer_policies.clear()
+
+
+def create_transfer_policy(name: str) -> TransferPolicy:
     if name == "cheapest":
         return CheapestTransfer()
     elif name == "closest":
@@ -2,6 +2,7 @@ from datetime import datetime
 from sqlalchemy import (
     Boolean,
     Column,
+    Computed,
     DateTime,
     Enum,
     ForeignKey,
@@ -10,6 +11,7 @@ from sqlalchemy import (
     Index,
     Float,
     UniqueConstraint,
+    text,
 )
 from sqlalchemy.orm import relationship
 from pydantic import BaseModel, Field, NonNegativeInt
@@ -17,6 +19,9 @@ from operations.utils.conf import Base, Status
 from sqlalchemy.dialects.postgresql import BIGINT
 from typing import Dict, List, Literal, Optional
 
+LISTING_INDEX_WHERE = "status = 'ready'"
+LISTING_INDEX_INCLUDE = ["delete_marker", "size", "etag", "last_modified"]
+
 
 class DBLogicalObject(Base):
     __tablename__ = "logical_objects"
@@ -60,9 +65,25 @@ class DBLogicalObject(Base):
 
     __table_args__ = (
         Index("ix_logical_objects_bucket_key_status", "bucket", "key", "status"),
+        # Keyset pagination of list_objects(_versioning): newest version first
+        # per key, only ready objects
+        Index(
+            "ix_logical_objects_listing",
+            "bucket",
+            "key",
+            id.desc(),
+            postgresql_where=text(LISTING_INDEX_WHERE),
+            postgresql_include=LISTING_INDEX_INCLUDE,
+        ),
     )
 
 
+EXPIRE_TIME_EXPRESSION = (
+    "CASE WHEN ttl = -1 THEN NULL "
+    "ELSE storage_start_time + ttl * interval '1 second' END"
+)
+
+
 class DBPhysicalObjectLocator(Base):
     __tablename__ = "physical_object_locators"
 
@@ -112,6 +133,10 @@ class DBPhysicalObjectLocator(Base):
     # Storage start time
     storage_start_time = Column(DateTime, nullable=True, default=None)
 
+    # Time the locator expires (NULL if kept forever), maintained by Postgres so
+    # the TTL sweeper can find expired locators through an index
+    expire_time = Column(DateTime, Computed(EXPIRE_TIME_EXPRESSION, persisted=True))
+
     # Add relationship to logical object
     logical_object_id = Column(
         Integer, ForeignKey("logical_objects.id"), nullable=False
@@ -127,6 +152,7 @@ class DBPhysicalObjectLocator(Base):
         Index(
             "ix_physical_object_locators_bucket_key_status", "bucket", "key", "status"
         ),
+        Index("ix_physical_object_locators_expire_time", "expire_time", "id"),
     )
 
 
@@ -157,6 +183,20 @@ class LocateObjectResponse(BaseModel):
     ttl: Optional[float] = None  # TTL you should set for the object (depends on policy)
 
 
+class LocateObjectsRequest(BaseModel):
+    objects: List[LocateObjectRequest]
+
+
+class LocateObjectsResult(BaseModel):
+    status_code: int
+    locator: Optional[LocateObjectResponse] = None
+    content: Optional[str] = None  # error message if status_code is not 200
+
+
+class LocateObjectsResponse(BaseModel):
+    results: List[LocateObjectsResult]  # in request order
+
+
 class DBLogicalMultipartUploadPart(Base):
     __tablename__ = "logical_multipart_upload_parts"
 
@@ -202,6 +242,26 @@ class DBMetrics(Base):
     op = Column(String, nullable=False)
 
 
+# Upper bounds (seconds) of the latency histogram buckets, the last bucket
+# (index len(LATENCY_BUCKETS)) holds everything above the largest bound
+LATENCY_BUCKETS = [0.001 * 2**i for i in range(20)]
+
+
+class DBMetricsHistogram(Base):
+    """Latency histogram per (request region, destination region, op)"""
+
+    __tablename__ = "metrics_histogram"
+
+    request_region = Column(String, primary_key=True)
+    destination_region = Column(String, primary_key=True)
+    op = Column(String, primary_key=True)
+    bucket = Column(Integer, primary_key=True)
+
+    count = Column(BIGINT, nullable=False, default=0)
+    latency_sum = Column(Float, nullable=False, default=0.0)
+    size_sum = Column(BIGINT, nullable=False, default=0)
+
+
 class StartUploadRequest(LocateObjectRequest):
     is_multipart: bool
     copy_src_bucket: Optional[str] = None
@@ -277,6 +337,9 @@ class ListObjectRequest(BaseModel):
     bucket: str
     prefix: Optional[str] = None
     start_after: Optional[str] = None
+    # with start_after, continue after this version of that key
+    # (list_objects_versioning only)
+    start_after_version_id: Optional[int] = None
     max_keys: Optional[int] = None
 
 
@@ -380,3 +443,30 @@ class Metrics(BaseModel):
     key: str
     size: NonNegativeInt = Field(..., minimum=0, format="int64")
     op: str
+
+
+class MetricsBatch(BaseModel):
+    metrics: List[Metrics]
+
+
+class LatencyBucket(BaseModel):
+    # None for the overflow bucket
+    le: Optional[float] = None
+    count: NonNegativeInt
+
+
+class LatencyHistogram(BaseModel):
+    request_region: str
+    destination_region: str
+    op: str
+    count: NonNegativeInt
+    mean_latency: float
+    total_size: NonNegativeInt = Field(..., minimum=0, format="int64")
+    buckets: List[LatencyBucket]
+
+
+class LocatorCacheStats(BaseModel):
+    hits: NonNegativeInt
+    misses: NonNegativeInt
+    invalidations: NonNegativeInt
+    size: NonNegativeInt
@@ -1,6 +1,7 @@
 import uuid
 from operations.schemas.object_schemas import DBLogicalObject
 from operations.utils.conf import Status
+from operations.utils.shared_state import open_ultra_dict
 from skyplane.obj_store.object_store_interface import ObjectStoreInterface
 import UltraDict as ud
 import time
@@ -13,26 +14,31 @@ import threading
 
 
 class TraceIdx:
+    """Trace replay position, shared by all uvicorn workers"""
+
     _instance = None
     _lock = threading.Lock()
 
     def __init__(self):
-        self._value = 0
+        self._shared = open_ultra_dict("trace_idx_ultra_dict")
+        with self._shared.lock:
+            if "idx" not in self._shared:
+                self._shared["idx"] = 0
 
     @classmethod
     def get_instance(cls):
         if cls._instance is None:
             with TraceIdx._lock:
-                cls._instance = TraceIdx()
+                if cls._instance is None:
+                    cls._instance = TraceIdx()
         return cls._instance
 
     def get(self) -> int:
-        with TraceIdx._lock:
-            return self._value
+        return self._shared["idx"]
 
     def increment(self) -> None:
-        with TraceIdx._lock:
-            self._value += 1
+        with self._shared.lock:
+            self._shared["idx"] = self._shared["idx"] + 1
 
 
 # Initialize a ultradict to store the policy name in shared memory
@@ -46,6 +52,8 @@ except Exception:
 
 policy_ultra_dict["get_policy"] = ""
 policy_ultra_dict["put_policy"] = ""
+# Bumped by /update_policy, so that every worker drops its cached policies
+policy_ultra_dict["generation"] = 0
 
 # Default values for the environment variables
 init_region_tags = (
@@ -0,0 +1,267 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+from operations.utils.conf import Status
+from operations.utils.shared_state import open_ultra_dict
+import os
+import threading
+import time
+import zlib
+
+"""
+    In-process cache of locate_object lookups.
+
+    `locate_object` resolves (bucket, key, version) to the newest logical object
+    that still has a ready, unexpired physical locator, plus all its locators.
+    The result is cached here as plain snapshots (not ORM instances, which
+    cannot be used outside their session) and re-validated against the locator
+    TTLs on every hit, so expiry needs no invalidation. Every endpoint that
+    changes the locators of a key (start_upload/complete_upload,
+    start_delete_objects/complete_delete_objects, clean_object) invalidates it
+    after its commit.
+
+    The entries are per worker process, but invalidations are shared by all
+    uvicorn workers: they bump a generation counter in a shared UltraDict (one
+    per stripe of keys, one per bucket and a global one). A lookup reads the
+    generation before it queries the database and `put` only caches the result
+    if the generation has not moved since, and a hit is only served while the
+    generation it was cached under is current. So a write handled by any worker
+    is seen by the next read of every worker, and a lookup racing with an
+    invalidation is not cached. Entries also expire after LOCATOR_CACHE_MAX_AGE
+    seconds. LOCATOR_CACHE_SIZE=0 disables the cache.
+"""
+
+LOCATOR_CACHE_SIZE = int(os.getenv("LOCATOR_CACHE_SIZE", "10000"))
+LOCATOR_CACHE_MAX_AGE = float(os.getenv("LOCATOR_CACHE_MAX_AGE", "5"))
+LOCATOR_CACHE_STRIPES = int(os.getenv("LOCATOR_CACHE_STRIPES", "4096"))
+
+GLOBAL_GENERATION = "*"
+
+Generation = Tuple[int, ...]
+
+
+class CachedLogicalObject:
+    __slots__ = (
+        "id",
+        "bucket",
+        "key",
+        "size",
+        "last_modified",
+        "etag",
+        "delete_marker",
+        "base_region",
+        "physical_object_locators",
+    )
+
+    def __init__(self, logical_object):
+        for name in self.__slots__[:-1]:
+            setattr(self, name, getattr(logical_object, name))
+        self.physical_object_locators = [
+            CachedPhysicalObjectLocator(locator, self)
+            for locator in logical_object.physical_object_locators
+        ]
+
+    def is_alive(self, timestamp: datetime) -> bool:
+        return any(
+            locator.is_alive(timestamp) for locator in self.physical_object_locators
+        )
+
+
+class CachedPhysicalObjectLocator:
+    """Snapshot of a DBPhysicalObjectLocator, usable by the transfer policies"""
+
+    __slots__ = (
+        "id",
+        "location_tag",
+        "cloud",
+        "region",
+        "bucket",
+        "key",
+        "status",
+        "is_primary",
+        "version_id",
+        "ttl",
+        "storage_start_time",
+        "logical_object",
+    )
+
+    def __init__(self, locator, logical_object: CachedLogicalObject):
+        for name in self.__slots__[:-1]:
+            setattr(self, name, getattr(locator, name))
+        self.logical_object = logical_object
+
+    def is_alive(self, timestamp: datetime) -> bool:
+        """Ready and not expired at `timestamp` (same condition as the SQL lookup)"""
+        if self.status != Status.ready:
+            return False
+        if self.ttl == -1:
+            return True
+        return (
+            self.storage_start_time is not None
+            and self.ttl is not None
+            and self.storage_start_time + timedelta(seconds=self.ttl) >= timestamp
+        )
+
+    def __repr__(self):
+        return f"CachedPhysicalObjectLocator(id={self.id}, location_tag={self.location_tag}, status={self.status}, ttl={self.ttl})"
+
+
+class LocatorCache:
+    """Bounded LRU of (bucket, key) -> {version_id: (cached_at, generation, logical object)}"""
+
+    def __init__(
+        self,
+        max_size: int,
+        max_age: float,
+        stripes: int = LOCATOR_CACHE_STRIPES,
+        generations_name: str = "locator_cache_generations",
+    ):
+        self.max_size = max_size
+        self.max_age = max_age
+        self.stripes = stripes
+        # (bucket, key) -> {version_id: (cached_at, generation, logical object)}
+        self._entries: OrderedDict = OrderedDict()
+        self._version_enabled: Dict[str, Tuple[float, Generation, Optional[bool]]] = {}
+        self._lock = threading.Lock()
+        # Shared by all workers: generation key -> number of invalidations
+        self._generations = open_ultra_dict(generations_name) if max_size > 0 else None
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _stripe(self, bucket: str, key: str) -> int:
+        # crc32 rather than hash(): str hashes differ between worker processes
+        return zlib.crc32(f"{bucket}/{key}".encode()) % self.stripes
+
+    def generation(self, bucket: str, key: Optional[str] = None) -> Generation:
+        """Read before querying the database, and pass to `put`"""
+        if self._generations is None:
+            return ()
+        generations = self._generations
+        generation = (
+            generations.get(GLOBAL_GENERATION, 0),
+            generations.get(("bucket", bucket), 0),
+        )
+        if key is not None:
+            generation += (generations.get(self._stripe(bucket, key), 0),)
+        return generation
+
+    def _bump(self, generation_key):
+        with self._generations.lock:
+            self._generations[generation_key] = (
+                self._generations.get(generation_key, 0) + 1
+            )
+
+    def get(
+        self, bucket: str, key: str, version_id: Optional[int], timestamp: datetime
+    ) -> Optional[CachedLogicalObject]:
+        if self.max_size <= 0:
+            return None
+        generation = self.generation(bucket, key)
+        with self._lock:
+            versions = self._entries.get((bucket, key))
+            entry = versions.get(version_id) if versions is not None else None
+            if entry is not None:
+                cached_at, cached_generation, logical_object = entry
+                if (
+                    cached_generation == generation
+                    and time.monotonic() - cached_at <= self.max_age
+                    and logical_object.is_alive(timestamp)
+                ):
+                    self._entries.move_to_end((bucket, key))
+                    self.hits += 1
+                    return logical_object
+                # Invalidated, too old, or all its locators expired: an older
+                # version may be the answer now, let the database decide
+                del versions[version_id]
+                if not versions:
+                    del self._entries[(bucket, key)]
+            self.misses += 1
+            return None
+
+    def put(
+        self,
+        bucket: str,
+        key: str,
+        version_id: Optional[int],
+        logical_object,
+        generation: Generation,
+    ) -> CachedLogicalObject:
+        """Cache `logical_object`, read at `generation`, unless it was invalidated since"""
+        cached = CachedLogicalObject(logical_object)
+        if self.max_size <= 0 or generation != self.generation(bucket, key):
+            return cached
+        with self._lock:
+            versions = self._entries.setdefault((bucket, key), {})
+            versions[version_id] = (time.monotonic(), generation, cached)
+            self._entries.move_to_end((bucket, key))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return cached
+
+    def get_version_enabled(self, bucket: str) -> Tuple[bool, Optional[bool]]:
+        """Returns (found, version_enabled)"""
+        if self.max_size <= 0:
+            return False, None
+        generation = self.generation(bucket)
+        with self._lock:
+            entry = self._version_enabled.get(bucket)
+            if (
+                entry is not None
+                and entry[1] == generation
+                and time.monotonic() - entry[0] <= self.max_age
+            ):
+                return True, entry[2]
+            return False, None
+
+    def put_version_enabled(
+        self, bucket: str, version_enabled: Optional[bool], generation: Generation
+    ):
+        if self.max_size <= 0 or generation != self.generation(bucket):
+            return
+        with self._lock:
+            self._version_enabled[bucket] = (
+                time.monotonic(),
+                generation,
+                version_enabled,
+            )
+
+    def invalidate(self, bucket: str, key: str):
+        if self.max_size <= 0:
+            return
+        self._bump(self._stripe(bucket, key))
+        with self._lock:
+            if self._entries.pop((bucket, key), None) is not None:
+                self.invalidations += 1
+
+    def invalidate_bucket(self, bucket: str):
+        if self.max_size <= 0:
+            return
+        self._bump(("bucket", bucket))
+        with self._lock:
+            self._version_enabled.pop(bucket, None)
+            for entry in [entry for entry in self._entries if entry[0] == bucket]:
+                del self._entries[entry]
+                self.invalidations += 1
+
+    def clear(self):
+        if self.max_size <= 0:
+            return
+        self._bump(GLOBAL_GENERATION)
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._version_enabled.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "size": len(self._entries),
+            }
+
+
+locator_cache = LocatorCache(LOCATOR_CACHE_SIZE, LOCATOR_CACHE_MAX_AGE)
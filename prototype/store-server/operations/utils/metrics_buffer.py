@@ -0,0 +1,152 @@
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Tuple
+from sqlalchemy import insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from operations.schemas.object_schemas import (
+    DBMetrics,
+    DBMetricsHistogram,
+    LATENCY_BUCKETS,
+    Metrics,
+)
+from operations.utils.db import async_session, logger
+import asyncio
+import os
+
+"""
+    Buffered ingestion of proxy metrics.
+
+    /update_metrics used to insert and commit one DBMetrics row per call. The
+    endpoints now only append to this per-worker buffer, which is written in
+    one transaction with multi-row inserts once METRICS_FLUSH_SIZE rows are
+    pending or every METRICS_FLUSH_INTERVAL seconds, and on shutdown.
+
+    The same flush adds the rows to the metrics_histogram table (latency
+    histogram per request region, destination region and op, see
+    LATENCY_BUCKETS), so latency distributions can be read without scanning
+    the raw metrics table. Metrics are best effort: if a flush fails the rows
+    are kept for the next one, up to METRICS_BUFFER_MAX rows.
+"""
+
+METRICS_FLUSH_SIZE = int(os.getenv("METRICS_FLUSH_SIZE", "1000"))
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "1"))
+METRICS_BUFFER_MAX = int(os.getenv("METRICS_BUFFER_MAX", "100000"))
+
+HistogramKey = Tuple[str, str, str, int]
+
+
+def latency_bucket(latency: float) -> int:
+    return bisect_left(LATENCY_BUCKETS, latency)
+
+
+class MetricsBuffer:
+    def __init__(self, flush_size: int, flush_interval: float, max_rows: int):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_rows = max_rows
+
+        self.rows: List[dict] = []
+        # key -> [count, latency_sum, size_sum]
+        self.histogram: Dict[HistogramKey, list] = defaultdict(lambda: [0, 0.0, 0])
+        self.dropped = 0
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+
+    def add(self, metrics: List[Metrics]):
+        for metric in metrics:
+            if len(self.rows) >= self.max_rows:
+                self.dropped += 1
+                continue
+            row = metric.dict()
+            self.rows.append(row)
+            self._add_to_histogram(self.histogram, [row])
+        if len(self.rows) >= self.flush_size:
+            self._wakeup.set()
+
+    @staticmethod
+    def _add_to_histogram(histogram: Dict[HistogramKey, list], rows: List[dict]):
+        for row in rows:
+            entry = histogram[
+                (
+                    row["request_region"],
+                    row["destination_region"],
+                    row["op"],
+                    latency_bucket(row["latency"]),
+                )
+            ]
+            entry[0] += 1
+            entry[1] += row["latency"]
+            entry[2] += row["size"]
+
+    async def flush(self):
+        async with self._flush_lock:
+            rows, self.rows = self.rows, []
+            histogram, self.histogram = self.histogram, defaultdict(lambda: [0, 0.0, 0])
+            if not rows:
+                return
+
+            # Sorted so that concurrent flushes of several workers lock the
+            # histogram rows in the same order
+            histogram_rows = [
+                {
+                    "request_region": request_region,
+                    "destination_region": destination_region,
+                    "op": op,
+                    "bucket": bucket,
+                    "count": count,
+                    "latency_sum": latency_sum,
+                    "size_sum": size_sum,
+                }
+                for (request_region, destination_region, op, bucket), (
+                    count,
+                    latency_sum,
+                    size_sum,
+                ) in sorted(histogram.items())
+            ]
+            upsert = pg_insert(DBMetricsHistogram)
+            upsert = upsert.on_conflict_do_update(
+                index_elements=[
+                    DBMetricsHistogram.request_region,
+                    DBMetricsHistogram.destination_region,
+                    DBMetricsHistogram.op,
+                    DBMetricsHistogram.bucket,
+                ],
+                set_={
+                    "count": DBMetricsHistogram.count + upsert.excluded.count,
+                    "latency_sum": DBMetricsHistogram.latency_sum
+                    + upsert.excluded.latency_sum,
+                    "size_sum": DBMetricsHistogram.size_sum + upsert.excluded.size_sum,
+                },
+            )
+
+            try:
+                async with async_session() as db:
+                    await db.execute(insert(DBMetrics), rows)
+                    await db.execute(upsert, histogram_rows)
+                    await db.commit()
+            except Exception as e:
+                logger.error(f"Failed to flush {len(rows)} metrics: {e}")
+                self._requeue(rows)
+
+    def _requeue(self, rows: List[dict]):
+        keep = max(0, self.max_rows - len(self.rows))
+        if keep < len(rows):
+            self.dropped += len(rows) - keep
+            logger.warning(f"Metrics buffer full, dropped {len(rows) - keep} rows")
+            rows = rows[len(rows) - keep :]
+        self.rows[:0] = rows
+        self._add_to_histogram(self.histogram, rows)
+
+    async def run(self, stop: asyncio.Event):
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+
+metrics_buffer = MetricsBuffer(
+    METRICS_FLUSH_SIZE, METRICS_FLUSH_INTERVAL, METRICS_BUFFER_MAX
+)
@@ -0,0 +1,98 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Dict, List
+from operations.utils.db import logger
+from operations.utils.helper import create_object_store_interface
+import asyncio
+import os
+import time
+
+"""
+    Concurrent physical deletes across regions.
+
+    Keys are deleted in chunks of at most the provider's batch size, and all
+    chunks of all regions run concurrently on a shared thread pool (the object
+    store clients are blocking). A chunk that fails is retried with backoff,
+    and if it still fails its keys are retried one by one, so a partially
+    applied batch only leaves the keys that really could not be deleted.
+    Interfaces are created once per region and reused across sweeps.
+"""
+
+# Max keys per delete request: S3 DeleteObjects, GCS batch requests, Azure blob batch
+DELETE_BATCH_SIZE = {"aws": 1000, "gcp": 100, "azure": 256}
+DELETE_WORKERS = int(os.getenv("DELETE_WORKERS", "16"))
+DELETE_RETRIES = int(os.getenv("DELETE_RETRIES", "3"))
+DELETE_RETRY_BACKOFF = float(os.getenv("DELETE_RETRY_BACKOFF", "0.5"))
+
+_executor = ThreadPoolExecutor(max_workers=DELETE_WORKERS, thread_name_prefix="delete")
+
+
+@lru_cache(maxsize=None)
+def get_object_store_interface(region: str):
+    return create_object_store_interface(region)
+
+
+def delete_chunk(interface_factory: Callable, tag: str, keys: List[str]) -> List[str]:
+    """Delete one batch of keys in one region, returns the keys that failed"""
+    error = None
+    for attempt in range(DELETE_RETRIES + 1):
+        try:
+            interface_factory(tag).delete_objects(keys)
+            return []
+        except Exception as e:
+            error = e
+            if attempt < DELETE_RETRIES:
+                time.sleep(DELETE_RETRY_BACKOFF * 2**attempt)
+
+    if len(keys) == 1:
+        logger.error(f"Failed to delete {keys[0]} in {tag}: {error}")
+        return keys
+
+    # Part of the batch may have been deleted, find the keys that were not
+    failed = []
+    for key in keys:
+        try:
+            interface_factory(tag).delete_objects([key])
+        except Exception as e:
+            logger.error(f"Failed to delete {key} in {tag}: {e}")
+            failed.append(key)
+    return failed
+
+
+async def delete_objects_in_regions(
+    keys_by_tag: Dict[str, List[str]],
+    interface_factory: Callable = get_object_store_interface,
+) -> Dict[str, List[str]]:
+    """
+    Delete keys from the object store of each region (location tag)
+    concurrently.
+
+    Args:
+        keys_by_tag: keys to delete per location tag
+        interface_factory: returns the object store interface of a location tag
+
+    Returns:
+        Dict[str, List[str]]: keys that could not be deleted, per location tag
+    """
+    loop = asyncio.get_running_loop()
+    tags = []
+    chunks = []
+    for tag, keys in keys_by_tag.items():
+        batch_size = DELETE_BATCH_SIZE.get(tag.split(":")[0], 1000)
+        for i in range(0, len(keys), batch_size):
+            tags.append(tag)
+            chunks.append(
+                loop.run_in_executor(
+                    _executor,
+                    delete_chunk,
+                    interface_factory,
+                    tag,
+                    keys[i : i + batch_size],
+                )
+            )
+
+    failed = {}
+    for tag, failed_keys in zip(tags, await asyncio.gather(*chunks)):
+        if failed_keys:
+            failed.setdefault(tag, []).extend(failed_keys)
+    return failed
@@ -0,0 +1,107 @@
+from collections import defaultdict
+from typing import Callable, Dict, Hashable
+import UltraDict as ud
+import os
+import threading
+import time
+
+"""
+    Policy state shared by the uvicorn workers of the store server.
+
+    Every worker is a separate process, so in-process singletons split the
+    state of stateful policies (SkyStore's access histograms, counters) between
+    workers. `SharedCounters` keeps additive statistics in a shared-memory
+    UltraDict: a worker accumulates its updates locally and merges them into
+    the shared dict under its cross-process lock every SHARED_MERGE_EVERY
+    updates or SHARED_MERGE_INTERVAL seconds, then refreshes its view of the
+    merged totals. Reads see the merged totals plus the worker's own pending
+    updates.
+"""
+
+SHARED_MERGE_EVERY = int(os.getenv("SHARED_MERGE_EVERY", "100"))
+SHARED_MERGE_INTERVAL = float(os.getenv("SHARED_MERGE_INTERVAL", "1"))
+
+
+def open_ultra_dict(name: str, **kwargs) -> ud.UltraDict:
+    """Create the shared dict `name`, or attach to it if another worker did"""
+    try:
+        return ud.UltraDict(name=name, create=True, shared_lock=True, **kwargs)
+    except ud.Exceptions.AlreadyExists:
+        # Give the worker that created it time to initialize it
+        time.sleep(3)
+        return ud.UltraDict(name=name, create=False, shared_lock=True, **kwargs)
+
+
+class SharedCounters:
+    def __init__(
+        self,
+        name: str,
+        merge_every: int = SHARED_MERGE_EVERY,
+        merge_interval: float = SHARED_MERGE_INTERVAL,
+    ):
+        self.shared = open_ultra_dict(name)
+        self.merge_every = merge_every
+        self.merge_interval = merge_interval
+
+        self._lock = threading.Lock()
+        self._pending: Dict[Hashable, float] = defaultdict(float)
+        self._updates = 0
+        self._merged: Dict[Hashable, float] = {}
+        self._last_merge = time.monotonic()
+
+    def add(self, key: Hashable, delta: float):
+        with self._lock:
+            self._pending[key] += delta
+            self._updates += 1
+        if (
+            self._updates >= self.merge_every
+            or time.monotonic() - self._last_merge >= self.merge_interval
+        ):
+            self.merge()
+
+    def get(self, key: Hashable, default: float = 0) -> float:
+        with self._lock:
+            if key not in self._merged and key not in self._pending:
+                return default
+            return self._merged.get(key, 0) + self._pending.get(key, 0)
+
+    def items(self):
+        """Snapshot of all (key, total) pairs"""
+        with self._lock:
+            totals = dict(self._merged)
+            for key, delta in self._pending.items():
+                totals[key] = totals.get(key, 0) + delta
+        return totals.items()
+
+    def merge(self):
+        """Push pending updates to shared memory and refresh the merged totals"""
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(float)
+            self._updates = 0
+            self._last_merge = time.monotonic()
+        with self.shared.lock:
+            for key, delta in pending.items():
+                self.shared[key] = self.shared.get(key, 0) + delta
+            merged = dict(self.shared.items())
+        with self._lock:
+            self._merged = merged
+
+    def discard(self, stale: Callable[[Hashable], bool]):
+        """Delete the shared values, and pending updates, of the `stale` keys"""
+        with self.shared.lock:
+            keys = [key for key in self.shared.keys() if stale(key)]
+            for key in keys:
+                del self.shared[key]
+        with self._lock:
+            for key in keys:
+                self._merged.pop(key, None)
+            for key in [key for key in self._pending if stale(key)]:
+                del self._pending[key]
+
+    def set(self, key: Hashable, value: float):
+        """Overwrite a shared value right away (not additive, not batched)"""
+        with self.shared.lock:
+            self.shared[key] = value
+        with self._lock:
+            self._pending.pop(key, None)
+            self._merged[key] = value
@@ -0,0 +1,155 @@
+import csv
+import argparse
+import heapq
+import marshal
+import os
+import tempfile
+from operator import itemgetter
+
+#######################################################################################################################
+## This script sorts a csv trace by its timestamp (first column) with a fixed amount of memory.
+## Rows are read in runs of RUN_ROWS rows, each run is sorted in memory and spilled to a temporary
+## file, and the runs are then merged with a k-way heap merge (at most MAX_FAN_IN runs at a time).
+## Timestamps are parsed once, when a row is read; runs store the parsed timestamp with the row.
+## The sort is stable: rows with the same timestamp keep their order in the input file, as with
+## the in-memory `list.sort` it replaces.
+#######################################################################################################################
+
+RUN_ROWS = 1_000_000
+MAX_FAN_IN = 128
+
+
+def parse_timestamp(value: str):
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+def write_run(records: list, tmp_dir: str) -> str:
+    """Spill sorted (timestamp, row) records, returns the run path"""
+    run_file = tempfile.NamedTemporaryFile(
+        "wb", dir=tmp_dir, suffix=".run", delete=False
+    )
+    with run_file:
+        for record in records:
+            marshal.dump(record, run_file)
+    return run_file.name
+
+
+def read_run(run_path: str):
+    with open(run_path, "rb") as run_file:
+        while True:
+            try:
+                yield marshal.load(run_file)
+            except EOFError:
+                return
+
+
+def merge_runs(run_paths: list):
+    # heapq.merge is stable: ties are yielded in the order of the runs
+    return heapq.merge(*[read_run(path) for path in run_paths], key=itemgetter(0))
+
+
+def read_sorted_trace(path: str, delimiter: str = ","):
+    with open(path, "r", newline="") as infile:
+        for row in csv.reader(infile, delimiter=delimiter):
+            if row:
+                yield parse_timestamp(row[0]), row
+
+
+def merge_sorted_traces(
+    in_paths: list, out_path: str, header_row: list = None, delimiter: str = ","
+):
+    """Merge csv traces that are each sorted by timestamp (without header)"""
+    sorted_records = heapq.merge(
+        *[read_sorted_trace(path, delimiter) for path in in_paths], key=itemgetter(0)
+    )
+    with open(out_path, "w", newline="") as outfile:
+        writer = csv.writer(outfile, delimiter=delimiter)
+        if header_row is not None:
+            writer.writerow(header_row)
+        for _, row in sorted_records:
+            writer.writerow(row)
+
+
+def sort_trace(
+    in_path: str,
+    out_path: str,
+    header: bool = True,
+    delimiter: str = ",",
+    run_rows: int = RUN_ROWS,
+    max_fan_in: int = MAX_FAN_IN,
+):
+    """Write the rows of `in_path` sorted by timestamp to `out_path`"""
+    tmp_dir = os.path.dirname(os.path.abspath(out_path))
+    run_paths = []
+    try:
+        with open(in_path, "r", newline="") as infile:
+            reader = csv.reader(infile, delimiter=delimiter)
+            header_row = next(reader, None) if header else None
+
+            records = []
+            for row in reader:
+                if not row:
+                    continue
+                records.append((parse_timestamp(row[0]), row))
+                if len(records) >= run_rows:
+                    records.sort(key=itemgetter(0))
+                    run_paths.append(write_run(records, tmp_dir))
+                    records = []
+            records.sort(key=itemgetter(0))
+
+        if run_paths and records:
+            run_paths.append(write_run(records, tmp_dir))
+            records = []
+
+        # Merge in passes of at most max_fan_in runs to bound open files
+        while len(run_paths) > max_fan_in:
+            merged_paths = []
+            for i in range(0, len(run_paths), max_fan_in):
+                group = run_paths[i : i + max_fan_in]
+                merged_paths.append(write_run(merge_runs(group), tmp_dir))
+                for path in group:
+                    os.remove(path)
+            run_paths = merged_paths
+
+        sorted_records = merge_runs(run_paths) if run_paths else records
+        with open(out_path, "w", newline="") as outfile:
+            writer = csv.writer(outfile, delimiter=delimiter)
+            if header_row is not None:
+                writer.writerow(header_row)
+            for _, row in sorted_records:
+                writer.writerow(row)
+    finally:
+        for path in run_paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sort a trace by timestamp")
+    parser.add_argument("trace_file", help="Path to the trace (csv)")
+    parser.add_argument("out_file", help="Path of the sorted trace")
+    parser.add_argument(
+        "--no_header", action="store_true", help="the trace has no header line"
+    )
+    parser.add_argument("--delimiter", default=",", help="csv delimiter")
+    parser.add_argument(
+        "--run_rows",
+        type=int,
+        default=RUN_ROWS,
+        help="rows sorted in memory per run",
+    )
+    args = parser.parse_args()
+    sort_trace(
+        args.trace_file,
+        args.out_file,
+        header=not args.no_header,
+        delimiter=args.delimiter,
+        run_rows=args.run_rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
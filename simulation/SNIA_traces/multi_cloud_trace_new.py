@@ -1,11 +1,13 @@
 import csv
 import argparse
 from typing import List
-import pandas as pd
 import yaml
 import random
 from multi_cloud_trace import add_region
 import parser_data
+from external_sort import sort_trace
+from sharded_gen import generate_sharded
+import os
 
 #######################################################################################################################
 ## This script transforms a basic trace into a multi-cloud trace
@@ -232,31 +234,8 @@ def fill_config_obj(config, type_obj):
     return config_obj
 
 
-########## Main  ###########
-
-
-def main():
-    parser = argparse.ArgumentParser(
-        description="Create a multi cloud trace from a trace"
-    )
-    parser.add_argument("obj_file", help="Path to the trace filei in a pickle format")
-    parser.add_argument("config_file", help="Path to the YAML config file")
-    parser.add_argument(
-        "save_mc_file", default=None, help="The output PATH of the multi cloud trace"
-    )
-    parser.add_argument(
-        "--with_range_rd", action="store_true", help="add range read to the trace"
-    )
-    args = parser.parse_args()
-
-    file_handler = open(args.save_mc_file, "w")
-    csv_writer = csv.writer(file_handler)
-    #    csv_writer.writerow(["timestamp", "ops" , "issue_region" , "obj_key", "size"])
-    print("loading input trace")
-    obj_dict, tot_op = parser_data.load_obj_dict(args.obj_file)
-    print("finish loading input trace")
-    config_dict = load_ymal(args.config_file)
-    for key in obj_dict.keys():
+def write_objects(obj_dict, keys, config_dict, csv_writer):
+    for key in keys:
         name = key
         puts_gets = only_put_gets(obj_dict[key])
         if len(puts_gets) == 0:
@@ -281,13 +260,66 @@ def main():
         obj.type_handler()
         #        print (obj.regions)
         obj.write_obj(csv_writer)
+
+
+########## Main  ###########
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Create a multi cloud trace from a trace"
+    )
+    parser.add_argument("obj_file", help="Path to the trace filei in a pickle format")
+    parser.add_argument("config_file", help="Path to the YAML config file")
+    parser.add_argument(
+        "save_mc_file", default=None, help="The output PATH of the multi cloud trace"
+    )
+    parser.add_argument(
+        "--with_range_rd", action="store_true", help="add range read to the trace"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="generate the trace in shards on this many processes",
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=None,
+        help="number of shards (default: --workers), the output depends on it",
+    )
+    args = parser.parse_args()
+
+    print("loading input trace")
+    obj_dict, tot_op = parser_data.load_obj_dict(args.obj_file)
+    print("finish loading input trace")
+    config_dict = load_ymal(args.config_file)
+
+    num_shards = args.shards or args.workers
+    if num_shards > 1:
+        # The trace has no header line, all the rows are sorted
+        generate_sharded(
+            lambda keys, csv_writer: write_objects(
+                obj_dict, keys, config_dict, csv_writer
+            ),
+            list(obj_dict.keys()),
+            args.save_mc_file,
+            num_shards=num_shards,
+            workers=args.workers,
+        )
+        return
+
+    file_handler = open(args.save_mc_file + "temp", "w")
+    csv_writer = csv.writer(file_handler)
+    #    csv_writer.writerow(["timestamp", "ops" , "issue_region" , "obj_key", "size"])
+    write_objects(obj_dict, obj_dict.keys(), config_dict, csv_writer)
     file_handler.close()
 
-    df = pd.read_csv(args.save_mc_file)
-    # Step 2: Sort the DataFrame by the first column ('timestamp')
-    df_sorted = df.sort_values(by=df.columns[0])
-    # Step 3: Write the sorted DataFrame back to a CSV file
-    df_sorted.to_csv(args.save_mc_file, index=False)
+    # Sort by timestamp with bounded memory (external merge sort). As with
+    # the previous pd.read_csv, the first line is kept on top as the header.
+    sort_trace(args.save_mc_file + "temp", args.save_mc_file)
+    os.remove(args.save_mc_file + "temp")
 
 
 if __name__ == "__main__":
@@ -4,7 +4,9 @@ from typing import Dict, List
 import yaml
 import random
 import parser_data
-from collections import defaultdict
+from next_access import annotate_next_access
+from external_sort import sort_trace
+from sharded_gen import generate_sharded
 from datetime import datetime
 import os
 
@@ -339,6 +341,31 @@ def list_of_timestamp_ops(obj_items: list):
     return list_timestamp, list_ops
 
 
+def write_objects(obj_dict, keys, type_obj: TraceType, config_dict, csv_writer):
+    for key in keys:
+        name = key
+        puts_gets = only_put_gets(obj_dict[key])
+        if len(puts_gets) == 0:
+            continue
+        size = puts_gets[0][2]
+        list_timestamp, list_ops = list_of_timestamp_ops(puts_gets)
+        config_obj = config_dict.copy()
+        # if config_dict["TYPE"] == "typeF":
+        #     # choose one type for this OBJ
+        #     type_obj = random.choices(config_dict["TYPES"], config_dict["TYPES_PROB"], k=1)[0]
+        #    config_obj = fill_config_obj(config_obj, type_obj)
+        obj = Object(
+            name=name,
+            size=size,
+            ops=list_ops,
+            access_times=list_timestamp,
+            config=config_obj,
+        )
+        obj.add_init_put()
+        obj.update_regions_list(type_obj)
+        obj.write_obj(csv_writer)
+
+
 ########## Main  ###########
 
 
@@ -357,11 +384,20 @@ def main():
     parser.add_argument(
         "--augment", default=False, help="also create an augmented trace"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="generate the trace in shards on this many processes",
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=None,
+        help="number of shards (default: --workers), the output depends on it",
+    )
     args = parser.parse_args()
 
-    file_handler = open(args.save_mc_file + "temp", "w")
-    csv_writer = csv.writer(file_handler)
-    #    csv_writer.writerow(["timestamp", "ops" , "issue_region" , "obj_key", "size"])
     print("loading input trace")
     obj_dict, tot_op = parser_data.load_obj_dict(args.obj_file)
     print("finish loading input trace")
@@ -385,117 +421,37 @@ def main():
     else:
         raise Exception("Wrong trace type")
 
-    file_handler.write("timestamp,op,issue_region,obj_key,size\n")
-
-    for key in obj_dict.keys():
-        name = key
-        puts_gets = only_put_gets(obj_dict[key])
-        if len(puts_gets) == 0:
-            continue
-        size = puts_gets[0][2]
-        list_timestamp, list_ops = list_of_timestamp_ops(puts_gets)
-        config_obj = config_dict.copy()
-        # if config_dict["TYPE"] == "typeF":
-        #     # choose one type for this OBJ
-        #     type_obj = random.choices(config_dict["TYPES"], config_dict["TYPES_PROB"], k=1)[0]
-        #    config_obj = fill_config_obj(config_obj, type_obj)
-        obj = Object(
-            name=name,
-            size=size,
-            ops=list_ops,
-            access_times=list_timestamp,
-            config=config_obj,
+    num_shards = args.shards or args.workers
+    if num_shards > 1:
+        # type_obj is created above, before forking, so that randomly drawn
+        # groups (typeC) are the same in every shard
+        generate_sharded(
+            lambda keys, csv_writer: write_objects(
+                obj_dict, keys, type_obj, config_dict, csv_writer
+            ),
+            list(obj_dict.keys()),
+            args.save_mc_file,
+            header_row=["timestamp", "op", "issue_region", "obj_key", "size"],
+            num_shards=num_shards,
+            workers=args.workers,
         )
-        obj.add_init_put()
-        obj.update_regions_list(type_obj)
-        obj.write_obj(csv_writer)
-    file_handler.close()
-
-    with open(args.save_mc_file + "temp", mode="r", newline="") as file:
-        reader = csv.reader(file)
-        header = next(reader)  # Read the header
-        data = list(reader)  # Read the rest of the data
-
-    # Sort the data by the timestamp in the first column
-    data.sort(key=lambda row: float(row[0]))
+    else:
+        file_handler = open(args.save_mc_file + "temp", "w")
+        csv_writer = csv.writer(file_handler)
+        file_handler.write("timestamp,op,issue_region,obj_key,size\n")
+        write_objects(obj_dict, obj_dict.keys(), type_obj, config_dict, csv_writer)
+        file_handler.close()
 
-    # Write the sorted data back to a new CSV file
-    with open(args.save_mc_file, mode="w", newline="") as file:
-        writer = csv.writer(file)
-        writer.writerow(header)  # Write the header
-        writer.writerows(data)  # Write the sorted data
+        # Sort by timestamp with bounded memory (external merge sort)
+        sort_trace(args.save_mc_file + "temp", args.save_mc_file)
 
-    # delete args.save_mc_file + "temp"
-    os.remove(args.save_mc_file + "temp")
+        # delete args.save_mc_file + "temp"
+        os.remove(args.save_mc_file + "temp")
 
     if args.augment:  # augment if needed
-        # First pass: collect information
-        print("start first pass")
-        obj_accesses = defaultdict(list)
-        obj_access_region = {}
-        with open(args.save_mc_file, "r") as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                timestamp = int(row["timestamp"])
-                obj_key = row["obj_key"]
-                issue_region = row["issue_region"]
-                obj_accesses[obj_key].append(timestamp)
-                if obj_key not in obj_access_region:
-                    obj_access_region[obj_key] = defaultdict(list)
-                obj_access_region[obj_key][issue_region].append(timestamp)
-        print("fin first pass")
-
-        # Second pass: calculate and write output
-        with open(args.save_mc_file, "r") as infile, open(
-            args.save_mc_file + ".aug", "w", newline=""
-        ) as outfile:
-            reader = csv.DictReader(infile)
-            fieldnames = reader.fieldnames + [
-                "time_to_next_access",
-                "time_to_next_access_same_reg",
-            ]
-            writer = csv.DictWriter(outfile, fieldnames=fieldnames)
-            writer.writeheader()
-
-            current_index = defaultdict(int)  # obj_key -> current index
-            current_index_region = {}  # obj_key -> region -> current index
-
-            for row in reader:
-                timestamp = int(row["timestamp"])
-                obj_key = row["obj_key"]
-                issue_region = row["issue_region"]
-
-                accesses = obj_accesses[obj_key]
-                accesses_reg = obj_access_region[obj_key][issue_region]
-                idx = current_index[obj_key]
-                if obj_key not in current_index_region:
-                    current_index_region[obj_key] = defaultdict(int)
-                reg_idx = current_index_region[obj_key][issue_region]
-
-                # Time to next access
-                if idx < len(accesses) - 1:
-                    time_to_next = accesses[idx + 1]
-                else:
-                    time_to_next = None
-
-                # Time to next access in different region
-                # Time to next access
-                if reg_idx < len(accesses_reg) - 1:
-                    time_to_next_sm_reg = accesses_reg[reg_idx + 1]
-                else:
-                    time_to_next_sm_reg = None
-
-                current_index[obj_key] += 1
-                current_index_region[obj_key][issue_region] += 1
-
-                row["time_to_next_access"] = (
-                    time_to_next if time_to_next is not None else -1
-                )
-                row["time_to_next_access_same_reg"] = (
-                    time_to_next_sm_reg if time_to_next_sm_reg is not None else -1
-                )
-
-                writer.writerow(row)
+        print("start augmenting")
+        annotate_next_access(args.save_mc_file, args.save_mc_file + ".aug")
+        print("fin augmenting")
 
 
 def parse_timestamp(ts_string):
@@ -0,0 +1,121 @@
+import csv
+import argparse
+import os
+import shutil
+import tempfile
+
+#######################################################################################################################
+## This script annotates a multi-cloud trace with the next access of every request:
+##     - time_to_next_access: timestamp of the next access to the same object (-1 if none)
+##     - time_to_next_access_same_reg: timestamp of the next access to the same object
+##       from the same issue region (-1 if none)
+## "Next" is in file order, as in the previous two-pass implementation.
+## The trace is read backwards in blocks in a single pass, keeping only the last seen timestamp
+## per object and per (object, region), so memory is proportional to the number of distinct
+## objects and not to the number of accesses. Annotated rows are spilled in chunks of
+## CHUNK_ROWS rows to temporary files that are concatenated in trace order at the end.
+#######################################################################################################################
+
+BLOCK_SIZE = 1 << 20
+CHUNK_ROWS = 1_000_000
+
+
+def reverse_lines(file, end_offset: int, block_size: int = BLOCK_SIZE):
+    """Yield the lines of a binary file from its end back to `end_offset`"""
+    position = file.seek(0, os.SEEK_END)
+    remainder = b""
+    while position > end_offset:
+        read_size = min(block_size, position - end_offset)
+        position -= read_size
+        file.seek(position)
+        block = file.read(read_size) + remainder
+        lines = block.split(b"\n")
+        # The first line may continue in the previous block
+        remainder = lines[0]
+        for line in reversed(lines[1:]):
+            if line.strip():
+                yield line
+    if remainder.strip():
+        yield remainder
+
+
+def write_chunk(rows: list, chunk_files: list, tmp_dir: str):
+    rows.reverse()
+    chunk_file = tempfile.NamedTemporaryFile(
+        "w", dir=tmp_dir, suffix=".chunk", delete=False, newline=""
+    )
+    with chunk_file:
+        csv.writer(chunk_file).writerows(rows)
+    chunk_files.append(chunk_file.name)
+    rows.clear()
+
+
+def annotate_next_access(
+    trace_path: str,
+    out_path: str,
+    chunk_rows: int = CHUNK_ROWS,
+    block_size: int = BLOCK_SIZE,
+):
+    """Write `trace_path` with the two next access columns appended to `out_path`"""
+    with open(trace_path, "rb") as infile:
+        header_line = infile.readline()
+        header = next(csv.reader([header_line.decode()]))
+        ts_idx = header.index("timestamp")
+        key_idx = header.index("obj_key")
+        region_idx = header.index("issue_region")
+
+        next_access = {}  # obj_key -> timestamp of the next access
+        next_access_reg = {}  # (obj_key, issue_region) -> timestamp of the next access
+
+        tmp_dir = os.path.dirname(os.path.abspath(out_path))
+        chunk_files = []
+        rows = []
+        try:
+            for line in reverse_lines(infile, len(header_line), block_size):
+                row = next(csv.reader([line.decode().rstrip("\r")]))
+                timestamp = int(row[ts_idx])
+                obj_key = row[key_idx]
+                obj_reg = (obj_key, row[region_idx])
+
+                row.append(next_access.get(obj_key, -1))
+                row.append(next_access_reg.get(obj_reg, -1))
+                next_access[obj_key] = timestamp
+                next_access_reg[obj_reg] = timestamp
+
+                rows.append(row)
+                if len(rows) >= chunk_rows:
+                    write_chunk(rows, chunk_files, tmp_dir)
+            if rows:
+                write_chunk(rows, chunk_files, tmp_dir)
+
+            # The last chunk written holds the beginning of the trace
+            with open(out_path, "w", newline="") as outfile:
+                csv.writer(outfile).writerow(
+                    header + ["time_to_next_access", "time_to_next_access_same_reg"]
+                )
+                for chunk_path in reversed(chunk_files):
+                    with open(chunk_path, "r", newline="") as chunk_file:
+                        shutil.copyfileobj(chunk_file, outfile)
+        finally:
+            for chunk_path in chunk_files:
+                os.remove(chunk_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Annotate a multi cloud trace with the next access of each request"
+    )
+    parser.add_argument("trace_file", help="Path to the multi cloud trace (csv)")
+    parser.add_argument("out_file", help="Path of the annotated trace")
+    parser.add_argument(
+        "--chunk_rows",
+        type=int,
+        default=CHUNK_ROWS,
+        help="rows kept in memory before spilling to a temporary file",
+    )
+    args = parser.parse_args()
+    annotate_next_access(args.trace_file, args.out_file, args.chunk_rows)
+
+
+if __name__ == "__main__":
+    main()
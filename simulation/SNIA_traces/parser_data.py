@@ -1,6 +1,7 @@
 import csv
 import argparse
 import pickle
+from trace_store import TraceStore, build_trace_store, is_trace_store
 
 #######################################################################################################################
 ## This script parses a trace and converts it into a dictionary format,
@@ -93,6 +94,11 @@ def save_obj_dict(obj_dict, save_file):
 
 
 def load_obj_dict(obj_file):
+    if is_trace_store(obj_file):
+        # indexed store (trace_store.py): opened lazily, not loaded in memory
+        store = TraceStore(obj_file)
+        return store, store.num_ops
+
     tot_op = 0
     with open(obj_file, "rb") as pickle_file:
         obj_dict = pickle.load(pickle_file)
@@ -115,10 +121,22 @@ def main():
     parser.add_argument(
         "--pre_obj_dict", default=None, help="load previous obj_dict from file"
     )
+    parser.add_argument(
+        "--store",
+        action="store_true",
+        help="save an indexed trace store (directory) instead of a pickle",
+    )
     args = parser.parse_args()
 
     filename = args.filename
 
+    if args.store:
+        builder = build_trace_store([filename], args.save_obj)
+        print(
+            f"The number of requests are {len(builder.object_id)} and the number of unique obj are {len(builder.key_ids)}"
+        )
+        return
+
     data_dict = load_csv_to_dict(filename)
     pre_obj_sum = 0
     if args.pre_obj_dict is not None:
@@ -0,0 +1,64 @@
+import csv
+import multiprocessing
+import os
+import random
+import tempfile
+from external_sort import merge_sorted_traces, sort_trace
+
+#######################################################################################################################
+## Sharded generation of multi-cloud traces.
+## Objects are independent, so the generators can partition them into shards (object i goes to
+## shard i % num_shards) and synthesize the shards in parallel worker processes. Every shard
+## reseeds `random` with "<seed>-<shard>" before it starts, so the output only depends on the seed
+## and the number of shards, not on the number of workers or on scheduling. Each shard writes its
+## rows to a temporary file and sorts it, and the sorted shard files are merged into the output.
+##
+## The generator passes `write_objects(keys, csv_writer)`, which builds and writes the objects of
+## the given keys with the existing Object / TraceType classes. Workers are forked, so it (and the
+## loaded obj_dict it uses) does not need to be picklable.
+#######################################################################################################################
+
+_shard_args = None
+
+
+def generate_shard(shard: int) -> str:
+    write_objects, keys, num_shards, seed, tmp_dir, delimiter = _shard_args
+    random.seed(f"{seed}-{shard}")
+
+    unsorted_file = tempfile.NamedTemporaryFile(
+        "w", dir=tmp_dir, suffix=f".shard{shard}", delete=False, newline=""
+    )
+    try:
+        with unsorted_file:
+            csv_writer = csv.writer(unsorted_file, delimiter=delimiter)
+            write_objects(keys[shard::num_shards], csv_writer)
+
+        sorted_path = unsorted_file.name + ".sorted"
+        sort_trace(unsorted_file.name, sorted_path, header=False, delimiter=delimiter)
+    finally:
+        os.remove(unsorted_file.name)
+    return sorted_path
+
+
+def generate_sharded(
+    write_objects,
+    keys: list,
+    out_path: str,
+    header_row: list = None,
+    num_shards: int = 1,
+    workers: int = 1,
+    seed: int = 1,
+    delimiter: str = ",",
+):
+    """Write the trace of `keys` sorted by timestamp to `out_path`"""
+    global _shard_args
+    tmp_dir = os.path.dirname(os.path.abspath(out_path))
+    _shard_args = (write_objects, keys, num_shards, seed, tmp_dir, delimiter)
+
+    with multiprocessing.get_context("fork").Pool(workers) as pool:
+        shard_paths = pool.map(generate_shard, range(num_shards))
+    try:
+        merge_sorted_traces(shard_paths, out_path, header_row, delimiter)
+    finally:
+        for path in shard_paths:
+            os.remove(path)
@@ -1,14 +1,18 @@
 import csv
 import argparse
 import parser_data
+import vector_stats
 import statistics as st
 from collections import OrderedDict
 import os
+import sys
 
 #######################################################################################################################
 ## This script performs basic statistical analysis on the trace.
 ## It loads a pickle file, which is the output of the parser_data.py script
 ## It is designed to process one trace at a time. For running analyses on multiple traces, use the run_stats.py script.
+## By default the stats are computed with numpy by vector_stats.py; --backend loop runs the loops over obj_dict below,
+## both write the same results.
 #######################################################################################################################
 
 KB = 1024
@@ -149,7 +153,6 @@ def size_stats(obj_dict):
 
     avg_size = sum(size_list) / max(len(size_list), 1)
     median_size = st.median(size_list)
-    print(zero_size)
     return avg_size, median_size, size_dict, zero_size
 
 
@@ -309,6 +312,12 @@ def main():
         action="store_true",
         help="add the keys in addition to the res file",
     )
+    parser.add_argument(
+        "--backend",
+        choices=["vector", "loop"],
+        default="vector",
+        help="compute the stats with numpy (vector) or with loops over obj_dict",
+    )
     args = parser.parse_args()
     res = OrderedDict()
 
@@ -320,6 +329,12 @@ def main():
     print(
         f"The number of opuests are {tot_op} and the number of objects are {uniq_obj}, which is {uniq_obj/max(tot_op,1)*100:.2f}%"
     )
+    if args.backend == "vector":
+        backend = vector_stats
+        trace = vector_stats.trace_columns(obj_dict)
+    else:
+        backend = sys.modules[__name__]
+        trace = obj_dict
     (
         get_once,
         write_only,
@@ -329,7 +344,7 @@ def main():
         deletes,
         copys,
         other,
-    ) = obj_reads_writes(obj_dict)
+    ) = backend.obj_reads_writes(trace)
     print(
         f"The number of reads {reads}, which is {reads/max(tot_op,1)*100:.2f}% from the op"
     )
@@ -365,11 +380,12 @@ def main():
         count_few_heads_with_reads,
         avg_head_get_time,
         median_head_get_time,
-    ) = head_stats(obj_dict)
+    ) = backend.head_stats(trace)
     print(
         f"The number of heads with no reads {head_no_reads}, The number of heads with one read {one_head_with_read} the number of a few heads with read {num_few_heads_with_reads} it happened {count_few_heads_with_reads} The number of heads {heads}.  The avg of diff time between head and get is {avg_head_get_time:.2f}[ms] while the median is {median_head_get_time}[ms] "
     )
-    avg_size, median_size, size_dict, zero_size = size_stats(obj_dict)
+    avg_size, median_size, size_dict, zero_size = backend.size_stats(trace)
+    print(zero_size)
     print(
         f'avg_size {avg_size} median_size {median_size} / up_1MB {size_dict["size_up_1MB"]}, 1MB_10MB {size_dict["size_1MB_10MB"]}, 10MB_100MB {size_dict["size_10MB_100MB"]}, 100MB_1GB {size_dict["size_100MB_1GB"]}, 1GB_10GB {size_dict["size_1GB_10GB"]}, above_10GB {size_dict["size_above_10GB"]}'
     )
@@ -380,7 +396,7 @@ def main():
         per_obj_num_reads,
         per_obj_avg_time_diff,
         per_obj_median_time_diff,
-    ) = get_stats(obj_dict)
+    ) = backend.get_stats(trace)
     print(
         f'per_obj_num_reads: reads_eq_0 {per_obj_num_reads["reads_eq_0"]} reads_eq_1 {per_obj_num_reads["reads_eq_1"]} reads_2_10 {per_obj_num_reads["reads_2_10"]}, reads_10_100 {per_obj_num_reads["reads_10_100"]}, reads_100_1K {per_obj_num_reads["reads_100_1K"]}, reads_1K_10K {per_obj_num_reads["reads_1K_10K"]}, reads_10K_100K {per_obj_num_reads["reads_10K_100K"]}, reads_100K_1M {per_obj_num_reads["reads_100K_1M"]}, reads_above_1M {per_obj_num_reads["reads_above_1M"]}'
     )
@@ -0,0 +1,251 @@
+import csv
+import argparse
+import json
+import os
+import pickle
+from array import array
+from collections.abc import ItemsView, Mapping
+import numpy as np
+
+#######################################################################################################################
+## This script stores a trace as an indexed, per-object columnar store (a directory), replacing the pickled obj_dict.
+## The accesses are grouped by object (objects keep their order of first appearance, accesses keep their trace order)
+## and each column is a typed numpy array:
+##     - timestamp.npy, size.npy, range_rd_begin.npy, range_rd_end.npy (int64, -1 when missing)
+##     - op.npy (uint8, index into the "ops" list of meta.json)
+##     - offsets.npy: the accesses of object i are [offsets[i], offsets[i + 1])
+##     - keys.npy: object keys in store order, sorted_keys.npy / sorted_pos.npy: the keys sorted, for binary search
+## TraceStore memory-maps the arrays, so opening a store is instant and memory follows what is read. It yields
+## one object's history at a time, as the same [ts, op, size, off_begin, off_end] lists as the obj_dict,
+## and supports random access by key. parser_data.load_obj_dict returns a TraceStore for a store directory.
+#######################################################################################################################
+
+STORE_VERSION = 1
+NUMERIC_COLUMNS = ["timestamp", "size", "range_rd_begin", "range_rd_end"]
+MISSING = -1
+KEY_CHUNK = 100_000
+
+OP_NAMES = {
+    "REST.PUT.OBJECT": "PUT",
+    "REST.GET.OBJECT": "GET",
+    "REST.HEAD.OBJECT": "HEAD",
+    "REST.COPY.OBJECT": "COPY",
+    "REST.DELETE.OBJECT": "DELETE",
+}
+
+
+def parse_int(value: str) -> int:
+    return int(value) if value != "" else MISSING
+
+
+class TraceStoreBuilder:
+    """Accumulates accesses in typed arrays, then writes the store"""
+
+    def __init__(self):
+        self.key_ids = {}
+        self.ops = []
+        self.op_codes = {}
+        self.object_id = array("q")
+        self.op = array("B")
+        self.columns = {name: array("q") for name in NUMERIC_COLUMNS}
+
+    def add(self, key: str, timestamp, op: str, size="", range_begin="", range_end=""):
+        key_id = self.key_ids.setdefault(key, len(self.key_ids))
+        op = OP_NAMES.get(op, op)
+        if op not in self.op_codes:
+            self.op_codes[op] = len(self.ops)
+            self.ops.append(op)
+
+        self.object_id.append(key_id)
+        self.op.append(self.op_codes[op])
+        self.columns["timestamp"].append(parse_int(str(timestamp)))
+        self.columns["size"].append(parse_int(str(size)))
+        self.columns["range_rd_begin"].append(parse_int(str(range_begin)))
+        self.columns["range_rd_end"].append(parse_int(str(range_end)))
+
+    def write(self, store_dir: str):
+        os.makedirs(store_dir, exist_ok=True)
+        object_id = np.frombuffer(self.object_id, dtype=np.int64)
+        order = np.argsort(object_id, kind="stable")
+        counts = np.bincount(object_id, minlength=len(self.key_ids))
+        offsets = np.zeros(len(self.key_ids) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        np.save(os.path.join(store_dir, "offsets.npy"), offsets)
+        np.save(
+            os.path.join(store_dir, "op.npy"),
+            np.frombuffer(self.op, dtype=np.uint8)[order],
+        )
+        for name, values in self.columns.items():
+            np.save(
+                os.path.join(store_dir, f"{name}.npy"),
+                np.frombuffer(values, dtype=np.int64)[order],
+            )
+
+        # dict order is the order of first appearance
+        keys = np.array([key.encode() for key in self.key_ids], dtype=np.bytes_)
+        sorted_pos = np.argsort(keys, kind="stable")
+        np.save(os.path.join(store_dir, "keys.npy"), keys)
+        np.save(os.path.join(store_dir, "sorted_keys.npy"), keys[sorted_pos])
+        np.save(os.path.join(store_dir, "sorted_pos.npy"), sorted_pos)
+
+        with open(os.path.join(store_dir, "meta.json"), "w") as meta_file:
+            json.dump(
+                {
+                    "version": STORE_VERSION,
+                    "num_objects": len(self.key_ids),
+                    "num_ops": len(object_id),
+                    "ops": self.ops,
+                },
+                meta_file,
+            )
+
+
+def build_trace_store(csv_files: list, store_dir: str, delimiter: str = " "):
+    """Build a store from raw SNIA traces (ts op key [size [off_begin off_end]])"""
+    builder = TraceStoreBuilder()
+    for csv_file in csv_files:
+        with open(csv_file, newline="") as csvfile:
+            for row in csv.reader(csvfile, delimiter=delimiter):
+                if not row:
+                    continue
+                row = row + [""] * (6 - len(row))
+                builder.add(row[2], row[0], row[1], row[3], row[4], row[5])
+    builder.write(store_dir)
+    return builder
+
+
+def convert_obj_dict(obj_dict: dict, store_dir: str):
+    """Build a store from an obj_dict of [ts, op, size, off_begin, off_end] lists"""
+    builder = TraceStoreBuilder()
+    for key, accesses in obj_dict.items():
+        for access in accesses:
+            access = list(access) + [""] * (5 - len(access))
+            builder.add(key, *access[:5])
+    builder.write(store_dir)
+    return builder
+
+
+def is_trace_store(path: str) -> bool:
+    return os.path.isfile(os.path.join(path, "meta.json"))
+
+
+class TraceStoreItems(ItemsView):
+    def __iter__(self):
+        store = self._mapping
+        for idx, key in enumerate(store):
+            yield key, store.history_at(idx)
+
+
+class TraceStore(Mapping):
+    """Read-only, lazily loaded obj_dict-like view of a store directory"""
+
+    def __init__(self, store_dir: str):
+        with open(os.path.join(store_dir, "meta.json")) as meta_file:
+            meta = json.load(meta_file)
+        if meta["version"] != STORE_VERSION:
+            raise ValueError(f"Unsupported trace store version {meta['version']}")
+        self.ops = meta["ops"]
+        self.num_ops = meta["num_ops"]
+
+        def load(name):
+            return np.load(os.path.join(store_dir, f"{name}.npy"), mmap_mode="r")
+
+        self.offsets = load("offsets")
+        self.op = load("op")
+        self.columns = {name: load(name) for name in NUMERIC_COLUMNS}
+        self._keys = load("keys")
+        self._sorted_keys = load("sorted_keys")
+        self._sorted_pos = load("sorted_pos")
+        # callers index obj_dict[key][i] in loops, keep the last history
+        self._last = (None, None)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __iter__(self):
+        for start in range(0, len(self), KEY_CHUNK):
+            for key in self._keys[start : start + KEY_CHUNK].tolist():
+                yield key.decode()
+
+    def index(self, key: str) -> int:
+        """Position of `key` in the store, -1 if it is not in the trace"""
+        encoded = key.encode()
+        if len(encoded) > self._sorted_keys.dtype.itemsize:
+            return -1
+        pos = int(np.searchsorted(self._sorted_keys, encoded))
+        if pos < len(self) and self._sorted_keys[pos] == encoded:
+            return int(self._sorted_pos[pos])
+        return -1
+
+    def __contains__(self, key: str) -> bool:
+        return self.index(key) != -1
+
+    def column_slices(self, idx: int) -> dict:
+        """Columns of the accesses of the object at position `idx`"""
+        start, end = self.offsets[idx], self.offsets[idx + 1]
+        slices = {name: column[start:end] for name, column in self.columns.items()}
+        slices["op"] = self.op[start:end]
+        return slices
+
+    def columns_of(self, key: str) -> dict:
+        idx = self.index(key)
+        if idx == -1:
+            raise KeyError(key)
+        return self.column_slices(idx)
+
+    def history_at(self, idx: int) -> list:
+        columns = self.column_slices(idx)
+
+        def values(name):
+            return ["" if v == MISSING else v for v in columns[name].tolist()]
+
+        return [
+            list(access)
+            for access in zip(
+                columns["timestamp"].tolist(),
+                [self.ops[code] for code in columns["op"].tolist()],
+                values("size"),
+                values("range_rd_begin"),
+                values("range_rd_end"),
+            )
+        ]
+
+    def __getitem__(self, key: str) -> list:
+        if self._last[0] == key:
+            return self._last[1]
+        idx = self.index(key)
+        if idx == -1:
+            raise KeyError(key)
+        history = self.history_at(idx)
+        self._last = (key, history)
+        return history
+
+    def items(self):
+        # in store order, without a key lookup per object
+        return TraceStoreItems(self)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build an indexed trace store")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build", help="from raw SNIA trace files")
+    build.add_argument("csv_files", nargs="+", help="Paths to the trace files")
+    build.add_argument("store_dir", help="Output store directory")
+    convert = subparsers.add_parser("convert", help="from a pickled obj_dict")
+    convert.add_argument("obj_file", help="Path to the obj_dict pickle")
+    convert.add_argument("store_dir", help="Output store directory")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        builder = build_trace_store(args.csv_files, args.store_dir)
+    else:
+        with open(args.obj_file, "rb") as pickle_file:
+            builder = convert_obj_dict(pickle.load(pickle_file), args.store_dir)
+    print(
+        f"stored {len(builder.object_id)} operations of {len(builder.key_ids)} objects"
+    )
+
+
+if __name__ == "__main__":
+    main()
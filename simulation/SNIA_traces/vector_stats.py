@@ -0,0 +1,283 @@
+import statistics as st
+from collections import OrderedDict
+import numpy as np
+from trace_store import MISSING, TraceStore
+
+#######################################################################################################################
+## Vectorized backend of stats.py.
+## The statistics are computed with numpy over the columns of the trace (the layout of trace_store.py: the accesses
+## grouped by object behind an offsets array) instead of looping over obj_dict in Python:
+##     - per object counts are bincounts of the object index of the accesses
+##     - "since the last GET / HEAD" is a running maximum of the access positions (np.maximum.accumulate)
+##     - per object sums and medians are reductions over the groups of the (object, value) sorted diffs
+##     - histograms are np.searchsorted over the bucket edges
+## Every function returns the same values (python ints / floats) as its loop version in stats.py, so the result
+## csv is identical.
+#######################################################################################################################
+
+KB = 1024
+MB = 1024 * KB
+GB = 1024 * MB
+SEC = 1000
+MIN = 60 * SEC
+HOUR = 60 * MIN
+DAY = 24 * HOUR
+LAST_TIME = 7 * DAY
+
+SIZE_BUCKETS = [
+    "size_up_1MB",
+    "size_1MB_10MB",
+    "size_10MB_100MB",
+    "size_100MB_1GB",
+    "size_1GB_10GB",
+    "size_above_10GB",
+]
+SIZE_EDGES = [1 * MB, 10 * MB, 100 * MB, 1 * GB, 10 * GB]
+
+TIME_DIFF_BUCKETS = [
+    "diff_less_1sec",
+    "diff_1sec_1m",
+    "diff_1m_1h",
+    "diff_1h_24h",
+    "diff_1day_3days",
+    "diff_above_3days",
+]
+TIME_DIFF_EDGES = [1 * SEC, 1 * MIN, 1 * HOUR, 24 * HOUR, 3 * DAY]
+
+NUM_READS_BUCKETS = [
+    "reads_eq_0",
+    "reads_eq_1",
+    "reads_2_10",
+    "reads_10_100",
+    "reads_100_1K",
+    "reads_1K_10K",
+    "reads_10K_100K",
+    "reads_100K_1M",
+    "reads_above_1M",
+]
+NUM_READS_EDGES = [1, 2, 10, 100, 1000, 10 * 1000, 100 * 1000, 1000 * 1000]
+
+
+class TraceColumns:
+    """The op / timestamp / size columns of a trace, grouped by object
+
+    Every object has at least one access, as in obj_dict.
+    """
+
+    def __init__(self, offsets, op, ops: list, timestamp, size):
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.op = np.asarray(op)
+        self.timestamp = np.asarray(timestamp, dtype=np.int64)
+        self.size = np.asarray(size, dtype=np.int64)
+
+        def op_mask(name):
+            # same substring tests as the loops over obj_dict
+            return np.array([name in op_name for op_name in ops], dtype=bool)[self.op]
+
+        self.is_get = op_mask("GET")
+        self.is_head = op_mask("HEAD")
+        self.is_put = op_mask("PUT")
+        self.is_delete = op_mask("DELETE")
+        self.is_copy = op_mask("COPY")
+
+        self.num_objects = len(self.offsets) - 1
+        self.starts = self.offsets[:-1]
+        self.counts = np.diff(self.offsets)
+        self.positions = np.arange(len(self.op), dtype=np.int64)
+        # index of the object of every access
+        self.obj_idx = np.repeat(np.arange(self.num_objects), self.counts)
+        self.obj_start = self.starts[self.obj_idx]
+
+    def per_object(self, mask) -> np.ndarray:
+        """Number of accesses in `mask` of every object"""
+        return np.bincount(self.obj_idx[mask], minlength=self.num_objects)
+
+    def last_position(self, mask) -> np.ndarray:
+        """Position of the last access in `mask` up to every access (-1 if none)"""
+        return np.maximum.accumulate(np.where(mask, self.positions, -1))
+
+
+def trace_columns(obj_dict) -> TraceColumns:
+    """Columns of a TraceStore or of an obj_dict of [ts, op, size, ...] lists"""
+    if isinstance(obj_dict, TraceStore):
+        columns = obj_dict.columns
+        return TraceColumns(
+            obj_dict.offsets,
+            obj_dict.op,
+            obj_dict.ops,
+            columns["timestamp"],
+            columns["size"],
+        )
+
+    offsets = np.zeros(len(obj_dict) + 1, dtype=np.int64)
+    np.cumsum([len(accesses) for accesses in obj_dict.values()], out=offsets[1:])
+    accesses = [access for accesses in obj_dict.values() for access in accesses]
+
+    def column(field):
+        return np.array([access[field] for access in accesses], dtype=str)
+
+    ops, op = np.unique(column(1), return_inverse=True)
+    size = column(2)
+    size = np.where(size == "", str(MISSING), size)
+    return TraceColumns(
+        offsets,
+        op,
+        ops.tolist(),
+        column(0).astype(np.int64),
+        size.astype(np.int64),
+    )
+
+
+def bucket_counts(values, edges: list, buckets: list) -> OrderedDict:
+    """Histogram of `values` where bucket i is [edges[i-1], edges[i])"""
+    bins = np.searchsorted(np.asarray(edges), values, side="right")
+    counts = np.bincount(bins, minlength=len(buckets))
+    return OrderedDict(zip(buckets, counts.tolist()))
+
+
+def median(values) -> float:
+    """statistics.median of int values"""
+    values = np.sort(values).tolist()
+    if not values:
+        raise st.StatisticsError("no median for empty data")
+    mid = len(values) // 2
+    if len(values) % 2 == 1:
+        return values[mid]
+    return (values[mid - 1] + values[mid]) / 2
+
+
+def group_medians(values, starts, counts) -> np.ndarray:
+    """Median of every group of `values`, given the start and size of the groups"""
+    group = np.repeat(np.arange(len(starts)), counts)
+    values = values[np.lexsort((values, group))]
+    upper = values[starts + counts // 2]
+    lower = values[starts + (counts - 1) // 2]
+    return (lower + upper) / 2
+
+
+def obj_reads_writes(cols: TraceColumns):
+    get = cols.is_get
+    head = ~get & cols.is_head
+    put = ~get & ~head & cols.is_put
+    delete = ~get & ~head & ~put & cols.is_delete
+    copy = ~get & ~head & ~put & ~delete & cols.is_copy
+    other = ~get & ~head & ~put & ~delete & ~copy
+
+    get_once = int(np.count_nonzero(cols.per_object(get) == 1))
+    # a single PUT, or a PUT and then a DELETE
+    single = cols.counts == 1
+    write_only = np.count_nonzero(put[cols.starts[single]])
+    pairs = cols.starts[cols.counts == 2]
+    write_only += np.count_nonzero(cols.is_put[pairs] & delete[pairs + 1])
+
+    return (
+        get_once,
+        int(write_only),
+        int(np.count_nonzero(get)),
+        int(np.count_nonzero(head)),
+        int(np.count_nonzero(put)),
+        int(np.count_nonzero(delete)),
+        int(np.count_nonzero(copy)),
+        int(np.count_nonzero(other)),
+    )
+
+
+def head_stats(cols: TraceColumns):
+    heads_before = np.concatenate(([0], np.cumsum(cols.is_head)))
+    last_get = cols.last_position(cols.is_get)
+
+    # the HEADs of a GET are the ones since the previous GET of the object
+    gets = cols.positions[cols.is_get]
+    prev_get = np.concatenate(([-1], last_get[:-1]))[gets]
+    since = np.maximum(prev_get + 1, cols.obj_start[gets])
+    get_heads = heads_before[gets + 1] - heads_before[since]
+
+    with_heads = get_heads >= 1
+    one_head_with_read = int(np.count_nonzero(get_heads == 1))
+    num_few_heads_with_reads = int(get_heads[get_heads > 1].sum())
+    count_few_heads_with_reads = int(np.count_nonzero(get_heads > 1))
+
+    # time from the last HEAD before the GET
+    gets = gets[with_heads]
+    last_head = cols.last_position(cols.is_head)[gets]
+    head_get_diff_time = cols.timestamp[gets] - cols.timestamp[last_head]
+
+    # HEADs after the last GET of every object
+    ends = cols.offsets[1:]
+    since = np.maximum(last_get[ends - 1] + 1, cols.starts)
+    head_no_reads = int((heads_before[ends] - heads_before[since]).sum())
+
+    avg_head_get_time = 0
+    median_head_get_time = 0
+    if len(head_get_diff_time) > 0:
+        avg_head_get_time = int(head_get_diff_time.sum()) / len(head_get_diff_time)
+        median_head_get_time = median(head_get_diff_time)
+    return (
+        head_no_reads,
+        one_head_with_read,
+        num_few_heads_with_reads,
+        count_few_heads_with_reads,
+        avg_head_get_time,
+        median_head_get_time,
+    )
+
+
+def size_stats(cols: TraceColumns):
+    # the size of the first access, of objects that are not first deleted
+    firsts = cols.starts[~cols.is_delete[cols.starts]]
+    size_list = cols.size[firsts]
+    if np.any(size_list == MISSING):
+        raise ValueError("An object has no size in its first access")
+
+    size_dict = bucket_counts(size_list, SIZE_EDGES, SIZE_BUCKETS)
+    zero_size = int(np.count_nonzero(size_list == 0))
+    avg_size = int(size_list.sum()) / max(len(size_list), 1)
+    median_size = median(size_list)
+    return avg_size, median_size, size_dict, zero_size
+
+
+def get_stats(cols: TraceColumns):
+    gets_per_obj = cols.per_object(cols.is_get)
+    with_gets = gets_per_obj > 0
+    obj_with_gets = int(np.count_nonzero(with_gets))
+
+    last_get = cols.last_position(cols.is_get)
+    last_get_obj = last_get[cols.offsets[1:][with_gets] - 1]
+    last_get_time_diff = bucket_counts(
+        LAST_TIME - cols.timestamp[last_get_obj], TIME_DIFF_EDGES, TIME_DIFF_BUCKETS
+    )
+
+    # time of every GET from the first GET of its object
+    gets = cols.positions[cols.is_get]
+    get_obj = cols.obj_idx[gets]
+    first_get = np.full(cols.num_objects, -1, dtype=np.int64)
+    first_get[get_obj[::-1]] = gets[::-1]
+    repeated = gets != first_get[get_obj]
+    get_diff = cols.timestamp[gets] - cols.timestamp[first_get[get_obj]]
+    get_diff, get_obj = get_diff[repeated], get_obj[repeated]
+    per_get_time_diff = bucket_counts(get_diff, TIME_DIFF_EDGES, TIME_DIFF_BUCKETS)
+
+    # per object average and median, of the objects with repeated GETs
+    # (the GETs, and so their diffs, are grouped by object)
+    _, starts, counts = np.unique(get_obj, return_index=True, return_counts=True)
+    if len(get_diff):
+        diff_sums = np.add.reduceat(get_diff, starts)
+    else:
+        diff_sums = np.zeros(0, dtype=np.int64)
+    per_obj_avg_time_diff = bucket_counts(
+        diff_sums / counts, TIME_DIFF_EDGES, TIME_DIFF_BUCKETS
+    )
+    per_obj_median_time_diff = bucket_counts(
+        group_medians(get_diff, starts, counts), TIME_DIFF_EDGES, TIME_DIFF_BUCKETS
+    )
+
+    per_obj_num_reads = bucket_counts(gets_per_obj, NUM_READS_EDGES, NUM_READS_BUCKETS)
+
+    return (
+        obj_with_gets,
+        per_get_time_diff,
+        last_get_time_diff,
+        per_obj_num_reads,
+        per_obj_avg_time_diff,
+        per_obj_median_time_diff,
+    )
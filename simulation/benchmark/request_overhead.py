@@ -0,0 +1,88 @@
+import argparse
+import os
+import sys
+import timeit
+import tracemalloc
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.model.request import Request  # noqa: E402
+
+"""
+    Per-request overhead of the simulator's `Request` record.
+
+    Compares the previous pydantic model (constructed from a copied CSV row dict,
+    as SimulatorV2.run used to do) against the slotted `src.model.request.Request`.
+
+    Usage: python benchmark/request_overhead.py [--n N]
+"""
+
+
+class PydanticRequest(BaseModel):
+    timestamp: datetime
+    op: Literal["read", "write", "evict"]
+    issue_region: str
+    obj_key: str
+    size: float
+    next_access_timestamp: datetime = datetime.max
+    next_access_same_reg_timestamp: datetime = datetime.max
+    read_from: str = None
+
+
+ROW = {
+    "timestamp": "1700000000000",
+    "op": "REST.GET.OBJECT",
+    "issue_region": "aws:us-east-1",
+    "obj_key": "0123456789abcdef-v1",
+    "size": "1048576",
+    "time_to_next_access": "1700000005000",
+    "time_to_next_access_same_reg": "-1",
+}
+TIMESTAMP = datetime.fromtimestamp(1700000000)
+NEXT_TIMESTAMP = datetime.fromtimestamp(1700000005)
+
+
+def make_pydantic():
+    request_data = {k: v for k, v in ROW.items()}
+    request_data["timestamp"] = TIMESTAMP
+    request_data["op"] = "read"
+    request_data["next_access_timestamp"] = NEXT_TIMESTAMP
+    return PydanticRequest(**request_data)
+
+
+def make_slotted():
+    return Request(
+        timestamp=TIMESTAMP,
+        op="read",
+        issue_region=ROW["issue_region"],
+        obj_key=ROW["obj_key"],
+        size=float(ROW["size"]),
+        next_access_timestamp=NEXT_TIMESTAMP,
+    )
+
+
+def bytes_per_request(factory, n: int) -> float:
+    tracemalloc.start()
+    objs = [factory() for _ in range(n)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objs
+    return current / n
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Request record overhead benchmark")
+    parser.add_argument("--n", type=int, default=200000, help="Requests per run")
+    args = parser.parse_args()
+
+    print(f"{'record':<12}{'ns/request':>14}{'bytes/request':>16}")
+    for name, factory in [("pydantic", make_pydantic), ("slotted", make_slotted)]:
+        seconds = min(timeit.repeat(factory, number=args.n, repeat=5))
+        print(
+            f"{name:<12}{seconds / args.n * 1e9:>14.0f}"
+            f"{bytes_per_request(factory, args.n // 10):>16.0f}"
+        )
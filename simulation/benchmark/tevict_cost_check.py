@@ -0,0 +1,141 @@
+"""
+Checks the vectorized Tevict cost curves against the previous loops.
+
+TevictV2.calc_evict_cost and TevictRangesV2.calc_evict_cost evaluate all
+candidate TTLs at once from prefix / suffix sums. This compares the TTLs
+they pick with the per-TTL loops they replaced, on random access
+histograms: dense ones, and sparse ones whose cost curves have exact ties
+(the loops keep the largest of the cheapest TTLs).
+
+Usage: python benchmark/tevict_cost_check.py [--n N] [--seed SEED]
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.placement_policy.policy_tevict_new import TevictV2  # noqa: E402
+from src.placement_policy.policy_tevict_ranges_new import (  # noqa: E402
+    RANGES,
+    TevictRangesV2,
+)
+
+
+def loop_evict_cost(X, last_X, teven_hours, net_cost, storage_cost_hour):
+    """TevictV2.calc_evict_cost before it was vectorized"""
+    cost_hist = {}
+    maxKey = int(max(X.keys())) if len(X.keys()) > 0 else 1
+    ret = 0
+    for c in range(min(maxKey + 1, math.ceil(teven_hours))):
+        cost_hist[c] = 0
+        for i in X:
+            if i <= c:
+                cost_hist[c] += float(X.get(i, 0)) * ((i - 1) + 0.6) * storage_cost_hour
+            else:
+                cost_hist[c] += float(X.get(i, 0)) * (
+                    (c * storage_cost_hour) + net_cost
+                )
+            cost_hist[c] += float(last_X.get(i, 0)) * (c * storage_cost_hour)
+        if cost_hist[c] <= cost_hist[ret]:
+            ret = c
+    return ret, cost_hist[ret]
+
+
+def loop_evict_cost_ranges(X, last_X, teven_hours, net_cost):
+    """TevictRangesV2.calc_evict_cost before it was vectorized"""
+    storage_cost_hour = net_cost / teven_hours
+    cost_hist = {}
+    ret = 0
+    for c in range(len(RANGES)):
+        cost_hist[c] = 0
+        tevict = RANGES[c]
+        for i in range(len(RANGES)):
+            if X.get(i, 0) == 0:
+                continue
+            if tevict == 0:
+                cost_hist[c] += float(X.get(i, 0)) * net_cost
+                continue
+            if RANGES[i] <= tevict:
+                cost_hist[c] += (
+                    float(X.get(i, 0))
+                    * ((RANGES[i] + int(i != 0) * RANGES[i - 1]) / 2)
+                    * storage_cost_hour
+                )
+            else:
+                cost_hist[c] += float(X.get(i, 0)) * (
+                    (tevict * storage_cost_hour) + net_cost
+                )
+        for i in range(len(RANGES)):
+            if last_X.get(i, 0) == 0:
+                continue
+            cost_hist[c] += float(last_X.get(i, 0)) * (tevict * storage_cost_hour)
+        if cost_hist[c] <= cost_hist[ret]:
+            ret = c
+    return RANGES[ret]
+
+
+def random_histogram(rng: random.Random, num_bins: int, sparse: bool):
+    X, last_X = {}, {}
+    with_last = rng.random() < 0.5
+    for i in rng.sample(range(1, num_bins), rng.randint(1, min(num_bins - 1, 40))):
+        # Sparse: empty bins (as left by the sliding window) and no last
+        # accesses make the cost flat past the last non-empty bin
+        X[i] = rng.choice([0.0, rng.random()]) if sparse else rng.random() * 10
+        if with_last and not sparse:
+            last_X[i] = rng.random()
+    return X, last_X
+
+
+def policy(cls, X, last_X):
+    # Only the histograms are needed to evaluate the cost curves
+    obj = cls.__new__(cls)
+    obj.window_size = -1
+    obj.next_hist = {"dst": X}
+    obj.next_last_hist = {"dst": last_X}
+    return obj
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--n", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    mismatches = 0
+    for n in range(args.n):
+        sparse = n % 2 == 0
+        net_cost = rng.choice([0.02, 0.09, 0.12])
+        storage_cost_hour = net_cost / rng.choice([24, 48, 400])
+        teven_hours = net_cost / storage_cost_hour
+
+        X, last_X = random_histogram(rng, 500, sparse)
+        expected = loop_evict_cost(X, last_X, teven_hours, net_cost, storage_cost_hour)
+        got = policy(TevictV2, X, last_X).calc_evict_cost(
+            "dst", teven_hours, net_cost, storage_cost_hour
+        )
+        if got[0] != expected[0] or not math.isclose(got[1], expected[1]):
+            mismatches += 1
+            print(f"TevictV2 #{n}: expected {expected}, got {got}")
+
+        X, last_X = random_histogram(rng, len(RANGES), sparse)
+        expected = loop_evict_cost_ranges(X, last_X, teven_hours, net_cost)
+        got = policy(TevictRangesV2, X, last_X).calc_evict_cost(
+            "dst", teven_hours, net_cost
+        )
+        if got != expected:
+            mismatches += 1
+            print(f"TevictRangesV2 #{n}: expected {expected}, got {got}")
+
+    print(f"{2 * args.n} cost curves compared, {mismatches} mismatches")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,11 @@
 from src.simulator import Simulator
 from src.simulator_v2 import SimulatorV2
+from src.utils.columnar_trace import (
+    columnar_path_for,
+    convert_trace,
+    is_columnar_trace,
+)
+from src.utils.helpers import get_full_path
 import argparse
 
 if __name__ == "__main__":
@@ -19,7 +25,18 @@ if __name__ == "__main__":
         "--days", default=0, help="Only calculate cost after Day [days]"
     )
     parser.add_argument("--simversion", default="0", help="Simulator version")
+    parser.add_argument(
+        "--columnar",
+        action="store_true",
+        help="Convert the trace to the columnar format (once) and simulate from it",
+    )
     args = parser.parse_args()
+
+    if args.columnar and not is_columnar_trace(get_full_path(args.trace)):
+        columnar_trace = columnar_path_for(args.trace)
+        if not is_columnar_trace(get_full_path(columnar_trace)):
+            convert_trace(get_full_path(args.trace), get_full_path(columnar_trace))
+        args.trace = columnar_trace
     if args.simversion == "0":
         simulator = Simulator(
             args.config,
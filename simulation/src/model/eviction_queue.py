@@ -0,0 +1,96 @@
+import heapq
+import itertools
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.model.object import PhysicalObject
+
+
+class EvictionQueue:
+    """
+    Min-heap of cached objects by eviction priority, with lazy updates.
+
+    Priorities are only allowed to grow (e.g. last access time for LRU, GDSF's
+    H value), so instead of updating an entry in place the queue is told the
+    current priority of an object when it is popped: entries of objects that
+    are gone are dropped, and outdated entries are re-pushed with their current
+    priority. Push and pop are O(log n) amortized.
+
+    Objects that cannot be evicted yet are parked outside the heap, so that
+    they are not popped again on every eviction: the only copy of an object
+    until it gets another copy (`unpark`), and a replica still in transfer
+    until it lands (`release`).
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, PhysicalObject]] = []
+        self._order = itertools.count()
+        # key -> only copy of the object
+        self._sole_copies: Dict[str, PhysicalObject] = {}
+        # (storage start time, insertion order, replica in transfer)
+        self._in_transfer: List[Tuple[datetime, int, PhysicalObject]] = []
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, priority, physical_object: PhysicalObject):
+        heapq.heappush(self._heap, (priority, next(self._order), physical_object))
+
+    def pop(
+        self, current_priority: Callable[[PhysicalObject], Optional[float]]
+    ) -> Optional[PhysicalObject]:
+        """
+        Pop the object with the lowest current priority.
+
+        Args:
+            current_priority: returns the object's priority now, or None if it
+                is no longer cached
+
+        Returns:
+            PhysicalObject: the object to evict, None if the queue is empty
+        """
+        while self._heap:
+            priority, _, physical_object = heapq.heappop(self._heap)
+            current = current_priority(physical_object)
+            if current is None:
+                continue
+            if current != priority:
+                self.push(current, physical_object)
+                continue
+            return physical_object
+        return None
+
+    def park(self, physical_object: PhysicalObject):
+        """Keep the only copy of an object out of the heap until `unpark`"""
+        self._sole_copies[physical_object.key] = physical_object
+
+    def unpark(
+        self,
+        key: str,
+        current_priority: Callable[[PhysicalObject], Optional[float]],
+    ):
+        """Put the parked copy of `key` back in the heap, if it is still cached"""
+        physical_object = self._sole_copies.pop(key, None)
+        if physical_object is None:
+            return
+        current = current_priority(physical_object)
+        if current is not None:
+            self.push(current, physical_object)
+
+    def park_until(self, ready_time: datetime, physical_object: PhysicalObject):
+        """Keep a replica in transfer out of the heap until `release(ready_time)`"""
+        heapq.heappush(
+            self._in_transfer, (ready_time, next(self._order), physical_object)
+        )
+
+    def release(
+        self,
+        now: datetime,
+        current_priority: Callable[[PhysicalObject], Optional[float]],
+    ):
+        """Put the parked replicas that landed by `now` back in the heap"""
+        while self._in_transfer and self._in_transfer[0][0] <= now:
+            _, _, physical_object = heapq.heappop(self._in_transfer)
+            current = current_priority(physical_object)
+            if current is not None:
+                self.push(current, physical_object)
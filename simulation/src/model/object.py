@@ -90,6 +90,11 @@ class PhysicalObject:
 
         self.storage_start_time: datetime = None
 
+        # Region the replica was transferred from, None if not transferred
+        self.source_region: str = None
+        # Latest expiry time queued for the object in the RegionManager
+        self.scheduled_expiry: datetime = None
+
         # For no base region
         self.expire_immediate: bool = False
 
@@ -1,5 +1,8 @@
-from typing import Dict, Set
+from typing import Callable, Dict, List, Optional, Set, Tuple
+import heapq
+import itertools
 import networkx as nx
+from src.model.eviction_queue import EvictionQueue
 from src.model.object import PhysicalObject
 from datetime import timedelta, datetime
 import logging
@@ -23,6 +26,18 @@ class RegionManagerV2:
         self.trace_start_time: datetime = None
         self.days_to_ignore: int = 0
 
+        # (expiry time, insertion order, object); entries are validated when popped
+        self.expiry_queue: List[Tuple[datetime, int, PhysicalObject]] = []
+        self._expiry_order = itertools.count()
+
+        # Cache eviction order, only kept for regions that have evicted
+        self.lru_queues: Dict[str, EvictionQueue] = {}
+        self.gdsf_queues: Dict[str, EvictionQueue] = {}
+        self.track_gdsf = False
+        self.gdsf_inflation: Dict[str, float] = {}
+        self.gdsf_frequency: Dict[Tuple[str, str], int] = {}
+        self.gdsf_priority: Dict[Tuple[str, str], float] = {}
+
     def set_start_time_and_ignored_days(
         self, start_time: datetime, days_to_ignore: int
     ):
@@ -49,8 +64,120 @@ class RegionManagerV2:
         self.regions[region].add(physical_object.key)
         self.region_objects[region].add(physical_object)
         self.region_tot_size[region] += physical_object.size
+        self.schedule_expiry(physical_object)
+        if region in self.lru_queues:
+            self.lru_queues[region].push(
+                self._lru_priority(physical_object), physical_object
+            )
+        if self.track_gdsf:
+            self.record_access(region, physical_object.key, physical_object.size)
+        if region in self.gdsf_queues:
+            self.gdsf_queues[region].push(
+                self._gdsf_priority(physical_object), physical_object
+            )
+        # Copies parked as the only copy of the object can be evicted again
+        for other_region in physical_object.logical_object.physical_objects:
+            if other_region == region:
+                continue
+            if other_region in self.lru_queues:
+                self.lru_queues[other_region].unpark(
+                    physical_object.key, self._lru_priority
+                )
+            if other_region in self.gdsf_queues:
+                self.gdsf_queues[other_region].unpark(
+                    physical_object.key, self._gdsf_priority
+                )
         self.logger.info(f"Adding object {physical_object.key} to region {region}.")
 
+    @staticmethod
+    def expiry_time(physical_object: PhysicalObject) -> Optional[datetime]:
+        """Time the object's TTL runs out, None if it never expires"""
+        if (
+            physical_object.ttl == -1
+            or physical_object.ttl == float("inf")
+            or physical_object.storage_start_time is None
+        ):
+            return None
+        try:
+            return physical_object.storage_start_time + timedelta(
+                seconds=physical_object.ttl
+            )
+        except OverflowError:
+            return None
+
+    def schedule_expiry(self, physical_object: PhysicalObject):
+        """(Re-)schedule expiry; call again whenever the TTL or start time changes"""
+        expiry_time = self.expiry_time(physical_object)
+        if expiry_time is not None:
+            physical_object.scheduled_expiry = expiry_time
+            heapq.heappush(
+                self.expiry_queue,
+                (expiry_time, next(self._expiry_order), physical_object),
+            )
+
+    def expire_objects(
+        self,
+        now: datetime,
+        on_expire: Callable[[PhysicalObject], None] = None,
+    ) -> int:
+        """
+        Remove every replica whose TTL ran out by `now`, in expiry order.
+
+        Storage is charged up to the exact expiry time. If the expiring replica
+        is the last live copy of its object, it is kept (from its expiry time on,
+        with no TTL) until the next placement of the object, as the transfer
+        policy used to do when it found all replicas expired on a read.
+        `on_expire` is called for every expiring replica before it is removed.
+
+        Returns:
+            int: number of expired replicas
+        """
+        expired = 0
+        while self.expiry_queue and self.expiry_queue[0][0] <= now:
+            expiry_time, _, physical_object = heapq.heappop(self.expiry_queue)
+            region = physical_object.location_tag
+            logical_object = physical_object.logical_object
+            if logical_object.physical_objects.get(region) is not physical_object:
+                continue  # Removed or replaced since it was scheduled
+
+            current_expiry_time = self.expiry_time(physical_object)
+            if current_expiry_time is None:
+                continue
+            if current_expiry_time > expiry_time:
+                # TTL was refreshed, requeue unless that was done on refresh
+                if physical_object.scheduled_expiry != current_expiry_time:
+                    self.schedule_expiry(physical_object)
+                continue
+            expiry_time = current_expiry_time
+
+            expired += 1
+            if on_expire is not None:
+                on_expire(physical_object)
+            self.remove_object_from_region(region, physical_object, expiry_time)
+
+            has_live_copy = False
+            for other in logical_object.physical_objects.values():
+                if other is physical_object:
+                    continue
+                if (
+                    other.storage_start_time is not None
+                    and other.storage_start_time > expiry_time
+                ):
+                    continue  # Still in transfer, cannot serve reads yet
+                other_expiry_time = self.expiry_time(other)
+                if other_expiry_time is None or other_expiry_time > expiry_time:
+                    has_live_copy = True
+                    break
+
+            if has_live_copy:
+                logical_object.physical_objects.pop(region, None)
+            else:
+                physical_object.expire_immediate = True
+                physical_object.set_ttl(-1)
+                physical_object.set_storage_start_time(expiry_time)
+                self.add_object_to_region(region, physical_object)
+        return expired
+
     def get_objects_in_region(self, region):
         """Get object in region."""
         objects = self.regions.get(region, [])
@@ -59,14 +186,9 @@ class RegionManagerV2:
 
     def has_object_in_region(self, region: str, physical_object_key: str):
         """Check if object is in region."""
-        objects = self.regions.get(region, [])
-        physical_object = objects.get(physical_object_key, None)
-        if physical_object is not None and physical_object.status == Status.ready:
-            physical_object = None
-        self.logger.info(
-            f"Object {physical_object_key} in region {region}: {physical_object is not None}."
-        )
-        return physical_object is not None
+        found = physical_object_key in self.regions.get(region, ())
+        self.logger.info(f"Object {physical_object_key} in region {region}: {found}.")
+        return found
 
     def clear_all_objects(self):
         """Clear all objects in all regions."""
@@ -121,23 +243,120 @@ class RegionManagerV2:
     def get_region_object_size(self, region: str):
         return self.region_tot_size.get(region, 0)
 
-    def evict_lru(
-        self, region: str, obj_size: int, cache_size: int, end_time: datetime
+    def _eviction_queue(
+        self,
+        queues: Dict[str, EvictionQueue],
+        region: str,
+        priority: Callable[[PhysicalObject], Optional[float]],
+    ) -> EvictionQueue:
+        """Create the region's queue on first use, compact it if mostly stale"""
+        objects = self.region_objects.get(region, set())
+        if region not in queues or len(queues[region]) > 2 * len(objects) + 64:
+            queues[region] = EvictionQueue()
+            for physical_object in objects:
+                current = priority(physical_object)
+                if current is not None:
+                    queues[region].push(current, physical_object)
+        return queues[region]
+
+    def _lru_priority(self, physical_object: PhysicalObject) -> Optional[datetime]:
+        if physical_object not in self.region_objects.get(
+            physical_object.location_tag, ()
+        ):
+            return None
+        return physical_object.logical_object.last_modified
+
+    def _gdsf_priority(self, physical_object: PhysicalObject) -> Optional[float]:
+        if physical_object not in self.region_objects.get(
+            physical_object.location_tag, ()
+        ):
+            return None
+        return self.gdsf_priority.get(
+            (physical_object.location_tag, physical_object.key)
+        )
+
+    def enable_gdsf(self):
+        """Start tracking GDSF priorities of all objects added from now on"""
+        self.track_gdsf = True
+
+    def record_access(self, region: str, key: str, size: float):
+        """
+        GDSF bookkeeping for a hit on (or a new copy of) an object in `region`:
+        H = L + frequency / size (GB), where L is the region's inflation value
+        (the H of the last evicted object).
+        """
+        entry = (region, key)
+        self.gdsf_frequency[entry] = self.gdsf_frequency.get(entry, 0) + 1
+        self.gdsf_priority[entry] = self.gdsf_inflation.get(region, 0.0) + (
+            self.gdsf_frequency[entry] / max(size / GB, 1e-12)
+        )
+
+    def _evict(
+        self,
+        queue: EvictionQueue,
+        priority: Callable[[PhysicalObject], Optional[float]],
+        region: str,
+        obj_size: int,
+        cache_size: int,
+        end_time: datetime,
+        on_evict: Callable[[PhysicalObject], None] = None,
     ):
-        """Evict objects from the region using LRU."""
+        """
+        Evict from `queue` until `obj_size` fits, lowest priority first.
+
+        The only copy of an object is never evicted, nor is a replica still in
+        transfer: both are parked in the queue until they can be evicted, so
+        the region may stay over `cache_size`.
+        """
+        queue.release(end_time, priority)
         while self.region_tot_size[region] + obj_size > cache_size:
-            lru_object = min(
-                [obj.logical_object for obj in self.region_objects[region]],
-                key=lambda x: x.last_modified,
-            )
-            lru_physical_object = lru_object.physical_objects[region]
+            candidate = queue.pop(priority)
+            if candidate is None:
+                break
+            logical_object = candidate.logical_object
+            physical_object = logical_object.physical_objects.get(region, candidate)
+            if len(logical_object.physical_objects) <= 1:
+                queue.park(candidate)
+                continue
             assert (
-                lru_physical_object.storage_start_time is not None
+                physical_object.storage_start_time is not None
             ), "Storage start time is None."
-            assert (
-                lru_physical_object.storage_start_time <= end_time
-            ), f"Storage start time {lru_physical_object.storage_start_time} is greater than end time {end_time}."
-            self.remove_object_from_region(region, lru_physical_object, end_time)
+            if physical_object.storage_start_time > end_time:
+                queue.park_until(physical_object.storage_start_time, candidate)
+                continue
+            if on_evict is not None:
+                on_evict(candidate)
+            self.remove_object_from_region(region, physical_object, end_time)
+            logical_object.physical_objects.pop(region, None)
+
+    def evict_lru(
+        self, region: str, obj_size: int, cache_size: int, end_time: datetime
+    ):
+        """Evict objects from the region using LRU."""
+        queue = self._eviction_queue(self.lru_queues, region, self._lru_priority)
+        self._evict(queue, self._lru_priority, region, obj_size, cache_size, end_time)
+
+    def evict_gdsf(
+        self, region: str, obj_size: int, cache_size: int, end_time: datetime
+    ):
+        """Evict objects from the region using GreedyDual-Size-Frequency."""
+        assert self.track_gdsf, "Call enable_gdsf() before adding objects"
+
+        def on_evict(physical_object: PhysicalObject):
+            key = (region, physical_object.key)
+            self.gdsf_inflation[region] = self.gdsf_priority.pop(key)
+            self.gdsf_frequency.pop(key, None)
+
+        queue = self._eviction_queue(self.gdsf_queues, region, self._gdsf_priority)
+        self._evict(
+            queue,
+            self._gdsf_priority,
+            region,
+            obj_size,
+            cache_size,
+            end_time,
+            on_evict,
+        )
 
     def calculate_remaining_storage_costs(
         self, end_time: datetime, logical_objects: Dict[str, LogicalObject]
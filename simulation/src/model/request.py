@@ -1,14 +1,52 @@
-from pydantic import BaseModel
 from datetime import datetime
-from typing import Literal
-
-
-class Request(BaseModel):
-    timestamp: datetime
-    op: Literal["read", "write", "evict"]
-    issue_region: str
-    obj_key: str
-    size: float
-    next_access_timestamp: datetime = datetime.max
-    next_access_same_reg_timestamp: datetime = datetime.max
-    read_from: str = None
+from typing import List, Literal, Union
+
+
+class Request:
+    """
+    A single trace request.
+
+    This is constructed once per trace row in the simulator hot loop, so it is a
+    plain slotted class rather than a validated pydantic model: callers are
+    expected to pass already-parsed values (datetimes, float size).
+    """
+
+    __slots__ = (
+        "timestamp",
+        "op",
+        "issue_region",
+        "obj_key",
+        "size",
+        "next_access_timestamp",
+        "next_access_same_reg_timestamp",
+        "read_from",
+    )
+
+    def __init__(
+        self,
+        timestamp: datetime,
+        op: Literal["read", "write", "evict"],
+        issue_region: str,
+        obj_key: str,
+        size: float,
+        next_access_timestamp: datetime = datetime.max,
+        next_access_same_reg_timestamp: datetime = datetime.max,
+        read_from: Union[str, List[str]] = None,
+    ):
+        self.timestamp = timestamp
+        self.op = op
+        self.issue_region = issue_region
+        self.obj_key = obj_key
+        self.size = size
+        self.next_access_timestamp = next_access_timestamp
+        self.next_access_same_reg_timestamp = next_access_same_reg_timestamp
+        self.read_from = read_from
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"Request({fields})"
+
+    def __eq__(self, other):
+        return isinstance(other, Request) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
+        )
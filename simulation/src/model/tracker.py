@@ -1,59 +1,110 @@
+from typing import Dict
+
 from src.utils.definitions import GB
+from src.utils.streaming_stats import QuantileSketch, ReservoirSample, RunningStat
 
 
 class Tracker:
-    def __init__(self):
-        self.latency_data = {"read": [], "write": []}
-        self.tput_runtime_data = {"read": [], "write": []}
-        self.throughput_data = {"read": [], "write": []}
-        self.transfer_costs = []
-        self.storage_costs = []
-        self.storage_costs_without_base = []
-        self.request_costs = []
-        self.request_sizes = []
+    """
+    Aggregated simulation metrics.
+
+    Per-request values are folded into running statistics and latency quantile
+    sketches, so memory does not grow with the trace length and trackers of
+    trace shards can be combined with `merge`. Pass `sample_size` to also keep a
+    bounded uniform sample of the raw values (see `get_detailed_metrics`).
+    """
+
+    def __init__(self, sample_size: int = 0):
+        self.latency_data = {"read": RunningStat(), "write": RunningStat()}
+        self.latency_sketches = {"read": QuantileSketch(), "write": QuantileSketch()}
+        self.tput_runtime_data = {"read": RunningStat(), "write": RunningStat()}
+        self.throughput_data = {"read": RunningStat(), "write": RunningStat()}
+        self.transfer_costs = RunningStat()
+        self.storage_costs = RunningStat()
+        self.storage_costs_without_base = RunningStat()
+        self.request_costs = RunningStat()
+        self.request_sizes = RunningStat()
         self.total_cost = 0
 
+        self.sample_size = sample_size
+        self.samples: Dict[str, ReservoirSample] = {}
+
         self.num_req = 0
         self.round_digit = 9
         self.duration = 0
         self.days_to_ignore = 0
 
+    def _sample(self, name: str, value: float):
+        if self.sample_size <= 0:
+            return
+        if name not in self.samples:
+            self.samples[name] = ReservoirSample(self.sample_size)
+        self.samples[name].add(value)
+
     def set_duration(self, duration):
         self.duration = duration
 
     def add_throughput(self, operation, throughput):
-        self.throughput_data[operation].append(throughput)
+        self.throughput_data[operation].add(throughput)
 
     def set_day_to_ignore(self, days_to_ignore):
         self.days_to_ignore = days_to_ignore
 
     def add_tput_runtime(self, operation, tput_runtime):
-        self.tput_runtime_data[operation].append(tput_runtime)
+        self.tput_runtime_data[operation].add(tput_runtime)
 
     def add_latency(self, operation, latency):
-        self.latency_data[operation].append(latency)
+        self.latency_data[operation].add(latency)
+        self.latency_sketches[operation].add(latency)
+        self._sample(f"{operation}_latencies", latency)
 
     def add_transfer_cost(self, cost):
-        self.transfer_costs.append(cost)
+        self.transfer_costs.add(cost)
+        self._sample("transfer_costs", cost)
 
     def add_storage_cost(self, cost):
-        self.storage_costs.append(cost)
+        self.storage_costs.add(cost)
+        self._sample("storage_costs", cost)
 
     def add_storage_cost_without_base(self, cost):
-        self.storage_costs_without_base.append(cost)
+        self.storage_costs_without_base.add(cost)
+        self._sample("storage_costs_without_base", cost)
 
     def add_request_cost(self, cost):
-        self.request_costs.append(cost)
+        self.request_costs.add(cost)
+        self._sample("request_costs", cost)
 
     def add_request_size(self, size):
-        self.request_sizes.append(size)
+        self.request_sizes.add(size)
         self.num_req += 1
 
-    def compute_average(self, data_list):
-        return round(sum(data_list) / len(data_list), 4) if data_list else 0
-
-    def compute_sum(self, data_list):
-        return round(sum(data_list), self.round_digit) if data_list else 0
+    def merge(self, other: "Tracker"):
+        """Fold the metrics of another tracker (e.g. of a trace shard) into this one"""
+        for operation in ["read", "write"]:
+            self.latency_data[operation].merge(other.latency_data[operation])
+            self.latency_sketches[operation].merge(other.latency_sketches[operation])
+            self.tput_runtime_data[operation].merge(other.tput_runtime_data[operation])
+            self.throughput_data[operation].merge(other.throughput_data[operation])
+        self.transfer_costs.merge(other.transfer_costs)
+        self.storage_costs.merge(other.storage_costs)
+        self.storage_costs_without_base.merge(other.storage_costs_without_base)
+        self.request_costs.merge(other.request_costs)
+        self.request_sizes.merge(other.request_sizes)
+        for name, sample in other.samples.items():
+            if name not in self.samples:
+                self.samples[name] = ReservoirSample(self.sample_size or sample.size)
+            self.samples[name].merge(sample)
+        self.num_req += other.num_req
+        self.duration = max(self.duration, other.duration)
+
+    def compute_average(self, stat: RunningStat):
+        return round(stat.total / stat.count, 4) if stat.count else 0
+
+    def compute_sum(self, stat: RunningStat):
+        return round(stat.total, self.round_digit) if stat.count else 0
+
+    def compute_quantile(self, sketch: QuantileSketch, q: float):
+        return round(sketch.quantile(q), 4)
 
     def get_metrics(self):
         tot_transfer_cost = self.compute_sum(self.transfer_costs)
@@ -72,6 +123,18 @@ class Tracker:
             "aggregate size (GB)": self.compute_sum(self.request_sizes) / GB,
             "avg read latency (ms)": self.compute_average(self.latency_data["read"]),
             "avg write latency (ms)": self.compute_average(self.latency_data["write"]),
+            "p50 read latency (ms)": self.compute_quantile(
+                self.latency_sketches["read"], 0.5
+            ),
+            "p99 read latency (ms)": self.compute_quantile(
+                self.latency_sketches["read"], 0.99
+            ),
+            "p50 write latency (ms)": self.compute_quantile(
+                self.latency_sketches["write"], 0.5
+            ),
+            "p99 write latency (ms)": self.compute_quantile(
+                self.latency_sketches["write"], 0.99
+            ),
             "avg read tput runtime (ms)": self.compute_average(
                 self.tput_runtime_data["read"]
             )
@@ -95,12 +158,17 @@ class Tracker:
         return metrics
 
     def get_detailed_metrics(self):
+        """Sampled raw values; empty unless the tracker was created with sample_size"""
+
+        def sampled(name):
+            return list(self.samples[name].values) if name in self.samples else []
+
         return {
-            "read_latencies": self.latency_data["read"],
-            "write_latencies": self.latency_data["write"],
-            "transfer_costs": self.transfer_costs,
-            "storage_costs": self.storage_costs,
-            "storage_costs_without_base": self.storage_costs_without_base,
-            "request_costs": self.request_costs,
+            "read_latencies": sampled("read_latencies"),
+            "write_latencies": sampled("write_latencies"),
+            "transfer_costs": sampled("transfer_costs"),
+            "storage_costs": sampled("storage_costs"),
+            "storage_costs_without_base": sampled("storage_costs_without_base"),
+            "request_costs": sampled("request_costs"),
             "total_cost": round(self.total_cost, self.round_digit),
         }
@@ -0,0 +1,105 @@
+from typing import List
+
+import networkx as nx
+
+from src.model.request import Request
+from src.utils.region_matrix import RegionMatrix
+
+
+class TransferPlan:
+    """
+    A transfer of (partitions of) one object from a single source region to one
+    or more destination regions, as decided by a transfer policy.
+
+    Edge metrics are stored per destination, aligned with `dsts`. Every edge
+    carries the same `partitions` out of `num_partitions`. Use `to_graph` to get
+    the equivalent networkx representation for debugging or plotting.
+    """
+
+    __slots__ = (
+        "obj_key",
+        "size",
+        "src",
+        "dsts",
+        "num_partitions",
+        "partitions",
+        "costs",
+        "latencies",
+        "throughputs",
+    )
+
+    def __init__(
+        self,
+        obj_key: str,
+        size: float,
+        src: str,
+        dsts: List[str],
+        costs: List[float],
+        latencies: List[float],
+        throughputs: List[float],
+        num_partitions: int = 1,
+        partitions: List[int] = None,
+    ):
+        assert len(dsts) == len(costs) == len(latencies) == len(throughputs)
+        self.obj_key = obj_key
+        self.size = size
+        self.src = src
+        self.dsts = dsts
+        self.num_partitions = num_partitions
+        self.partitions = partitions if partitions is not None else [0]
+        self.costs = costs
+        self.latencies = latencies
+        self.throughputs = throughputs
+
+    @classmethod
+    def direct(
+        cls, req: Request, src: str, dst: str, region_matrix: RegionMatrix
+    ) -> "TransferPlan":
+        """Single-edge, single-partition transfer of `req`'s object from src to dst."""
+        return cls(
+            obj_key=req.obj_key,
+            size=req.size,
+            src=src,
+            dsts=[dst],
+            costs=[region_matrix.get_cost(src, dst)],
+            latencies=[region_matrix.get_latency(src, dst)],
+            throughputs=[region_matrix.get_throughput(src, dst)],
+        )
+
+    @property
+    def latency(self) -> float:
+        """Transfer is done when the slowest destination has received the data"""
+        return max(self.latencies)
+
+    def __repr__(self):
+        edges = ", ".join(
+            f"{self.src}->{dst} (cost={c}, latency={l}, throughput={t})"
+            for dst, c, l, t in zip(
+                self.dsts, self.costs, self.latencies, self.throughputs
+            )
+        )
+        return (
+            f"TransferPlan(obj_key={self.obj_key!r}, size={self.size}, "
+            f"partitions={self.partitions}/{self.num_partitions}, edges=[{edges}])"
+        )
+
+    def to_graph(self) -> nx.DiGraph:
+        G = nx.DiGraph()
+        for dst, cost, latency, throughput in zip(
+            self.dsts, self.costs, self.latencies, self.throughputs
+        ):
+            G.add_edge(
+                self.src,
+                dst,
+                obj_key=self.obj_key,
+                size=self.size,
+                num_partitions=self.num_partitions,
+                partitions=self.partitions,
+                throughput=throughput,
+                cost=cost,
+                latency=latency,
+            )
+        G.nodes[self.src]["src"] = True
+        for dst in self.dsts:
+            G.nodes[dst]["dst"] = True
+        return G
@@ -15,6 +15,7 @@ from .policy_tevict_ranges_new import TevictRangesV2
 from .policy_optimal import Optimal
 from .policy_optimal_v2 import OptimalV2
 from .policy_lru import LRU
+from .policy_gdsf import GDSF
 from .policy_fixed_ttl import Fixed_TTL
 from .policy_keep import IndividualTTL
 from .policy_ewma import EWMA
@@ -2,8 +2,13 @@ from typing import List
 
 from src.model.config import Config
 from src.model.request import Request
+from src.utils.trace_reader import TraceConsumer
 
 
 class PlacementPolicy:
     def place(self, req: Request, config: Config) -> List[str]:
         pass
+
+    def trace_consumers(self) -> List[TraceConsumer]:
+        """Consumers that must observe the whole trace before the simulation starts"""
+        return []
@@ -63,7 +63,7 @@ class DynamicTTL(PlacementPolicy):
             )
             self.global_ttls[dst] = max(self.global_ttls.get(dst, 0) + delta_ttl, 0)
 
-        self.object_hits.pop((src, obj_key), None)
+        self.object_hits.pop((dst, obj_key), None)
 
     def object_hit(self, obj_key, region):
         self.object_hits[(region, obj_key)] = (
@@ -0,0 +1,37 @@
+from typing import List
+from src.model.region_mgmt import RegionManagerV2
+from src.placement_policy.policy import PlacementPolicy
+from src.model.config import Config
+from src.model.request import Request
+
+
+class GDSF(PlacementPolicy):
+    """
+    Write local, pull on read, and evict by GreedyDual-Size-Frequency (small,
+    frequently read objects are kept over large, rarely read ones) if the
+    region exceeds the cache size
+    """
+
+    def __init__(self, region_manager: RegionManagerV2, config: Config) -> None:
+        self.region_manager = region_manager
+        self.cache_size = config.cache_size
+        self.region_manager.enable_gdsf()
+
+        super().__init__()
+
+    def place(self, req: Request, config: Config = None) -> List[str]:
+        place_region = req.issue_region
+
+        if req.op == "read":
+            if self.region_manager.has_object_in_region(place_region, req.obj_key):
+                self.region_manager.record_access(place_region, req.obj_key, req.size)
+            elif (
+                req.size + self.region_manager.get_region_object_size(place_region)
+                > self.cache_size
+            ):
+                # Evict until the size is less than the cache size
+                self.region_manager.evict_gdsf(
+                    place_region, req.size, self.cache_size, req.timestamp
+                )
+
+        return [req.issue_region]
@@ -1,30 +1,32 @@
-import csv
 from src.placement_policy.policy import PlacementPolicy
 from src.model.config import Config
 from src.model.request import Request
+from src.model.transfer_plan import TransferPlan
 from src.model.object import LogicalObject
-from typing import Dict, Tuple, List
+from typing import Dict, Tuple, List, Set
 import networkx as nx
 
 from skypie.api import create_oracle, OracleType
 from collections import defaultdict
 from src.utils.helpers import refine_string, convert_hyphen_to_colon
+from src.utils.region_matrix import get_region_matrix
 from src.model.region_mgmt import RegionManager
+from src.utils.trace_reader import TraceConsumer
 from src.model.object import LogicalObject, Status
 
 
-class SkyPIE(PlacementPolicy):
+class SkyPIE(PlacementPolicy, TraceConsumer):
     def __init__(
         self,
         config: Config,
         total_graph: nx.DiGraph,
         objects: Dict[str, LogicalObject],
         region_mgmt: RegionManager,
-        trace_path: str,
         verbose: int = -1,
     ) -> None:
         self.config = config
         self.total_graph = total_graph
+        self.region_matrix = get_region_matrix(self.total_graph)
         self.objects = objects
         self.object_sizes: Dict[str, float] = {}
 
@@ -32,7 +34,7 @@ class SkyPIE(PlacementPolicy):
         self.access_sets_objects: Dict[
             Tuple, List[str]
         ] = {}  # for each access sets, what are the objects
-        self._update_access_sets(trace_path)
+        self.region_to_objects: Dict[str, Set[str]] = {}
 
         oracle_directory = config.oracle_directory
         assert oracle_directory is not None, "oracle_directory field is not set"
@@ -49,43 +51,27 @@ class SkyPIE(PlacementPolicy):
         self.past_get_decisions: Dict[str, Dict[str, str]] = {}
         super().__init__()
 
-    def _update_access_sets(self, trace_path: str):
+    def trace_consumers(self) -> List[TraceConsumer]:
+        return [self]
+
+    def observe(self, request: Request):
         """
-        Calculate access sets given a particular trace
+        Record which regions access each (versioned) object, from the simulator's
+        shared pre-scan of the trace
 
         Args:
-            trace_path (str): path to the trace file
+            request (Request): trace request
         """
-        region_to_objects = {}
-        versions = {}
-
-        with open(trace_path, "r") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                region = row["issue_region"]
-                obj_key = row["obj_key"]
-                size = float(row["size"])
-                op = None
-                if row["op"] == "GET" or row["op"] == "REST.GET.OBJECT":
-                    op = "read"
-                elif row["op"] == "PUT" or row["op"] == "REST.PUT.OBJECT":
-                    op = "write"
-                else:
-                    continue
-
-                if op == "write":
-                    if obj_key not in versions:
-                        versions[obj_key] = 0
-                    else:
-                        versions[obj_key] += 1
-
-                obj_key = obj_key + "-v" + str(versions[obj_key])
-
-                self.object_sizes[obj_key] = size
-                if region not in region_to_objects:
-                    region_to_objects[region] = set()
-                region_to_objects[region].add(obj_key)
+        self.object_sizes[request.obj_key] = request.size
+        if request.issue_region not in self.region_to_objects:
+            self.region_to_objects[request.issue_region] = set()
+        self.region_to_objects[request.issue_region].add(request.obj_key)
 
+    def finish(self):
+        """
+        Calculate access sets once the whole trace has been observed
+        """
+        region_to_objects = self.region_to_objects
         access_sets = {}
         for region, objects in region_to_objects.items():
             for obj in objects:
@@ -103,6 +89,7 @@ class SkyPIE(PlacementPolicy):
             if regions not in self.access_sets_objects:
                 self.access_sets_objects[regions] = []
             self.access_sets_objects[regions].append(obj_key)
+        self.region_to_objects = {}
 
     def aggregate_per_object(
         self,
@@ -217,7 +204,7 @@ class SkyPIE(PlacementPolicy):
         # print(f"Placement decisions for {key}: {place_regions}")
         return place_regions
 
-    def read_transfer_path(self, req: Request) -> Tuple[str, nx.DiGraph]:
+    def read_transfer_path(self, req: Request) -> Tuple[str, TransferPlan]:
         dst = req.issue_region
         assert req.obj_key in self.objects
 
@@ -233,54 +220,14 @@ class SkyPIE(PlacementPolicy):
                 for obj in self.objects[req.obj_key].physical_objects.values()
                 if obj.status == Status.ready
             ]
-            src = min(
-                region_list,
-                key=lambda x: (
-                    self.total_graph[x][dst]["cost"],
-                    self.total_graph[x][dst]["latency"],
-                ),
-            )
+            src, _ = self.region_matrix.cheapest_src(region_list, dst)
 
         if self.region_mgmt.has_object_in_region(req.issue_region, req.obj_key):
             src = req.issue_region
 
-        G = nx.DiGraph()
-        G.add_edge(
-            src,
-            dst,
-            obj_key=req.obj_key,
-            size=req.size,
-            num_partitions=1,
-            partitions=[0],
-            throughput=self.total_graph[src][dst]["throughput"],
-            cost=self.total_graph[src][dst]["cost"],
-            latency=self.total_graph[src][dst]["latency"],
-        )
-
-        # set the src attribute to src, and dst attribute to dst
-        G.nodes[src]["src"] = True
-        G.nodes[dst]["dst"] = True
-
-        return src, G
+        return src, TransferPlan.direct(req, src, dst, self.region_matrix)
 
-    def write_transfer_path(self, req: Request, dst: str) -> nx.DiGraph:
-        G = nx.DiGraph()
+    def write_transfer_path(self, req: Request, dst: str) -> TransferPlan:
         src = req.issue_region
 
-        G.add_edge(
-            src,
-            dst,
-            obj_key=req.obj_key,
-            size=req.size,
-            num_partitions=1,
-            partitions=[0],
-            throughput=self.total_graph[src][dst]["throughput"],
-            cost=self.total_graph[src][dst]["cost"],
-            latency=self.total_graph[src][dst]["latency"],
-        )
-
-        # set the src attribute to src, and dst attribute to dst
-        G.nodes[src]["src"] = True
-        G.nodes[dst]["dst"] = True
-
-        return G
+        return TransferPlan.direct(req, src, dst, self.region_matrix)
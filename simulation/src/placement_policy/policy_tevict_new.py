@@ -6,10 +6,12 @@ from src.model.region_mgmt import RegionManager
 from src.model.request import Request
 from src.model.object import LogicalObject
 import networkx as nx
+import numpy as np
 from collections import defaultdict
 from src.utils.definitions import GB
 from datetime import timedelta
 from src.placement_policy.policy import PlacementPolicy
+from src.utils.region_matrix import get_region_matrix
 from src.utils.helpers import (
     get_avg_network_cost,
     get_min_network_cost,
@@ -36,6 +38,7 @@ class TevictV2(PlacementPolicy):
             self.config.window_size
         )  # if -1, then window is entire history
         self.total_graph = total_graph
+        self.region_matrix = get_region_matrix(self.total_graph)
         self.objects = objects
         self.region_manager = regionManager
 
@@ -220,54 +223,68 @@ class TevictV2(PlacementPolicy):
 
         self.time_passed = request.timestamp
 
-    def calc_evict_cost(self, region, teven_hours, net_cost, storage_cost_hour):
+    def _cost_terms(self, region):
+        """
+        Prefix sums of the region's histograms shared by all cost curves of
+        pairs with `region` as destination (see `calc_evict_cost`)
+
+        Returns:
+            (kept, evicted, last) such that, for a TTL of c hours,
+            cost[c] = kept[c] * S + evicted[c] * (c * S + N) + last * c * S
+            with S the storage cost per hour and N the network cost;
+            None if there is no history for the region.
+        """
         if self.window_size == -1:
             if region not in self.next_hist or region not in self.next_last_hist:
-                return -1, -1
+                return None
             X = self.next_hist[region]
             last_X = self.next_last_hist[region]
         else:
             if region not in self.hist or region not in self.last_hist:
-                return -1, -1
+                return None
             X = self.hist[region]
             last_X = self.last_hist[region]
 
-        # storage_cost_hour = net_cost / teven_hours
-
-        cost_hist = {}  # [0] * (int(max(X.keys())) + 1)
-        # print("X: ", X)
-        if len(X.keys()) > 0:
-            maxKey = int(max(X.keys()))
-        else:
-            maxKey = 1
-
-        ret = 0
-        # list(X.keys()) + [maxKey + 1]
-        # print(min(maxKey+1, math.ceil(teven_hours)))
-        for c in range(min(maxKey + 1, math.ceil(teven_hours))):
-            # print(range(maxKey + 1))
-            c = int(c)
-            if c not in cost_hist:
-                cost_hist[c] = 0
-            tevict = c
-            for i in X:
-                if i <= tevict:
-                    # print(X)
-                    assert i >= 1
-                    cost_hist[c] += (
-                        float(X.get(i, 0)) * ((i - 1) + 0.6) * storage_cost_hour
-                    )
-
-                else:
-                    cost_hist[c] += float(X.get(i, 0)) * (
-                        (tevict * storage_cost_hour) + net_cost
-                    )
-
-                cost_hist[c] += float(last_X.get(i, 0)) * (tevict * storage_cost_hour)
-
-            if cost_hist[c] <= cost_hist[ret]:
-                ret = c
-        return (ret, cost_hist[ret])
+        maxKey = int(max(X.keys())) if len(X.keys()) > 0 else 1
+        x = np.zeros(maxKey + 1)
+        for i, size in X.items():
+            assert i >= 1
+            x[i] = size
+        hours = np.arange(maxKey + 1)
+        # requests within the TTL pay storage until their next access (~i - 0.4 h)
+        kept = np.cumsum(x * ((hours - 1) + 0.6))
+        # requests after the TTL pay storage for the TTL and a network transfer
+        # evicted[c] = x[c + 1:].sum(), as a true suffix sum: it is exactly 0
+        # past the last non-empty bin, as in the loop (ties pick the largest TTL)
+        evicted = np.append(np.cumsum(x[::-1])[::-1][1:], 0.0)
+        last = float(sum(last_X.get(i, 0) for i in X))
+        return kept, evicted, last
+
+    def calc_evict_cost(
+        self, region, teven_hours, net_cost, storage_cost_hour, terms=None
+    ):
+        """
+        Pick the TTL (in hours, below `teven_hours`) minimizing the expected cost
+        of the region's past access histogram. The cost curve of all candidate
+        TTLs is evaluated at once from prefix sums (`_cost_terms`), which can be
+        passed in when shared across region pairs with the same destination.
+        """
+        if terms is None:
+            terms = self._cost_terms(region)
+        if terms is None:
+            return -1, -1
+        kept, evicted, last = terms
+
+        num_ttls = max(min(len(kept), math.ceil(teven_hours)), 1)
+        c = np.arange(num_ttls)
+        cost_hist = (
+            kept[:num_ttls] * storage_cost_hour
+            + evicted[:num_ttls] * (c * storage_cost_hour + net_cost)
+            + last * (c * storage_cost_hour)
+        )
+        # Largest TTL among the cheapest ones
+        ret = num_ttls - 1 - int(np.argmin(cost_hist[::-1]))
+        return (ret, float(cost_hist[ret]))
 
     def get_tevict(self, src, dst, timestamp):  # decide ttl for obj in src
         if dst in self.seen_days and timestamp < self.seen_days[dst][-1] + timedelta(
@@ -276,16 +293,23 @@ class TevictV2(PlacementPolicy):
             return self.region_pairs_ttl[(src, dst)][-1]
 
         # if new day, calculate yesterday's ttl, otherwise use yesterday's ttl
+        cost_terms = {}
         for region in self.regions:
             for region2 in self.regions:
                 if region != region2:
-                    net_cost = self.total_graph[region][region2]["cost"]
-                    storage = self.total_graph.nodes[region2]["priceStorage"] * 3
+                    net_cost = self.region_matrix.get_cost(region, region2)
+                    storage = self.region_matrix.get_price_storage(region2) * 3
                     storage_cost_per_hour = storage / 24
                     teven = net_cost / storage * 60 * 60 * 24
 
+                    if region2 not in cost_terms:
+                        cost_terms[region2] = self._cost_terms(region2)
                     best_ttl, calculated_cost = self.calc_evict_cost(
-                        region2, teven / 3600, net_cost, storage_cost_per_hour
+                        region2,
+                        teven / 3600,
+                        net_cost,
+                        storage_cost_per_hour,
+                        cost_terms[region2],
                     )
                     self.region_pairs_ttl[(region, region2)].append(
                         self.find_min(best_ttl, teven, region2, timestamp)
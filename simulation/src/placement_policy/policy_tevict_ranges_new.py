@@ -1,3 +1,4 @@
+import bisect
 import datetime
 import math
 import statistics
@@ -7,11 +8,12 @@ from src.model.region_mgmt import RegionManager
 from src.model.request import Request
 from src.model.object import LogicalObject
 import networkx as nx
+import numpy as np
 from src.utils.definitions import GB
 from datetime import timedelta
 from src.placement_policy.policy import PlacementPolicy
+from src.utils.region_matrix import get_region_matrix
 from src.utils.helpers import get_avg_network_cost, get_min_network_cost
-from collections import OrderedDict
 
 
 """
@@ -19,6 +21,21 @@ from collections import OrderedDict
     Read to object that should be gone
 """
 
+############################################################
+HOUR = 60 * 60 * 1000
+MIN_IN_HOUR = 0.01666
+# TTL candidates (hours): 0, then ~1 minute growing by 2% per range
+RANGES = [
+    x / HOUR
+    for x in [0] + [MIN_IN_HOUR * HOUR * (1 + (2 / 100)) ** i for i in range(700)]
+]
+RANGES_ARRAY = np.array(RANGES)
+# Expected storage time (hours) of a request whose next access falls in range i
+RANGE_MIDPOINTS = np.array(
+    [(RANGES[i] + int(i != 0) * RANGES[i - 1]) / 2 for i in range(len(RANGES))]
+)
+############################################################
+
 
 class TevictRangesV2(PlacementPolicy):
     def __init__(
@@ -33,6 +50,7 @@ class TevictRangesV2(PlacementPolicy):
             self.config.window_size
         )  # if -1, then window is entire history
         self.total_graph = total_graph
+        self.region_matrix = get_region_matrix(self.total_graph)
         self.objects = objects
         self.region_manager = regionManager
 
@@ -97,27 +115,11 @@ class TevictRangesV2(PlacementPolicy):
         return (dt // 3600 + 1) * 3600
 
     def find_next_index_in_range(self, tnext: int, ranges):
-        tnext_in_hours = tnext / 3600
-        for i in range(0, len(ranges), 1):
-            if tnext_in_hours <= ranges[i]:
-                return i
+        i = bisect.bisect_left(ranges, tnext / 3600)
+        return i if i < len(ranges) else None
 
     def update_past_requests(self, request: Request, place_region: str):
-        ############################################################
-        KB = 1024
-        MB = 1024 * KB
-        GB = 1024 * MB
-        SEC = 1000
-        MIN = 60 * SEC
-        HOUR = 60 * MIN
-        SEC_IN_HOUR = 0.00028
-        MIN_IN_HOUR = 0.01666
-        s = MIN_IN_HOUR * HOUR
-        ranges_2per = [0] + [s * (1 + (2 / 100)) ** i for i in range(700)]
-        ranges_1H = [i * HOUR for i in range(169 + 1)]
-        ranges_30M = [i / 2 * HOUR for i in range(169 * 2)]
-        ranges = [x / HOUR for x in ranges_2per]
-        ############################################################
+        ranges = RANGES
 
         if self.window_size != -1:
             if self.last_updated is None or self.is_large_time_gap(
@@ -236,87 +238,66 @@ class TevictRangesV2(PlacementPolicy):
 
         self.time_passed = request.timestamp
 
-    def calc_evict_cost(self, region, teven_hours, net_cost):
+    def _cost_terms(self, region):
+        """
+        Prefix sums of the region's histograms shared by all cost curves of
+        pairs with `region` as destination (see `calc_evict_cost`)
+
+        Returns:
+            (total, kept, evicted, last) such that, for a TTL of RANGES[c] hours,
+            cost[c] = kept[c] * S + evicted[c] * (RANGES[c] * S + N)
+                      + last * RANGES[c] * S
+            with S the storage cost per hour and N the network cost (a TTL of 0
+            costs total * N); None if there is no history for the region.
+        """
         if self.window_size == -1:
             if region not in self.next_hist or region not in self.next_last_hist:
-                return -1
+                return None
             X = self.next_hist[region]
             last_X = self.next_last_hist[region]
         else:
             if region not in self.hist or region not in self.last_hist:
-                return -1
+                return None
             X = self.hist[region]
             last_X = self.last_hist[region]
 
+        x = np.array([float(X.get(i, 0)) for i in range(len(RANGES))])
+        # requests within the TTL pay storage until their next access (middle of
+        # their range), the others pay storage for the TTL and a network transfer
+        kept = np.cumsum(x * RANGE_MIDPOINTS)
+        # evicted[c] = x[c + 1:].sum(), as a true suffix sum: it is exactly 0
+        # past the last non-empty bin, as in the loop (ties pick the largest TTL)
+        evicted = np.append(np.cumsum(x[::-1])[::-1][1:], 0.0)
+        last = float(sum(float(last_X.get(i, 0)) for i in range(len(RANGES))))
+        return float(x.sum()), kept, evicted, last
+
+    def calc_evict_cost(self, region, teven_hours, net_cost, terms=None):
+        """
+        Pick the TTL range minimizing the expected cost of the region's past
+        access histogram. The cost curve of all ranges is evaluated at once from
+        prefix sums (`_cost_terms`), which can be passed in when shared across
+        region pairs with the same destination.
+        """
+        if terms is None:
+            terms = self._cost_terms(region)
+        if terms is None:
+            return -1
+        total, kept, evicted, last = terms
+
         if teven_hours == 0:
             storage_cost_hour = self.avgNetworkCost / teven_hours
         else:
             storage_cost_hour = net_cost / teven_hours
-        ############################################################
-        KB = 1024
-        MB = 1024 * KB
-        GB = 1024 * MB
-        SEC = 1000
-        MIN = 60 * SEC
-        HOUR = 60 * MIN
-        SEC_IN_HOUR = 0.00028
-        MIN_IN_HOUR = 0.01666
-        s = MIN_IN_HOUR * HOUR
-        ranges_2per = [0] + [s * (1 + (2 / 100)) ** i for i in range(700)]
-        ranges_1H = [i * HOUR for i in range(169 + 1)]
-        ranges_30M = [i / 2 * HOUR for i in range(169 * 2)]
-        ranges = [x / HOUR for x in ranges_2per]
-        ############################################################
-        cost_hist = {}  # [0] * (int(max(X.keys())) + 1)
-        # print("X: ", X)
-        if len(X.keys()) > 0:
-            maxKey = int(max(X.keys()))
-        else:
-            maxKey = 1
-
-        ret = 0
-
-        # list(X.keys()) + [maxKey + 1]
-        for c in range(len(ranges)):  # hours
-            # print(range(maxKey + 1))
-            c = int(c)
-            if c not in cost_hist:
-                cost_hist[c] = 0
-            tevict = ranges[c]
-            # for i in X:
-            for i in range(len(ranges)):
-                if (X.get(i, 0)) == 0:
-                    continue
-                if tevict == 0:
-                    cost_hist[c] += float(X.get(i, 0)) * (net_cost)
-                    continue
-                if ranges[i] <= tevict:
-                    cost_hist[c] += (
-                        float(X.get(i, 0))
-                        * ((ranges[i] + int(i != 0) * (ranges[i - 1])) / 2)
-                        * storage_cost_hour
-                    )
-                else:
-                    cost_hist[c] += float(X.get(i, 0)) * (
-                        (tevict * storage_cost_hour) + net_cost
-                    )
-            for i in range(len(ranges)):
-                if (last_X.get(i, 0)) == 0:
-                    continue
-                cost_hist[c] += float(last_X.get(i, 0)) * (tevict * storage_cost_hour)
-
-            if cost_hist[c] <= cost_hist[ret]:
-                ret = c
-        ##
 
-        Y = OrderedDict()
-        for i in sorted(X.keys()):
-            Y[i] = X.get(i, 0)
-        # print(region)
-        # print(Y)
-
-        # print(ranges[ret])
-        return ranges[ret]
+        cost_hist = (
+            kept * storage_cost_hour
+            + evicted * (RANGES_ARRAY * storage_cost_hour + net_cost)
+            + last * (RANGES_ARRAY * storage_cost_hour)
+        )
+        cost_hist[0] = total * net_cost
+        # Largest TTL among the cheapest ones
+        ret = len(cost_hist) - 1 - int(np.argmin(cost_hist[::-1]))
+        return RANGES[ret]
 
     def get_tevict(self, src, dst, timestamp):
         if dst in self.seen_days and timestamp < self.seen_days[dst][-1] + timedelta(
@@ -324,14 +305,17 @@ class TevictRangesV2(PlacementPolicy):
         ):
             return self.region_pairs_ttl[(src, dst)][-1]
         # if new day, calculate yesterday's ttl, otherwise use yesterday's ttl
+        cost_terms = {}
         for region in self.regions:
             for region2 in self.regions:
                 if region != region2:
-                    net_cost = self.total_graph[region][region2]["cost"]
-                    storage = self.total_graph.nodes[region2]["priceStorage"]
+                    net_cost = self.region_matrix.get_cost(region, region2)
+                    storage = self.region_matrix.get_price_storage(region2)
                     teven = net_cost / storage * 60 * 60 * 24
+                    if region2 not in cost_terms:
+                        cost_terms[region2] = self._cost_terms(region2)
                     calculated_cost = self.calc_evict_cost(
-                        region2, teven / 3600, net_cost
+                        region2, teven / 3600, net_cost, cost_terms[region2]
                     )
                     self.region_pairs_ttl[(region, region2)].append(
                         self.find_min(calculated_cost, teven, region2, timestamp)
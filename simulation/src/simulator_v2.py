@@ -1,7 +1,8 @@
-import csv
 from datetime import datetime
-import os
-from typing import Dict, List, Set
+from typing import Any, Dict, List, Set
+
+import networkx as nx
+
 from src.placement_policy import (
     LocalWrite,
     SingleRegionWrite,
@@ -16,6 +17,7 @@ from src.placement_policy import (
     OptimalV2,
     SPANStore,
     LRU,
+    GDSF,
     Fixed_TTL,
     AlwaysEvict,
     EWMA,
@@ -40,8 +42,11 @@ from src.utils.definitions import (
 from src.model.region_mgmt import RegionManagerV2
 from src.model.object import LogicalObject, PhysicalObject, Status
 from src.model.tracker import Tracker
+from src.utils.streaming_stats import RunningStat
 from src.model.request import Request
-import networkx as nx
+from src.model.transfer_plan import TransferPlan
+from src.utils.trace_reader import TraceReader
+from src.utils.region_matrix import get_region_matrix
 
 # import matplotlib.pyplot as plt
 import logging
@@ -50,29 +55,12 @@ from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
 from src.utils.definitions import GB
 import textwrap
 from datetime import timedelta
-from collections import defaultdict
 
 logging.basicConfig(level=logging.CRITICAL, format="%(message)s")
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.CRITICAL)
 
 
-def versionate_trace(trace_path: str, out_path: str):
-    versions = defaultdict(int)
-    with open(get_full_path(trace_path), "r") as f, open(
-        out_path, "w", newline=""
-    ) as out_file:
-        reader = csv.DictReader(f)
-        writer = csv.DictWriter(out_file, fieldnames=reader.fieldnames)
-        writer.writeheader()
-        for row in reader:
-            if row["op"] == "PUT" or row["op"] == "REST.PUT.OBJECT":
-                versions[row["obj_key"]] += 1
-            new_version_id = row["obj_key"] + "-v" + str(versions[row["obj_key"]])
-            row["obj_key"] = new_version_id
-            writer.writerow(row)
-
-
 class SimulatorV2:
     def __init__(
         self,
@@ -83,8 +71,14 @@ class SimulatorV2:
         days: int = 0,
         version_enable: bool = False,
         store_decision: bool = False,
+        config_overrides: Dict[str, Any] = None,
+        total_graph: nx.DiGraph = None,
+        sample_size: int = 0,
     ):
         self.config = load_config(config_path)
+        # e.g. a parameter sweep running one config under several transfer policies
+        for field, value in (config_overrides or {}).items():
+            setattr(self.config, field, value)
         self.trace_path = trace_path
         self._print_config_details()
 
@@ -116,20 +110,24 @@ class SimulatorV2:
         ]
         self.other_eviction_policies = [
             "lru",
+            "gdsf",
             "always_evict",
             "pull_on_read",
             "replicate_all",
         ]
         self.spanstore_policies = ["spanstore", "oracle"]
         self.precompute_policy = ["spanstore", "oracle", "optimal", "ewma"]
-        self.total_graph = make_nx_graph()
+        # The graph is read-only during the simulation, so it can be built once
+        # and shared by several simulators (see sweep.py)
+        self.total_graph = total_graph if total_graph is not None else make_nx_graph()
+        self.region_matrix = get_region_matrix(self.total_graph)
 
         self.minNetworkCost = get_min_network_cost(self.total_graph)
         self.avgNetworkCost = get_avg_network_cost(self.total_graph)
         self.medianNetworkCost = get_median_network_cost(self.total_graph)
 
         self.num_vms = num_vms
-        self.tracker = Tracker()
+        self.tracker = Tracker(sample_size=sample_size)
         self.tracker.set_day_to_ignore(self.days_to_ignore_cost)
 
         self.logical_objects: Dict[str, LogicalObject] = {}  # key to logical object
@@ -149,8 +147,8 @@ class SimulatorV2:
             self.transfer_policy = None
 
         self.events = []
-        self.tevens = []
-        self.runtime_throughputs = []
+        self.tevens = RunningStat()
+        self.runtime_throughputs = RunningStat()
         self.hits = 0
         self.misses = 0
         self.hits_size = 0
@@ -167,7 +165,7 @@ class SimulatorV2:
         self.is_updating_placement = False
 
         self.evict = 0
-        self.ttl_log = []
+        self.ttl_log = RunningStat()
 
         self.good_choices = 0
         self.total_choices = 1
@@ -176,7 +174,7 @@ class SimulatorV2:
         self,
         current_timestamp: datetime,
         request: Request,
-        transfer_graphs: List[nx.DiGraph],
+        transfer_plans: List[TransferPlan],
         place_regions: List[str],
         ttl: bool,
         op: str,
@@ -190,32 +188,17 @@ class SimulatorV2:
             self.placement_policy.update_past_requests(request, request.issue_region)
 
         transfer_times = []
-        for i in range(len(transfer_graphs)):
-            transfer_graph = transfer_graphs[i]
-            src = [
-                node
-                for node in transfer_graph.nodes
-                if transfer_graph.nodes[node].get("src", False)
-            ]
-            dsts = [
-                node
-                for node in transfer_graph.nodes
-                if transfer_graph.nodes[node].get("dst", False)
-            ]
+        for i in range(len(transfer_plans)):
+            transfer_plan = transfer_plans[i]
+            src = transfer_plan.src
 
             if op == "read":
-                request.read_from = src
+                request.read_from = [src]
 
-            assert (
-                len(src) == 1
-            ), f"Graphs look like: {transfer_graph.nodes.data()}, src: {src}, dsts: {dsts}"
-            transfer_time_millis = max(
-                [transfer_graph[src[0]][dst]["latency"] for dst in dsts]
-            )
+            transfer_time_millis = transfer_plan.latency
             logger.debug(f"transfer time (ms): {transfer_time_millis}")
 
             schedule_place_region = place_regions[i] if len(place_regions) > 0 else []
-            src = list(transfer_graph.edges)[0][0]
 
             key = request.obj_key
             physical_objects = self.logical_objects[key].physical_objects
@@ -261,19 +244,14 @@ class SimulatorV2:
                         )
                         net_cost = self.medianNetworkCost
                     else:
-                        src_2 = min(
-                            region_list,
-                            key=lambda x: (
-                                self.total_graph[x][request.issue_region]["cost"],
-                                self.total_graph[x][request.issue_region]["latency"],
-                            ),
+                        _, net_cost = self.region_matrix.cheapest_src(
+                            region_list, request.issue_region
                         )
-                        net_cost = self.total_graph[src_2][request.issue_region]["cost"]
 
                     # calculate `teven`
                     teven = (
                         net_cost
-                        / self.total_graph.nodes[request.issue_region]["priceStorage"]
+                        / self.region_matrix.get_price_storage(request.issue_region)
                         * 60
                         * 60
                         * 24
@@ -335,24 +313,15 @@ class SimulatorV2:
                         if len(region_list) == 0:
                             net_cost = self.medianNetworkCost
                         else:
-                            src_2 = min(
-                                region_list,
-                                key=lambda x: (
-                                    self.total_graph[x][request.issue_region]["cost"],
-                                    self.total_graph[x][request.issue_region][
-                                        "latency"
-                                    ],
-                                ),
+                            _, net_cost = self.region_matrix.cheapest_src(
+                                region_list, request.issue_region
                             )
-                            net_cost = self.total_graph[src_2][request.issue_region][
-                                "cost"
-                            ]
 
                         teven = (
                             net_cost
-                            / self.total_graph.nodes[request.issue_region][
-                                "priceStorage"
-                            ]
+                            / self.region_matrix.get_price_storage(
+                                request.issue_region
+                            )
                             * 60
                             * 60
                             * 24
@@ -374,6 +343,7 @@ class SimulatorV2:
                                     - physical_object.get_storage_start_time()
                                 ).total_seconds()
                             )
+                            self.region_manager.schedule_expiry(physical_object)
 
                             if (
                                 new_ttl
@@ -384,7 +354,7 @@ class SimulatorV2:
                             ):
                                 self.good_choices += 1
                             self.total_choices += 1
-                            self.ttl_log.append(new_ttl)
+                            self.ttl_log.add(new_ttl)
                         else:
                             if (
                                 teven
@@ -416,26 +386,15 @@ class SimulatorV2:
                             if len(region_list) == 0:
                                 net_cost = self.medianNetworkCost
                             else:
-                                src_2 = min(
-                                    region_list,
-                                    key=lambda x: (
-                                        self.total_graph[x][request.issue_region][
-                                            "cost"
-                                        ],
-                                        self.total_graph[x][request.issue_region][
-                                            "latency"
-                                        ],
-                                    ),
+                                _, net_cost = self.region_matrix.cheapest_src(
+                                    region_list, request.issue_region
                                 )
-                                net_cost = self.total_graph[src_2][
-                                    request.issue_region
-                                ]["cost"]
 
                             ttl = (
                                 net_cost
-                                / self.total_graph.nodes[request.issue_region][
-                                    "priceStorage"
-                                ]
+                                / self.region_matrix.get_price_storage(
+                                    request.issue_region
+                                )
                                 * 60
                                 * 60
                                 * 24
@@ -485,6 +444,7 @@ class SimulatorV2:
                                     - physical_object.get_storage_start_time()
                                 ).total_seconds()
                             )
+                            self.region_manager.schedule_expiry(physical_object)
 
             # Schedule the completion of the transfer after the transfer time
             if (
@@ -513,6 +473,7 @@ class SimulatorV2:
                                 ).total_seconds()
                                 phys_obj.set_ttl(seconds + transfer_time_millis / 1000)
                                 phys_obj.expire_immediate = False
+                                self.region_manager.schedule_expiry(phys_obj)
 
                     obj_ttl = self.calculate_ttl(
                         request, current_timestamp, src, schedule_place_region
@@ -528,6 +489,7 @@ class SimulatorV2:
                     phys_object.set_storage_start_time(
                         current_timestamp + timedelta(milliseconds=transfer_time_millis)
                     )
+                    phys_object.source_region = src
                     self.logical_objects[request.obj_key].physical_objects[
                         schedule_place_region
                     ] = phys_object
@@ -539,6 +501,16 @@ class SimulatorV2:
 
         return transfer_times
 
+    def _on_replica_expired(self, physical_object: PhysicalObject):
+        if self.config.placement_policy == "dynamicttl":
+            # Feed the lifetime of the expired cache replica back to its region
+            self.placement_policy.update_global_ttl(
+                physical_object.get_ttl(),
+                physical_object.key,
+                physical_object.source_region or physical_object.location_tag,
+                physical_object.location_tag,
+            )
+
     def get_placements(self, request: Request):
         obj_key = request.obj_key
         place_regions = []
@@ -595,13 +567,13 @@ class SimulatorV2:
                 ttl = float("inf")
 
             elif self.config.placement_policy == "teven":
-                net_cost = self.total_graph[source][dst]["cost"]
+                net_cost = self.region_matrix.get_cost(source, dst)
                 # for moving `base_region` case, make sure N is not zero because N/S=0 => ttl=0
                 if not self.config.fixed_base_region and net_cost == 0:
                     net_cost = self.medianNetworkCost
                 ttl = (
                     net_cost
-                    / self.total_graph.nodes[dst]["priceStorage"]
+                    / self.region_matrix.get_price_storage(dst)
                     * 60
                     * 60
                     * 24
@@ -609,7 +581,7 @@ class SimulatorV2:
                 )
                 ttl = round(ttl)
 
-                self.tevens.append(ttl / 3600)
+                self.tevens.add(ttl / 3600)
 
             elif (
                 self.config.placement_policy == "tevict"
@@ -625,18 +597,13 @@ class SimulatorV2:
                 if len(region_list) == 0:
                     net_cost = self.medianNetworkCost
                 else:
-                    src_2 = min(
-                        region_list,
-                        key=lambda x: (
-                            self.total_graph[x][request.issue_region]["cost"],
-                            self.total_graph[x][request.issue_region]["latency"],
-                        ),
+                    _, net_cost = self.region_matrix.cheapest_src(
+                        region_list, request.issue_region
                     )
-                    net_cost = self.total_graph[src_2][request.issue_region]["cost"]
 
                 ttl = (
                     net_cost
-                    / self.total_graph.nodes[request.issue_region]["priceStorage"]
+                    / self.region_matrix.get_price_storage(request.issue_region)
                     * 60
                     * 60
                     * 24
@@ -667,7 +634,7 @@ class SimulatorV2:
                     ttl = set_ttl
 
                 ttl = round(ttl)
-                self.tevens.append(ttl / 3600)
+                self.tevens.add(ttl / 3600)
 
             elif self.config.placement_policy == "fixedttl":
                 ttl = (
@@ -676,14 +643,14 @@ class SimulatorV2:
                 ttl = round(ttl)
 
             elif self.config.placement_policy == "dynamicttl":
-                net_cost = self.total_graph[source][dst]["cost"]
+                net_cost = self.region_matrix.get_cost(source, dst)
                 # for moving `base_region` case, make sure N is not zero because N/S=0 => ttl=0
                 if not self.config.fixed_base_region and net_cost == 0:
                     net_cost = self.medianNetworkCost
 
                 teven = (
                     net_cost
-                    / self.total_graph.nodes[dst]["priceStorage"]
+                    / self.region_matrix.get_price_storage(dst)
                     * 60
                     * 60
                     * 24
@@ -696,14 +663,14 @@ class SimulatorV2:
                 self.config.placement_policy == "to_keep"
                 or self.config.placement_policy == "ewma"
             ):
-                net_cost = self.total_graph[source][dst]["cost"]
+                net_cost = self.region_matrix.get_cost(source, dst)
                 if not self.config.fixed_base_region and net_cost == 0:
                     net_cost = self.medianNetworkCost
                 ttl = min(
                     self.placement_policy.estimate_arrival_recency(dst, obj_key)
                     * self.placement_policy.factor,
                     net_cost
-                    / self.total_graph.nodes[dst]["priceStorage"]
+                    / self.region_matrix.get_price_storage(dst)
                     * 60
                     * 60
                     * 24
@@ -719,7 +686,8 @@ class SimulatorV2:
                     self.good_choices += 1
                 self.total_choices += 1
 
-            elif self.config.placement_policy == "pull_on_read":
+            elif self.config.placement_policy in ["pull_on_read", "lru", "gdsf"]:
+                # Cached until evicted by the cache policy
                 ttl = -1
 
             elif self.config.placement_policy == "always_evict":
@@ -736,25 +704,22 @@ class SimulatorV2:
     def run(self):
         logger.info("Running simulations...")
 
-        read_graphs, write_graphs = [], []
+        read_plans, write_plans = [], []
         start_timestamp, end_timestamp = None, None
-        num_lines = sum(1 for _ in open(get_full_path(self.trace_path), "r"))
 
-        if self.version_enable:
-            versionate_trace(self.trace_path, self.trace_path + "-versioned")
-            self.trace_path += "-versioned"
+        # One streaming pass per consumer group: versions are assigned on the fly
+        # and policies needing the whole trace up front share a single pre-scan
+        reader = TraceReader(get_full_path(self.trace_path), self.version_enable)
+        reader.prescan(self.placement_policy.trace_consumers())
 
         # Actual simulation of requests
-        with open(get_full_path(self.trace_path), "r") as f, open(
+        with open(
             get_full_path(self.trace_path)
             + "."
             + self.config.placement_policy
             + ".prototype",
             "w",
         ) as outfile:
-            reader = csv.DictReader(f)
-            fieldnames = reader.fieldnames + ["answer_region"]
-            fieldnames = fieldnames[:5] + [fieldnames[7]]
             with Progress(
                 TextColumn("{task.fields[filename]}"),
                 SpinnerColumn(),
@@ -764,13 +729,13 @@ class SimulatorV2:
             ) as progress:
                 task = progress.add_task(
                     "[cyan]Processing...",
-                    total=num_lines - 1,
+                    total=reader.total,
                     filename="Processing requests",
                 )
 
-                for row in reader:
-                    write_graphs, read_graphs = [], []
-                    read_transfer_graph, write_transfer_graph = None, None
+                for request in reader.requests():
+                    write_plans, read_plans = [], []
+                    read_transfer_plan, write_transfer_plan = None, None
                     runtime, latency, throughput, cost = 0, 0, 0, 0
                     policy = (
                         self.placement_policy
@@ -779,73 +744,6 @@ class SimulatorV2:
                     )
                     read_region = ""
 
-                    timestamp_str = row["timestamp"]
-                    if (
-                        timestamp_str.replace("-", "")
-                        .replace(":", "")
-                        .replace(" ", "")
-                        .isdigit()
-                    ):
-                        request_timestamp = datetime.fromtimestamp(
-                            int(timestamp_str) / 1000
-                        )
-                    else:
-                        request_timestamp = datetime.fromisoformat(timestamp_str / 1000)
-
-                    request_data = {k: v for k, v in row.items()}
-                    request_data["timestamp"] = request_timestamp
-
-                    if (
-                        request_data["op"] == "GET"
-                        or request_data["op"] == "REST.GET.OBJECT"
-                    ):
-                        request_data["op"] = "read"
-                    elif (
-                        request_data["op"] == "PUT"
-                        or request_data["op"] == "REST.PUT.OBJECT"
-                    ):
-                        request_data["op"] = "write"
-                    else:
-                        continue
-
-                    next_access_timestamp_str = row["time_to_next_access"]
-                    if (
-                        next_access_timestamp_str.replace("-", "")
-                        .replace(":", "")
-                        .replace(" ", "")
-                        .isdigit()
-                    ):
-                        next_access_timestamp = datetime.fromtimestamp(
-                            int(next_access_timestamp_str) / 1000
-                        )
-                    else:
-                        next_access_timestamp = datetime.fromisoformat(
-                            next_access_timestamp_str / 1000
-                        )
-                    request_data["next_access_timestamp"] = next_access_timestamp
-
-                    next_access_same_reg_timestamp_str = row[
-                        "time_to_next_access_same_reg"
-                    ]
-                    if next_access_same_reg_timestamp_str != "-1":
-                        if (
-                            next_access_same_reg_timestamp_str.replace("-", "")
-                            .replace(":", "")
-                            .replace(" ", "")
-                            .isdigit()
-                        ):
-                            next_access_same_reg_timestamp = datetime.fromtimestamp(
-                                int(next_access_same_reg_timestamp_str) / 1000
-                            )
-                        else:
-                            next_access_same_reg_timestamp = datetime.fromisoformat(
-                                next_access_same_reg_timestamp_str / 1000
-                            )
-                        request_data[
-                            "next_access_same_reg_timestamp"
-                        ] = next_access_same_reg_timestamp
-
-                    request = Request(**request_data)
                     obj_key = request.obj_key
 
                     if start_timestamp is None:
@@ -854,6 +752,11 @@ class SimulatorV2:
                             start_timestamp, self.days_to_ignore_cost
                         )
 
+                    # Expire replicas whose TTL ran out before this request
+                    self.region_manager.expire_objects(
+                        request.timestamp, self._on_replica_expired
+                    )
+
                     current_day = (request.timestamp - start_timestamp).days
                     if current_day >= self.days_to_ignore_cost:
                         self.ignore_cost = False
@@ -885,7 +788,7 @@ class SimulatorV2:
                         )
 
                     if request.op == "read":
-                        read_region, read_transfer_graph = policy.read_transfer_path(
+                        read_region, read_transfer_plan = policy.read_transfer_path(
                             request
                         )
                         if read_region != request.issue_region:
@@ -894,7 +797,7 @@ class SimulatorV2:
                         else:
                             self.hits += 1
                             self.hits_size += request.size / GB
-                        read_graphs.append(read_transfer_graph)
+                        read_plans.append(read_transfer_plan)
 
                         place_regions = self.get_placements(request)
 
@@ -902,7 +805,7 @@ class SimulatorV2:
                         transfer_time = self.initiate_data_transfer(
                             request.timestamp,
                             request,
-                            [read_transfer_graph],
+                            [read_transfer_plan],
                             [request.issue_region]
                             if request.issue_region in place_regions
                             else [],
@@ -956,15 +859,15 @@ class SimulatorV2:
                     elif request.op == "write":
                         place_regions = self.get_placements(request)
                         for region in place_regions:
-                            write_transfer_graph = policy.write_transfer_path(
+                            write_transfer_plan = policy.write_transfer_path(
                                 request, dst=region
                             )
-                            write_graphs.append(write_transfer_graph)
+                            write_plans.append(write_transfer_plan)
 
                         self.initiate_data_transfer(
                             request.timestamp,
                             request,
-                            write_graphs[-len(place_regions) :],
+                            write_plans[-len(place_regions) :],
                             place_regions,
                             True
                             if self.config.placement_policy
@@ -999,13 +902,13 @@ class SimulatorV2:
 
                     # Update metrics
                     self.tracker.add_request_size(request.size)
-                    if read_transfer_graph is not None:
+                    if read_transfer_plan is not None:
                         (
                             tput,
                             tput_runtime,
                             read_latency,
                             c,
-                        ) = self._update_transfer_metric(read_transfer_graph, request)
+                        ) = self._update_transfer_metric(read_transfer_plan, request)
                         logger.debug(
                             f"Read latency: {read_latency}, throughput: {tput}, throughput_runtime: {tput_runtime}, cost: {c}"
                         )
@@ -1021,15 +924,15 @@ class SimulatorV2:
                         throughput += tput
                         cost += c
 
-                    if write_transfer_graph is not None:
+                    if write_transfer_plan is not None:
                         overall_latency, overall_runtime, overall_tput = [], [], []
-                        for write_graph in write_graphs[-len(place_regions) :]:
+                        for write_plan in write_plans[-len(place_regions) :]:
                             (
                                 tput,
                                 tput_runtime,
                                 w_latency,
                                 c,
-                            ) = self._update_transfer_metric(write_graph, request)
+                            ) = self._update_transfer_metric(write_plan, request)
                             logger.debug(
                                 f"Write latency: {w_latency}, throughput: {tput}, throughput_runtime: {tput_runtime}, cost: {c}"
                             )
@@ -1058,20 +961,20 @@ class SimulatorV2:
                             self.tracker.add_latency("write", write_latency)
 
                     for region in place_regions:
-                        put_cost = self.total_graph.nodes[region]["pricePut"]
+                        put_cost = self.region_matrix.get_price_put(region)
                         if not self.ignore_cost:
                             self.tracker.add_request_cost(put_cost)
 
                         cost += put_cost
 
                     if read_region != "":
-                        get_cost = self.total_graph.nodes[region]["priceGet"]
+                        get_cost = self.region_matrix.get_price_get(region)
 
                         if not self.ignore_cost:
                             self.tracker.add_request_cost(get_cost)
                         cost += get_cost
 
-                    progress.update(task, advance=1)
+                    progress.update(task, completed=reader.position)
                     end_timestamp = request.timestamp
 
                     # For SPANStore, regenerate decisions
@@ -1081,23 +984,31 @@ class SimulatorV2:
 
                         if self.moving_idx % 10000 == 0:
                             print(
-                                f"Now processed {self.moving_idx} requests out of {num_lines}: {round(self.moving_idx / num_lines * 100, 2)}%"
+                                f"Now processed {self.moving_idx} requests: {round(reader.progress() * 100, 2)}%"
                             )
 
                     if self.store_decision:
-                        temp_row = row.copy()
+                        temp_row = {
+                            "timestamp": request.timestamp,
+                            "op": request.op,
+                            "issue_region": request.issue_region,
+                            "obj_key": request.obj_key,
+                            "size": request.size,
+                        }
                         if request.op == "write":
                             temp_row["answer_region"] = request.issue_region
                         else:
                             temp_row["answer_region"] = request.read_from[0]
-                        temp_row.pop("time_to_next_access", None)
-                        temp_row.pop("time_to_next_access_same_reg", None)
                         # writer.writerow(temp_row)
 
                 if end_timestamp and start_timestamp:
                     remained_process_time = timedelta(seconds=50)
                     duration = remained_process_time + end_timestamp - start_timestamp
                     self.tracker.set_duration(duration)
+                    self.region_manager.expire_objects(
+                        remained_process_time + end_timestamp,
+                        self._on_replica_expired,
+                    )
                     self.region_manager.calculate_remaining_storage_costs(
                         remained_process_time + end_timestamp, self.logical_objects
                     )
@@ -1105,7 +1016,7 @@ class SimulatorV2:
         self._print_region_manager()
         if self.config.placement_policy == "teven":
             print(len(self.tevens))
-            print("Avg Teven: ", sum(self.tevens) / len(self.tevens))
+            print("Avg Teven: ", self.tevens.mean())
         if (
             self.config.placement_policy == "tevict"
             or self.config.placement_policy == "tevict_ranges"
@@ -1125,15 +1036,22 @@ class SimulatorV2:
         )
         print(
             "Avg runtime_throughput:",
-            sum(self.runtime_throughputs) / len(self.runtime_throughputs),
+            self.runtime_throughputs.mean(),
         )
 
         print(self.good_choices, self.total_choices)
-        print(self.ttl_log)
+        print(
+            "TTLs: count",
+            self.ttl_log.count,
+            "avg",
+            self.ttl_log.mean(),
+            "min",
+            self.ttl_log.min,
+            "max",
+            self.ttl_log.max,
+        )
 
         print(self.trace_path)
-        if os.path.exists(self.trace_path):
-            os.remove(self.trace_path)
 
     def _print_config_details(self):
         config_str = textwrap.dedent(
@@ -1160,9 +1078,8 @@ class SimulatorV2:
         logger.info(config_str)
 
     ############################ REPORT FUNCTIONS ############################
-    def report_metrics(self):
-        table = PrettyTable()
-        table.field_names = ["Metric", "Value"]
+    def collect_metrics(self) -> Dict[str, Any]:
+        """Add the final storage costs to the tracker and return its metrics"""
         print(
             self.region_manager.storage_costs_without_base,
             self.region_manager.storage_costs,
@@ -1171,8 +1088,12 @@ class SimulatorV2:
         self.tracker.add_storage_cost_without_base(
             self.region_manager.aggregate_storage_cost_without_base()
         )
+        return self.tracker.get_metrics()
 
-        metrics = self.tracker.get_metrics()
+    def report_metrics(self):
+        table = PrettyTable()
+        table.field_names = ["Metric", "Value"]
+        metrics = self.collect_metrics()
 
         for key, value in metrics.items():
             table.add_row([key, value])
@@ -1189,37 +1110,20 @@ class SimulatorV2:
 
         self.region_manager.print_stat()
 
-    def _update_transfer_metric(self, transfer_graph: nx.DiGraph, request: Request):
-        num_partitions = list(transfer_graph.edges.data())[0][-1]["num_partitions"]
-        throughput = min(
-            [edge[-1]["throughput"] for edge in transfer_graph.edges.data()]
+    def _update_transfer_metric(self, transfer_plan: TransferPlan, request: Request):
+        # Every edge of a plan moves the same partitions of the object
+        partition_size = (
+            request.size
+            * len(transfer_plan.partitions)
+            / (GB * transfer_plan.num_partitions)
         )
+        throughput = min(transfer_plan.throughputs)
         throughput_runtime = min(
-            [
-                request.size
-                * len(edge[-1]["partitions"])
-                / (GB * num_partitions)
-                * (1 / edge[-1]["throughput"])
-                for edge in transfer_graph.edges.data()
-            ]
+            [partition_size * (1 / tput) for tput in transfer_plan.throughputs]
         )
 
         # Latency
-        src = [
-            node
-            for node in transfer_graph.nodes
-            if transfer_graph.nodes[node].get("src", False)
-        ]
-        dsts = [
-            node
-            for node in transfer_graph.nodes
-            if transfer_graph.nodes[node].get("dst", False)
-        ]
-
-        assert (
-            len(src) == 1
-        ), f"Graphs look like: {transfer_graph.nodes.data()}, src: {src}, dsts: {dsts}"
-        latency = max([transfer_graph[src[0]][dst]["latency"] for dst in dsts])
+        latency = transfer_plan.latency
 
         # cannot exceeds the ingress limit
         if request.op == "read":
@@ -1248,20 +1152,14 @@ class SimulatorV2:
                 throughput_runtime, request.size / (GB * egress_limit)
             )
 
-        self.runtime_throughputs.append(throughput_runtime)
+        self.runtime_throughputs.add(throughput_runtime)
 
-        logger.debug("Transfer graph: {}".format(transfer_graph.edges.data()))
-        each_edge_cost = [
-            edge[-1]["cost"]
-            * request.size
-            * len(edge[-1]["partitions"])
-            / (GB * num_partitions)
-            for edge in transfer_graph.edges.data()
-        ]
+        logger.debug("Transfer plan: {}".format(transfer_plan))
+        each_edge_cost = [cost * partition_size for cost in transfer_plan.costs]
         logger.debug("netcost: {}".format(each_edge_cost))
         cost = sum(each_edge_cost)
         logger.debug(
-            f"Size of data: {request.size / GB}, transfer runtime: {throughput_runtime}, transfer latency: {latency}, transfer cost: {cost}, transfer graph: {transfer_graph.edges}, each edge cost = {each_edge_cost}"
+            f"Size of data: {request.size / GB}, transfer runtime: {throughput_runtime}, transfer latency: {latency}, transfer cost: {cost}, transfer plan: {transfer_plan}, each edge cost = {each_edge_cost}"
         )
 
         return throughput, throughput_runtime, latency, cost
@@ -1283,7 +1181,6 @@ class SimulatorV2:
                 total_graph=self.total_graph,
                 objects=self.logical_objects,
                 region_mgmt=self.region_manager,
-                trace_path=self.trace_path,
             )
 
         elif policy_type == "lru":
@@ -1292,6 +1189,12 @@ class SimulatorV2:
                 config=self.config,
             )
 
+        elif policy_type == "gdsf":
+            return GDSF(
+                region_manager=self.region_manager,
+                config=self.config,
+            )
+
         elif policy_type == "teven":
             return Teven(
                 config=self.config,
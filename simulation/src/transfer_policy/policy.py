@@ -1,6 +1,8 @@
 from src.model.config import Config
 from src.model.object import LogicalObject
 from src.model.request import Request
+from src.model.transfer_plan import TransferPlan
+from src.utils.region_matrix import get_region_matrix
 import networkx as nx
 
 from typing import Dict, Tuple
@@ -16,10 +18,11 @@ class TransferPolicy:
     ):
         self.config = config
         self.total_graph = total_graph
+        self.region_matrix = get_region_matrix(total_graph)
         self.objects = object_dict
         self.num_vms = num_vms
 
-    def read_transfer_path(self, req: Request) -> Tuple[str, nx.DiGraph]:
+    def read_transfer_path(self, req: Request) -> Tuple[str, TransferPlan]:
         """_summary_
 
         Args:
@@ -28,10 +31,10 @@ class TransferPolicy:
 
         Returns:
             str: source region to read from
-            nx.DiGraph: transfer path
+            TransferPlan: transfer path
         """
 
-    def write_transfer_path(self, req: Request, dst: str) -> nx.DiGraph:
+    def write_transfer_path(self, req: Request, dst: str) -> TransferPlan:
         """_summary_
 
         Args:
@@ -41,5 +44,5 @@ class TransferPolicy:
             dst (str): single region to write to
 
         Returns:
-            nx.DiGraph: transfer path
+            TransferPlan: transfer path
         """
@@ -1,6 +1,7 @@
 import networkx as nx
 from src.model.config import Config
 from src.model.request import Request
+from src.model.transfer_plan import TransferPlan
 from src.transfer_policy.policy import TransferPolicy
 import networkx as nx
 from typing import Dict, Tuple
@@ -16,7 +17,7 @@ class ClosestTransfer(TransferPolicy):
     ):
         super().__init__(config, total_graph, object_dict)
 
-    def read_transfer_path(self, req: Request) -> Tuple[str, nx.DiGraph]:
+    def read_transfer_path(self, req: Request) -> Tuple[str, TransferPlan]:
         # Direct transfer: given a destination, select the source and transfer path
         dst = req.issue_region
 
@@ -26,7 +27,9 @@ class ClosestTransfer(TransferPolicy):
                 for obj in self.objects[req.obj_key].physical_objects.values()
                 if obj.status == Status.ready
             ]
-            src = max(region_list, key=lambda x: self.total_graph[x][dst]["throughput"])
+            src = max(
+                region_list, key=lambda x: self.region_matrix.get_throughput(x, dst)
+            )
         else:
             assert self.config.storage_region != ""
             src = self.config.storage_region
@@ -35,45 +38,10 @@ class ClosestTransfer(TransferPolicy):
         assert req.obj_key in self.objects
         assert self.objects[req.obj_key].physical_objects[src].status == Status.ready
 
-        G = nx.DiGraph()
-        G.add_edge(
-            src,
-            dst,
-            obj_key=req.obj_key,
-            size=req.size,
-            num_partitions=1,
-            partitions=[0],
-            throughput=self.total_graph[src][dst]["throughput"],
-            cost=self.total_graph[src][dst]["cost"],
-            latency=self.total_graph[src][dst]["latency"],
-        )
+        return src, TransferPlan.direct(req, src, dst, self.region_matrix)
 
-        # set the src attribute to src, and dst attribute to dst
-        G.nodes[src]["src"] = True
-        G.nodes[dst]["dst"] = True
-
-        return src, G
-
-    def write_transfer_path(self, req: Request, dst: str) -> nx.DiGraph:
+    def write_transfer_path(self, req: Request, dst: str) -> TransferPlan:
         # Direct transfer
         # TODO: scale down egress throughput
         src = req.issue_region
-        G = nx.DiGraph()
-
-        G.add_edge(
-            src,
-            dst,
-            obj_key=req.obj_key,
-            size=req.size,
-            num_partitions=1,
-            partitions=[0],
-            throughput=self.total_graph[src][dst]["throughput"],
-            cost=self.total_graph[src][dst]["cost"],
-            latency=self.total_graph[src][dst]["latency"],
-        )
-
-        # set the src attribute to src, and dst attribute to dst
-        G.nodes[src]["src"] = True
-        G.nodes[dst]["dst"] = True
-
-        return G
+        return TransferPlan.direct(req, src, dst, self.region_matrix)
@@ -2,6 +2,7 @@ import networkx as nx
 from src.model.config import Config
 from src.model.object import LogicalObject, Status
 from src.model.request import Request
+from src.model.transfer_plan import TransferPlan
 from src.transfer_policy.policy import TransferPolicy
 import networkx as nx
 from typing import Dict, Tuple
@@ -16,9 +17,8 @@ class DirectTransfer(TransferPolicy):
     ):
         super().__init__(config, total_graph, object_dict)
 
-    def read_transfer_path(self, req: Request) -> Tuple[str, nx.DiGraph]:
+    def read_transfer_path(self, req: Request) -> Tuple[str, TransferPlan]:
         # Direct transfer: given a destination, select the source and transfer path
-        G = nx.DiGraph()
         src = self.config.storage_region
         dst = req.issue_region
 
@@ -26,42 +26,8 @@ class DirectTransfer(TransferPolicy):
         assert req.obj_key in self.objects
         assert self.objects[req.obj_key].physical_objects[src].status == Status.ready
 
-        G.add_edge(
-            src,
-            dst,
-            obj_key=req.obj_key,
-            size=req.size,
-            num_partitions=1,
-            partitions=[0],
-            throughput=self.total_graph[src][dst]["throughput"],
-            cost=self.total_graph[src][dst]["cost"],
-            latency=self.total_graph[src][dst]["latency"],
-        )
+        return src, TransferPlan.direct(req, src, dst, self.region_matrix)
 
-        # set the src attribute to src, and dst attribute to dst
-        G.nodes[src]["src"] = True
-        G.nodes[dst]["dst"] = True
-
-        return src, G
-
-    def write_transfer_path(self, req: Request, dst: str) -> nx.DiGraph:
+    def write_transfer_path(self, req: Request, dst: str) -> TransferPlan:
         src = req.issue_region
-        G = nx.DiGraph()
-
-        G.add_edge(
-            src,
-            dst,
-            obj_key=req.obj_key,
-            size=req.size,
-            num_partitions=1,
-            partitions=[0],
-            throughput=self.total_graph[src][dst]["throughput"],
-            cost=self.total_graph[src][dst]["cost"],
-            latency=self.total_graph[src][dst]["latency"],
-        )
-
-        # set the src attribute to src, and dst attribute to dst
-        G.nodes[src]["src"] = True
-        G.nodes[dst]["dst"] = True
-
-        return G
+        return TransferPlan.direct(req, src, dst, self.region_matrix)
@@ -0,0 +1,228 @@
+import argparse
+import csv
+import json
+import os
+from array import array
+from datetime import datetime
+from typing import Dict, Iterator, List
+
+import numpy as np
+
+from src.model.request import Request
+
+"""
+    Columnar, pre-parsed trace format.
+
+    A `.mc`/`.prototype` CSV trace is converted once into a directory of raw
+    little-endian column files plus a `meta.json` describing them. Strings
+    (regions and object keys) are interned to small integer ids and timestamps
+    are stored as epoch milliseconds, so repeated simulations over the same
+    trace memory-map the arrays instead of re-parsing every CSV row.
+"""
+
+COLUMNAR_FORMAT_VERSION = 1
+META_FILE = "meta.json"
+COLUMNAR_SUFFIX = ".cols"
+
+OP_READ = 0
+OP_WRITE = 1
+OP_NAMES = {OP_READ: "read", OP_WRITE: "write"}
+OP_CODES = {
+    "GET": OP_READ,
+    "REST.GET.OBJECT": OP_READ,
+    "PUT": OP_WRITE,
+    "REST.PUT.OBJECT": OP_WRITE,
+}
+
+NO_TIMESTAMP = -1  # time_to_next_access_same_reg == -1 in the CSV trace
+
+# column name -> (array typecode used while writing, numpy dtype used while reading)
+COLUMNS = {
+    "timestamp": ("q", "<i8"),
+    "op": ("b", "<i1"),
+    "region": ("h", "<i2"),
+    "key": ("i", "<i4"),
+    "version": ("i", "<i4"),
+    "size": ("d", "<f8"),
+    "next_access": ("q", "<i8"),
+    "next_access_same_reg": ("q", "<i8"),
+}
+
+
+def parse_timestamp_ms(timestamp_str: str) -> int:
+    """Parse a trace timestamp (epoch millis or ISO format) into epoch millis."""
+    if timestamp_str.replace("-", "").replace(":", "").replace(" ", "").isdigit():
+        return int(timestamp_str)
+    return int(datetime.fromisoformat(timestamp_str).timestamp() * 1000)
+
+
+def columnar_path_for(trace_path: str) -> str:
+    return trace_path + COLUMNAR_SUFFIX
+
+
+def is_columnar_trace(path: str) -> bool:
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, META_FILE))
+
+
+def convert_trace(trace_path: str, out_dir: str = None, chunk_size: int = 1 << 20):
+    """
+    Convert a CSV trace into the columnar format
+
+    Args:
+        trace_path (str): path to the `.mc`/`.prototype` CSV trace
+        out_dir (str): output directory, defaults to `<trace_path>.cols`
+        chunk_size (int): rows buffered in memory before being flushed to disk
+
+    Returns:
+        str: the output directory
+    """
+    out_dir = out_dir or columnar_path_for(trace_path)
+    os.makedirs(out_dir, exist_ok=True)
+
+    region_ids: Dict[str, int] = {}
+    key_ids: Dict[str, int] = {}
+    versions: Dict[int, int] = {}
+    buffers = {name: array(typecode) for name, (typecode, _) in COLUMNS.items()}
+    files = {name: open(os.path.join(out_dir, name + ".bin"), "wb") for name in COLUMNS}
+    num_rows = 0
+
+    def flush():
+        for name, buf in buffers.items():
+            buf.tofile(files[name])
+            del buf[:]
+
+    try:
+        with open(trace_path, "r") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                op = OP_CODES.get(row["op"])
+                if op is None:
+                    continue
+
+                region = region_ids.setdefault(row["issue_region"], len(region_ids))
+                key = key_ids.setdefault(row["obj_key"], len(key_ids))
+                if op == OP_WRITE:
+                    versions[key] = versions.get(key, 0) + 1
+
+                next_same_reg = row.get("time_to_next_access_same_reg", "-1")
+                buffers["timestamp"].append(parse_timestamp_ms(row["timestamp"]))
+                buffers["op"].append(op)
+                buffers["region"].append(region)
+                buffers["key"].append(key)
+                buffers["version"].append(versions.get(key, 0))
+                buffers["size"].append(float(row["size"]))
+                buffers["next_access"].append(
+                    parse_timestamp_ms(row.get("time_to_next_access", "-1"))
+                )
+                buffers["next_access_same_reg"].append(
+                    NO_TIMESTAMP
+                    if next_same_reg == "-1"
+                    else parse_timestamp_ms(next_same_reg)
+                )
+                num_rows += 1
+                if num_rows % chunk_size == 0:
+                    flush()
+            flush()
+    finally:
+        for fh in files.values():
+            fh.close()
+
+    with open(os.path.join(out_dir, "regions.txt"), "w") as f:
+        f.write("\n".join(region_ids))
+    with open(os.path.join(out_dir, "keys.txt"), "w") as f:
+        f.write("\n".join(key_ids))
+    with open(os.path.join(out_dir, META_FILE), "w") as f:
+        json.dump(
+            {
+                "format_version": COLUMNAR_FORMAT_VERSION,
+                "source": os.path.abspath(trace_path),
+                "num_rows": num_rows,
+                "columns": {name: dtype for name, (_, dtype) in COLUMNS.items()},
+            },
+            f,
+            indent=2,
+        )
+    return out_dir
+
+
+class ColumnarTrace:
+    """Read-only, memory-mapped view over a converted trace."""
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, META_FILE), "r") as f:
+            meta = json.load(f)
+        if meta["format_version"] != COLUMNAR_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported columnar trace version: {meta['format_version']}"
+            )
+
+        self.path = path
+        self.num_rows: int = meta["num_rows"]
+        self.columns: Dict[str, np.ndarray] = {}
+        for name, dtype in meta["columns"].items():
+            if self.num_rows == 0:
+                self.columns[name] = np.empty(0, dtype=dtype)
+            else:
+                self.columns[name] = np.memmap(
+                    os.path.join(path, name + ".bin"),
+                    dtype=dtype,
+                    mode="r",
+                    shape=(self.num_rows,),
+                )
+
+        with open(os.path.join(path, "regions.txt"), "r") as f:
+            self.regions: List[str] = f.read().split("\n")
+        with open(os.path.join(path, "keys.txt"), "r") as f:
+            self.keys: List[str] = f.read().split("\n")
+
+    def __len__(self):
+        return self.num_rows
+
+    def requests(
+        self, versioned: bool = False, chunk_size: int = 1 << 16
+    ) -> Iterator[Request]:
+        """Yield the trace as `Request`s without any CSV or timestamp string parsing."""
+        cols = self.columns
+        for start in range(0, self.num_rows, chunk_size):
+            end = min(start + chunk_size, self.num_rows)
+            timestamps = cols["timestamp"][start:end].tolist()
+            ops = cols["op"][start:end].tolist()
+            regions = cols["region"][start:end].tolist()
+            keys = cols["key"][start:end].tolist()
+            versions = cols["version"][start:end].tolist()
+            sizes = cols["size"][start:end].tolist()
+            next_accesses = cols["next_access"][start:end].tolist()
+            next_accesses_same_reg = cols["next_access_same_reg"][start:end].tolist()
+
+            for i in range(end - start):
+                obj_key = self.keys[keys[i]]
+                if versioned:
+                    obj_key = obj_key + "-v" + str(versions[i])
+                next_same_reg = next_accesses_same_reg[i]
+                yield Request(
+                    timestamp=datetime.fromtimestamp(timestamps[i] / 1000),
+                    op=OP_NAMES[ops[i]],
+                    issue_region=self.regions[regions[i]],
+                    obj_key=obj_key,
+                    size=sizes[i],
+                    next_access_timestamp=datetime.fromtimestamp(
+                        next_accesses[i] / 1000
+                    ),
+                    next_access_same_reg_timestamp=(
+                        datetime.max
+                        if next_same_reg == NO_TIMESTAMP
+                        else datetime.fromtimestamp(next_same_reg / 1000)
+                    ),
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Convert a CSV trace into the columnar trace format"
+    )
+    parser.add_argument("trace", help="Path to the CSV trace file")
+    parser.add_argument(
+        "--out", default=None, help="Output directory (default: <trace>.cols)"
+    )
+    args = parser.parse_args()
+    print(f"Wrote columnar trace to {convert_trace(args.trace, args.out)}")
@@ -0,0 +1,108 @@
+from typing import Dict, Iterable, List, Tuple
+
+import networkx as nx
+import numpy as np
+
+
+class RegionMatrix:
+    """
+    Dense per-region-pair cost/latency/throughput tables built once from the
+    graph returned by `make_nx_graph`.
+
+    Regions are interned to small integer ids. The NumPy arrays are meant for
+    vectorized computations over all pairs; the `get_*` accessors are backed by
+    plain nested lists because per-request scalar lookups on lists are cheaper
+    than both NumPy scalar indexing and networkx's nested adjacency views.
+    Pairs without an edge (or without a cost in the profiles) are NaN, as are
+    the prices of regions without one; looking those up raises a KeyError.
+    """
+
+    def __init__(self, G: nx.DiGraph):
+        self.regions: List[str] = list(G.nodes)
+        self.region_ids: Dict[str, int] = {r: i for i, r in enumerate(self.regions)}
+        n = len(self.regions)
+
+        self.cost = np.full((n, n), np.nan)
+        self.latency = np.full((n, n), np.nan)
+        self.throughput = np.full((n, n), np.nan)
+        for src, dst, data in G.edges(data=True):
+            i, j = self.region_ids[src], self.region_ids[dst]
+            for name, table in [
+                ("cost", self.cost),
+                ("latency", self.latency),
+                ("throughput", self.throughput),
+            ]:
+                if data.get(name) is not None:
+                    table[i, j] = data[name]
+
+        def prices(name: str) -> np.ndarray:
+            return np.array(
+                [G.nodes[r].get(name, np.nan) for r in self.regions], dtype=float
+            )
+
+        self.price_storage = prices("priceStorage")
+        self.price_put = prices("pricePut")
+        self.price_get = prices("priceGet")
+
+        self._cost = self.cost.tolist()
+        self._latency = self.latency.tolist()
+        self._throughput = self.throughput.tolist()
+        self._price_storage = self.price_storage.tolist()
+        self._price_put = self.price_put.tolist()
+        self._price_get = self.price_get.tolist()
+
+    def __len__(self):
+        return len(self.regions)
+
+    def id(self, region: str) -> int:
+        return self.region_ids[region]
+
+    def get_cost(self, src: str, dst: str) -> float:
+        return self._cost[self.region_ids[src]][self.region_ids[dst]]
+
+    def get_latency(self, src: str, dst: str) -> float:
+        return self._latency[self.region_ids[src]][self.region_ids[dst]]
+
+    def get_throughput(self, src: str, dst: str) -> float:
+        return self._throughput[self.region_ids[src]][self.region_ids[dst]]
+
+    def _price(self, prices: List[float], name: str, region: str) -> float:
+        price = prices[self.region_ids[region]]
+        if price != price:  # NaN
+            raise KeyError(f"No {name} for region {region}")
+        return price
+
+    def get_price_storage(self, region: str) -> float:
+        return self._price(self._price_storage, "priceStorage", region)
+
+    def get_price_put(self, region: str) -> float:
+        return self._price(self._price_put, "pricePut", region)
+
+    def get_price_get(self, region: str) -> float:
+        return self._price(self._price_get, "priceGet", region)
+
+    def cheapest_src(self, srcs: Iterable[str], dst: str) -> Tuple[str, float]:
+        """
+        Pick the source with the lowest (network cost, latency) to `dst`
+
+        Same tie-breaking as `min(srcs, key=lambda x: (cost, latency))`.
+
+        Returns:
+            str: the selected source region, None if `srcs` is empty
+            float: its network cost to `dst`
+        """
+        d = self.region_ids[dst]
+        best, best_cost, best_latency = None, None, None
+        for src in srcs:
+            s = self.region_ids[src]
+            cost, latency = self._cost[s][d], self._latency[s][d]
+            if best is None or (cost, latency) < (best_cost, best_latency):
+                best, best_cost, best_latency = src, cost, latency
+        return best, best_cost
+
+
+def get_region_matrix(G: nx.DiGraph) -> RegionMatrix:
+    """Build the `RegionMatrix` of a graph once and share it through `G.graph`."""
+    if "region_matrix" not in G.graph:
+        G.graph["region_matrix"] = RegionMatrix(G)
+    return G.graph["region_matrix"]
@@ -0,0 +1,135 @@
+import math
+import random
+from typing import Dict, List, Optional
+
+"""
+    Constant-memory, mergeable statistics for per-request metrics.
+
+    The simulator records a handful of values per request; keeping them in
+    Python lists grows without bound with the trace length. `RunningStat` keeps
+    count/sum/min/max (sums are accumulated in arrival order, so they match
+    `sum(list)` exactly), `QuantileSketch` answers quantile queries within a
+    relative error, and `ReservoirSample` optionally keeps a bounded uniform
+    sample of the raw values. All three can be merged, so results of trace
+    shards can be combined.
+"""
+
+
+class RunningStat:
+    __slots__ = ("count", "total", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "RunningStat"):
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0
+
+    def __len__(self):
+        return self.count
+
+
+class QuantileSketch:
+    """
+    Log-bucketed quantile sketch (DDSketch-style).
+
+    Positive values fall into buckets [gamma^(i-1), gamma^i) with
+    gamma = (1 + alpha) / (1 - alpha), so any reported quantile is within a
+    relative error of `alpha` of the true value. Zero and negative values are
+    counted separately and reported as 0. Two sketches with the same `alpha`
+    merge by adding bucket counts.
+    """
+
+    __slots__ = ("alpha", "gamma", "_log_gamma", "buckets", "zero_count", "count")
+
+    def __init__(self, alpha: float = 0.01):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value: float):
+        self.count += 1
+        if value <= 0:
+            self.zero_count += 1
+            return
+        i = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[i] = self.buckets.get(i, 0) + 1
+
+    def merge(self, other: "QuantileSketch"):
+        assert self.alpha == other.alpha, "Can only merge sketches with equal alpha"
+        self.count += other.count
+        self.zero_count += other.zero_count
+        for i, n in other.buckets.items():
+            self.buckets[i] = self.buckets.get(i, 0) + n
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return 0
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0
+        for i in sorted(self.buckets):
+            seen += self.buckets[i]
+            if rank < seen:
+                # Midpoint (in relative terms) of the bucket
+                return 2 * self.gamma**i / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+
+class ReservoirSample:
+    """Uniform sample of at most `size` values (Algorithm R)"""
+
+    __slots__ = ("size", "seen", "values", "_random")
+
+    def __init__(self, size: int, seed: Optional[int] = None):
+        self.size = size
+        self.seen = 0
+        self.values: List[float] = []
+        self._random = random.Random(seed)
+
+    def add(self, value: float):
+        self.seen += 1
+        if len(self.values) < self.size:
+            self.values.append(value)
+            return
+        j = self._random.randrange(self.seen)
+        if j < self.size:
+            self.values[j] = value
+
+    def merge(self, other: "ReservoirSample"):
+        """Approximate merge: draw from both samples proportionally to `seen`"""
+        if other.seen == 0:
+            return
+        if self.seen == 0:
+            self.seen, self.values = other.seen, list(other.values)
+            return
+        seen = self.seen + other.seen
+        values = []
+        mine, theirs = list(self.values), list(other.values)
+        while len(values) < self.size and (mine or theirs):
+            pick_mine = mine and (
+                not theirs or self._random.random() < self.seen / seen
+            )
+            source = mine if pick_mine else theirs
+            values.append(source.pop(self._random.randrange(len(source))))
+        self.seen, self.values = seen, values
@@ -0,0 +1,117 @@
+import csv
+import os
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from src.model.request import Request
+from src.utils.columnar_trace import ColumnarTrace, is_columnar_trace
+
+"""
+    Single-pass trace reading for the simulator.
+
+    `TraceReader` streams a CSV (or columnar) trace exactly once per consumer
+    pass: object versions are assigned on the fly instead of rewriting the trace
+    to `<trace>-versioned`, and progress is estimated from the byte offset
+    instead of counting lines up front. Components that need to see the whole
+    trace before the simulation starts (e.g. SPANStore access sets) implement
+    `TraceConsumer` and share a single `prescan` pass.
+"""
+
+
+class TraceConsumer:
+    """Something that needs to observe the whole trace before the simulation"""
+
+    def observe(self, request: Request):
+        pass
+
+    def finish(self):
+        pass
+
+
+def parse_trace_timestamp(timestamp_str: str) -> datetime:
+    if timestamp_str.replace("-", "").replace(":", "").replace(" ", "").isdigit():
+        return datetime.fromtimestamp(int(timestamp_str) / 1000)
+    return datetime.fromisoformat(timestamp_str)
+
+
+def parse_trace_row(row: Dict[str, str]) -> Optional[Request]:
+    """Turn a CSV trace row into a `Request`, None for ops that are not simulated"""
+    if row["op"] == "GET" or row["op"] == "REST.GET.OBJECT":
+        op = "read"
+    elif row["op"] == "PUT" or row["op"] == "REST.PUT.OBJECT":
+        op = "write"
+    else:
+        return None
+
+    next_access_same_reg_timestamp = datetime.max
+    if row["time_to_next_access_same_reg"] != "-1":
+        next_access_same_reg_timestamp = parse_trace_timestamp(
+            row["time_to_next_access_same_reg"]
+        )
+
+    return Request(
+        timestamp=parse_trace_timestamp(row["timestamp"]),
+        op=op,
+        issue_region=row["issue_region"],
+        obj_key=row["obj_key"],
+        size=float(row["size"]),
+        next_access_timestamp=parse_trace_timestamp(row["time_to_next_access"]),
+        next_access_same_reg_timestamp=next_access_same_reg_timestamp,
+    )
+
+
+class TraceReader:
+    def __init__(self, trace_path: str, versioned: bool = False):
+        self.trace_path = trace_path
+        self.versioned = versioned
+        self.columnar: Optional[ColumnarTrace] = (
+            ColumnarTrace(trace_path) if is_columnar_trace(trace_path) else None
+        )
+
+        # Progress is rows for columnar traces and bytes for CSV traces
+        self.total = (
+            len(self.columnar)
+            if self.columnar is not None
+            else os.path.getsize(trace_path)
+        )
+        self.position = 0
+
+    def progress(self) -> float:
+        return self.position / self.total if self.total else 1.0
+
+    def _lines(self, f) -> Iterator[str]:
+        for line in f:
+            self.position += len(line)
+            yield line.decode()
+
+    def requests(self) -> Iterator[Request]:
+        self.position = 0
+        if self.columnar is not None:
+            for request in self.columnar.requests(versioned=self.versioned):
+                self.position += 1
+                yield request
+            return
+
+        versions: Dict[str, int] = {}
+        with open(self.trace_path, "rb") as f:
+            for row in csv.DictReader(self._lines(f)):
+                request = parse_trace_row(row)
+                if request is None:
+                    continue
+                if self.versioned:
+                    if request.op == "write":
+                        versions[request.obj_key] = versions.get(request.obj_key, 0) + 1
+                    request.obj_key = (
+                        request.obj_key + "-v" + str(versions.get(request.obj_key, 0))
+                    )
+                yield request
+
+    def prescan(self, consumers: List[TraceConsumer]):
+        """Feed the whole trace to all `consumers` in one shared pass"""
+        if len(consumers) == 0:
+            return
+        for request in self.requests():
+            for consumer in consumers:
+                consumer.observe(request)
+        for consumer in consumers:
+            consumer.finish()
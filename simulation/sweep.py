@@ -0,0 +1,183 @@
+import argparse
+import csv
+import itertools
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List
+
+import networkx as nx
+import yaml
+
+from src.simulator_v2 import SimulatorV2
+from src.utils.columnar_trace import (
+    columnar_path_for,
+    convert_trace,
+    is_columnar_trace,
+)
+from src.utils.helpers import get_full_path, make_nx_graph
+from src.utils.region_matrix import get_region_matrix
+
+"""
+    Parallel parameter sweep over SimulatorV2 runs.
+
+    The grid spec is a YAML file; every list is one axis of the grid and the
+    sweep runs their cross product:
+
+        configs: [config/tevict.yaml, config/lru.yaml]
+        transfer_policies: [cheapest, closest]  # optional, default: from config
+        traces: [traces/mc_dir/fixed/IBMObjectStoreTrace003Part0.typeA.mc]
+        vms: [1, 5]                             # optional, default: [1]
+        setbase: [false]                        # optional, default: [false]
+        days: 0                                 # optional, shared by all runs
+        version_enable: true                    # optional, shared by all runs
+
+    Each trace is converted to the columnar format once up front, so workers
+    memory-map the same read-only columns instead of each parsing the CSV. The
+    region graph (and its RegionMatrix) is built once and handed to every worker
+    process when the pool starts, not once per run. The metrics of all runs are
+    written to a single CSV, one row per run.
+
+    Usage: python sweep.py --grid sweep.yaml [--workers N] [--out results.csv]
+"""
+
+_worker_graph: nx.DiGraph = None
+
+
+def _init_worker(total_graph: nx.DiGraph):
+    global _worker_graph
+    _worker_graph = total_graph
+
+
+def load_grid(grid_path: str) -> List[Dict[str, Any]]:
+    with open(get_full_path(grid_path), "r") as f:
+        grid = yaml.safe_load(f)
+
+    for axis in ["configs", "traces"]:
+        if not grid.get(axis):
+            raise ValueError(f"Grid spec {grid_path} must list at least one of {axis}")
+
+    runs = []
+    for config, transfer_policy, trace, vms, setbase in itertools.product(
+        grid["configs"],
+        grid.get("transfer_policies") or [None],
+        grid["traces"],
+        grid.get("vms") or [1],
+        grid.get("setbase") or [False],
+    ):
+        runs.append(
+            {
+                "config": config,
+                "transfer_policy": transfer_policy,
+                "trace": trace,
+                "vms": int(vms),
+                "setbase": bool(setbase),
+                "days": int(grid.get("days", 0)),
+                "version_enable": bool(grid.get("version_enable", True)),
+            }
+        )
+    return runs
+
+
+def prepare_traces(runs: List[Dict[str, Any]]) -> Dict[str, str]:
+    """Convert every trace of the sweep to the columnar format (at most once)"""
+    columnar_traces = {}
+    for trace in sorted({run["trace"] for run in runs}):
+        if is_columnar_trace(get_full_path(trace)):
+            columnar_traces[trace] = trace
+            continue
+        columnar_trace = columnar_path_for(trace)
+        if not is_columnar_trace(get_full_path(columnar_trace)):
+            print(f"Converting {trace} to {columnar_trace}")
+            convert_trace(get_full_path(trace), get_full_path(columnar_trace))
+        columnar_traces[trace] = columnar_trace
+    return columnar_traces
+
+
+def run_one(run: Dict[str, Any], columnar_trace: str) -> Dict[str, Any]:
+    config_overrides = {}
+    if run["transfer_policy"] is not None:
+        config_overrides["transfer_policy"] = run["transfer_policy"]
+
+    result = dict(run)
+    try:
+        simulator = SimulatorV2(
+            run["config"],
+            columnar_trace,
+            run["vms"],
+            run["setbase"],
+            run["days"],
+            version_enable=run["version_enable"],
+            config_overrides=config_overrides,
+            total_graph=_worker_graph,
+        )
+        result["placement_policy"] = simulator.config.placement_policy
+        result["transfer_policy"] = simulator.config.transfer_policy
+        simulator.run()
+        result.update(simulator.collect_metrics())
+        result["error"] = ""
+    except Exception:
+        # One broken combination should not take the rest of the sweep down
+        result["error"] = traceback.format_exc(limit=3).strip().splitlines()[-1]
+    return result
+
+
+def write_results(results: List[Dict[str, Any]], out_path: str):
+    fieldnames = []
+    for result in results:
+        for field in result:
+            if field not in fieldnames:
+                fieldnames.append(field)
+
+    with open(out_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def sweep(grid_path: str, workers: int, out_path: str):
+    runs = load_grid(grid_path)
+    columnar_traces = prepare_traces(runs)
+
+    total_graph = make_nx_graph()
+    get_region_matrix(total_graph)  # Build once, shipped to workers with the graph
+
+    print(f"Running {len(runs)} simulations on {workers} workers")
+    results = []
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(total_graph,)
+    ) as executor:
+        futures = {
+            executor.submit(run_one, run, columnar_traces[run["trace"]]): i
+            for i, run in enumerate(runs)
+        }
+        for future in as_completed(futures):
+            result = future.result()
+            results.append((futures[future], result))
+            status = "failed: " + result["error"] if result["error"] else "done"
+            print(
+                f"[{len(results)}/{len(runs)}] {result['config']} "
+                f"{result['transfer_policy']} {result['trace']} vms={result['vms']} "
+                f"{status}"
+            )
+
+    # Keep the grid order regardless of completion order
+    write_results([result for _, result in sorted(results)], out_path)
+    print(f"Results written to {out_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SkyStorage Simulator sweep")
+    parser.add_argument("--grid", required=True, help="Path to the grid spec")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="Number of worker processes",
+    )
+    parser.add_argument(
+        "--out", default="sweep_results.csv", help="Path of the results CSV"
+    )
+    args = parser.parse_args()
+
+    sweep(args.grid, args.workers, args.out)